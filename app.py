@@ -8,6 +8,15 @@ st.set_page_config(
     layout="centered"
 )
 
+
+@st.cache_resource
+def get_predict_pipeline():
+    pipeline = PredictPipeline()
+    pipeline.predict_pipeline_config.use_prediction_cache = True
+    pipeline.load_artifacts()
+    return pipeline
+
+
 st.title("🏠 Housing Price Prediction Indicator")
 st.markdown("Enter the house details below:")
 
@@ -132,7 +141,7 @@ if st.button("Predict your Sale Price"):
 
     df = data.get_data_as_data_frame()
 
-    pipeline = PredictPipeline()
+    pipeline = get_predict_pipeline()
     prediction = pipeline.predict(df)
 
     st.success(f"💰 THE PREDICTED SALE PRICE IS {prediction[0]:,.2f} INR")
\ No newline at end of file
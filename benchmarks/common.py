@@ -0,0 +1,44 @@
+import os
+import tempfile
+import time
+
+from src.components.data_transformation import DataTransformation
+
+
+def load_train_test_arrays(train_path=os.path.join("artifacts", "train.csv"),
+                           test_path=os.path.join("artifacts", "test.csv")):
+    '''
+    Runs the data transformation on the ingested splits without touching artifacts/preprocessor.pkl
+    and returns X_train, y_train, X_test, y_test.
+    '''
+    data_transformation = DataTransformation()
+    data_transformation.data_transformation_config.preprocessor_obj_file_path = os.path.join(
+        tempfile.mkdtemp(), "preprocessor.pkl"
+    )
+    train_arr, test_arr, _ = data_transformation.initiate_data_transformation(train_path, test_path)
+    return train_arr[:, :-1], train_arr[:, -1], test_arr[:, :-1], test_arr[:, -1]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def peak_rss_mb():
+    '''
+    Peak resident set size of this process (VmHWM). Unlike ru_maxrss it starts afresh in an
+    exec'd subprocess instead of carrying over the parent's peak.
+    '''
+    with open("/proc/self/status") as file_obj:
+        for line in file_obj:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not found in /proc/self/status")
+
+
+def print_table(rows, columns):
+    widths = [max(len(str(col)), *(len(str(row[col])) for row in rows)) for col in columns]
+    print("  ".join(str(col).ljust(width) for col, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[col]).ljust(width) for col, width in zip(columns, widths)))
@@ -0,0 +1,118 @@
+'''
+Peak RSS and search time of evaluate_models on the default float64 matrices (target as the
+last column, sliced off by ModelTrainer, folds passed as index arrays) against compact mode
+(DataTransformationConfig.compact_arrays: C-contiguous float32 features, a separate target,
+folds passed as slices). The training split is replicated --scale times (~1M rows by
+default) so the arrays dominate memory. Each model and mode runs in a fresh interpreter that
+loads the transformed arrays first, so loaded_mb and peak RSS are its own.
+
+    python -m benchmarks.compact_arrays [--scale 60] [--models "Linear Regression" XGBRegressor ...]
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import peak_rss_mb, print_table
+from src.components.data_transformation import DataTransformation
+
+RUN_SEARCH = '''
+import json
+from benchmarks.compact_arrays import run_search
+print(json.dumps(run_search({data_dir!r}, {compact!r}, {model_name!r})))
+'''
+
+
+def run_search(data_dir, compact, model_name):
+    from src.components.model_trainer import ModelTrainer
+    from src.utils import evaluate_models, split_xy
+
+    # Building the models imports their libraries, before the baseline is taken
+    trainer = ModelTrainer()
+    models = {model_name: trainer.get_models()[model_name]}
+    params = {model_name: trainer.get_param_grids()[model_name]}
+    if compact:
+        train = (np.load(os.path.join(data_dir, "X_train.npy")), np.load(os.path.join(data_dir, "y_train.npy")))
+        test = (np.load(os.path.join(data_dir, "X_test.npy")), np.load(os.path.join(data_dir, "y_test.npy")))
+    else:
+        train, test = np.load(os.path.join(data_dir, "train_arr.npy")), np.load(os.path.join(data_dir, "test_arr.npy"))
+    loaded_mb = peak_rss_mb()
+
+    # As ModelTrainer.initiate_model_trainer does
+    X_train, y_train = split_xy(train)
+    X_test, y_test = split_xy(test)
+    report = evaluate_models(X_train, y_train, X_test, y_test, models, params,
+                             search_kwargs={"fold_views": compact})[model_name]
+    return {
+        "loaded_mb": loaded_mb,
+        "peak_rss_mb": peak_rss_mb(),
+        "search_s": report["search_time"],
+        "refit_s": report["refit_time"],
+        "test_score": report["test_score"],
+    }
+
+
+def write_arrays(data_dir, train_path, test_path):
+    for compact in (False, True):
+        data_transformation = DataTransformation()
+        config = data_transformation.data_transformation_config
+        config.use_artifact_store = False
+        config.compact_arrays = compact
+        config.preprocessor_obj_file_path = os.path.join(data_dir, "preprocessor.pkl")
+        train, test, _ = data_transformation.initiate_data_transformation(train_path, test_path)
+        if compact:
+            for name, array in zip(("X_train", "y_train", "X_test", "y_test"), (*train, *test)):
+                np.save(os.path.join(data_dir, f"{name}.npy"), array)
+        else:
+            np.save(os.path.join(data_dir, "train_arr.npy"), train)
+            np.save(os.path.join(data_dir, "test_arr.npy"), test)
+    return train[0].shape
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train-path", default=os.path.join("artifacts", "train.csv"))
+    parser.add_argument("--test-path", default=os.path.join("artifacts", "test.csv"))
+    parser.add_argument("--scale", type=int, default=60)
+    parser.add_argument("--models", nargs="+", default=["Linear Regression", "XGBRegressor"])
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    rows = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        train_path = os.path.join(data_dir, "train.csv")
+        pd.concat([pd.read_csv(args.train_path)] * args.scale, ignore_index=True).to_csv(train_path, index=False)
+        n_rows, n_features = write_arrays(data_dir, train_path, args.test_path)
+        print(f"{n_rows:,} training rows x {n_features} features: "
+              f"{n_rows * (n_features + 1) * 8 / 2**20:.0f} MB as float64 with the target, "
+              f"{n_rows * n_features * 4 / 2**20:.0f} MB as float32")
+
+        for model_name in args.models:
+            for compact in (False, True):
+                script = RUN_SEARCH.format(data_dir=data_dir, compact=compact, model_name=model_name)
+                out = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True,
+                                     check=True)
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                rows.append({
+                    "model": model_name,
+                    "mode": "compact" if compact else "float64",
+                    "loaded_mb": f"{result['loaded_mb']:.0f}",
+                    "peak_rss_mb": f"{result['peak_rss_mb']:.0f}",
+                    "over_loaded_mb": f"{result['peak_rss_mb'] - result['loaded_mb']:.0f}",
+                    "search_s": f"{result['search_s']:.1f}",
+                    "refit_s": f"{result['refit_s']:.1f}",
+                    "test_r2": f"{result['test_score']:.4f}",
+                })
+
+    print_table(rows, list(rows[0]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+'''
+Cost of turning 10k house records into preprocessor input: the former one-frame-per-house
+CustomData.get_data_as_data_frame() against the bulk CustomData.records_to_data_frame()
+and CustomData.columns_to_data_frame() constructors. Also reports the size of one record.
+
+    python -m benchmarks.custom_data [--n-records 10000]
+'''
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+from benchmarks.common import print_table, timed
+from src.components.feature_engineering import FeatureEngineer
+from src.pipeline.predict_pipeline import CUSTOM_DATA_SCHEMA, CustomData
+
+
+def legacy_data_frame(record):
+    # get_data_as_data_frame() as it was: a dict of one-element lists per house
+    return pd.DataFrame({name: [record[name]] for name in CUSTOM_DATA_SCHEMA})
+
+
+class DictRecord:
+    # CustomData as it was, with its attributes in an instance __dict__
+    def __init__(self, **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-path", default=os.path.join("artifacts", "test.csv"))
+    parser.add_argument("--n-records", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    features = FeatureEngineer().transform(pd.read_csv(args.data_path))[list(CUSTOM_DATA_SCHEMA)].dropna()
+    features = features.sample(args.n_records, replace=len(features) < args.n_records, random_state=0)
+    dicts = features.to_dict("records")
+
+    objects, construct_seconds = timed(lambda: [CustomData(**record) for record in dicts])
+    bulk, records_seconds = timed(CustomData.records_to_data_frame, objects)
+    _, dicts_seconds = timed(CustomData.records_to_data_frame, dicts)
+    columns = {name: features[name].to_numpy() for name in CUSTOM_DATA_SCHEMA}
+    _, columns_seconds = timed(CustomData.columns_to_data_frame, columns)
+    legacy, legacy_seconds = timed(lambda: pd.concat([legacy_data_frame(r) for r in dicts], ignore_index=True))
+    _, per_record_seconds = timed(lambda: [record.get_data_as_data_frame() for record in objects])
+
+    pd.testing.assert_frame_equal(bulk, legacy, check_dtype=False)
+
+    rows = [
+        {"path": "one frame per record + concat (former)", "seconds": legacy_seconds},
+        {"path": "CustomData.get_data_as_data_frame() per record", "seconds": per_record_seconds},
+        {"path": "CustomData(**record) construction", "seconds": construct_seconds},
+        {"path": "records_to_data_frame(CustomData list)", "seconds": records_seconds},
+        {"path": "records_to_data_frame(dict list)", "seconds": dicts_seconds},
+        {"path": "columns_to_data_frame(dict of arrays)", "seconds": columns_seconds},
+    ]
+    for row in rows:
+        row["us_per_record"] = f"{row['seconds'] / args.n_records * 1e6:.2f}"
+        row["seconds"] = f"{row['seconds']:.4f}"
+    print(f"{args.n_records} records")
+    print_table(rows, ["path", "seconds", "us_per_record"])
+
+    legacy_record = DictRecord(**dicts[0])
+    print(f"\nbytes per record: __dict__ {sys.getsizeof(legacy_record) + sys.getsizeof(legacy_record.__dict__)}, "
+          f"__slots__ {sys.getsizeof(objects[0])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+'''
+Cost of DataValidation.validate on ~1M raw rows (the sample replicated with fresh IDs,
+~1% of them corrupted: negative areas, unknown conditions, missing IDs and prices,
+fractional bedroom counts) against checking the same rules one row at a time in Python,
+timed on a subsample and extrapolated. Also times a frame whose area column arrives as
+strings ("n/a"), which takes the slower coerce-and-check path.
+
+    python -m benchmarks.data_validation [--scale 50] [--baseline-rows 50000]
+'''
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table, timed
+from src.components.data_validation import DataValidation, VALIDATION_RULES
+from src.components.feature_engineering import FeatureEngineer
+
+
+def scaled_frame(source_path, scale, bad_fraction, seed=0):
+    df = pd.read_csv(source_path)
+    df = pd.concat([df.assign(ID=df["ID"] + copy * 10**10) for copy in range(scale)], ignore_index=True)
+    df = df.astype({"ID": "float64", "No of Bedrooms": "float64"})
+    rng = np.random.default_rng(seed)
+    corruptions = [
+        ("Flat Area (in Sqft)", -100.0),
+        ("Condition of the House", "Unknown"),
+        ("ID", np.nan),
+        ("Sale Price", np.nan),
+        ("No of Bedrooms", 2.5),
+    ]
+    for column, value in corruptions:
+        rows = rng.choice(len(df), int(len(df) * bad_fraction / len(corruptions)), replace=False)
+        df.loc[rows, column] = value
+    return df
+
+
+def validate_per_row(df):
+    '''
+    The same rules checked row by row, as a plain Python loop would.
+    '''
+    renamed = FeatureEngineer().transform(df)
+    rules = [(column, rule) for column, rule in VALIDATION_RULES.items() if column in renamed.columns]
+    valid = []
+    for record in renamed.to_dict("records"):
+        ok = True
+        for column, rule in rules:
+            value = record[column]
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                ok = ok and rule["nullable"]
+            elif rule["kind"] == "category":
+                ok = ok and value in rule["categories"]
+            else:
+                try:
+                    number = float(value)
+                except (TypeError, ValueError):
+                    ok = False
+                    continue
+                ok = ok and number >= rule.get("min", -math.inf) and number <= rule.get("max", math.inf)
+                if rule.get("integer"):
+                    ok = ok and number.is_integer()
+        valid.append(ok)
+    return np.array(valid)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source-path", default=os.path.join("research", "data", "Raw_Housing_Prices.csv"))
+    parser.add_argument("--scale", type=int, default=50)
+    parser.add_argument("--bad-fraction", type=float, default=0.01)
+    parser.add_argument("--baseline-rows", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    df = scaled_frame(args.source_path, args.scale, args.bad_fraction)
+    validation = DataValidation()
+    print(f"{len(df):,} rows")
+
+    rows = []
+    (valid, quarantined, report), seconds = timed(validation.validate, df, require_target=True)
+    rows.append({"mode": "vectorized", "rows": f"{len(df):,}", "seconds": f"{seconds:.2f}",
+                 "rows_per_sec": f"{len(df) / seconds:,.0f}", "quarantined": f"{len(quarantined):,}"})
+
+    as_strings = df.astype({"Flat Area (in Sqft)": object})
+    as_strings.loc[as_strings.index[::1000], "Flat Area (in Sqft)"] = "n/a"
+    (_, quarantined_strings, _), seconds = timed(validation.validate, as_strings, require_target=True)
+    rows.append({"mode": "vectorized, object area column", "rows": f"{len(df):,}", "seconds": f"{seconds:.2f}",
+                 "rows_per_sec": f"{len(df) / seconds:,.0f}", "quarantined": f"{len(quarantined_strings):,}"})
+
+    sample = df.iloc[:args.baseline_rows]
+    per_row_valid, seconds = timed(validate_per_row, sample)
+    rows.append({"mode": "per-row Python (extrapolated)", "rows": f"{len(df):,}",
+                 "seconds": f"{seconds * len(df) / len(sample):.2f}",
+                 "rows_per_sec": f"{len(sample) / seconds:,.0f}",
+                 "quarantined": f"~{int((~per_row_valid).sum() * len(df) / len(sample)):,}"})
+
+    print_table(rows, ["mode", "rows", "seconds", "rows_per_sec", "quarantined"])
+    print("failures:", report["failures"])
+
+
+if __name__ == "__main__":
+    main()
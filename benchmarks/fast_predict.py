@@ -0,0 +1,83 @@
+'''
+p50/p99 latency of PredictPipeline.predict versus the FastPredictor path for batch
+sizes 1, 32 and 1024, with the artifacts already loaded. Also checks that both paths
+agree to within 1e-6, for the trained model and for an early-stopped XGBoost model.
+
+    python -m benchmarks.fast_predict [--iterations 500]
+'''
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table
+from src.components.feature_engineering import FeatureEngineer
+from src.pipeline.fast_predict import FastPredictor
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.utils import measure_latency
+
+
+def early_stopped_xgb_diff(features, train_path, preprocessor):
+    '''
+    Max |model.predict - FastPredictor| of an XGBRegressor fitted with early stopping, which
+    keeps rounds past best_iteration that model.predict leaves out.
+    '''
+    from xgboost import XGBRegressor
+
+    from src.components.data_transformation import DataTransformation
+    from src.model_io import xgb_best_iteration
+    from src.model_search import fit_estimator
+
+    X_train, y_train = DataTransformation().split_features_target(pd.read_csv(train_path))
+    model = fit_estimator(XGBRegressor(n_estimators=500, learning_rate=0.5, random_state=42),
+                          preprocessor.transform(X_train), y_train.to_numpy(), early_stopping=True)
+    print(f"early-stopped XGBRegressor: best_iteration {xgb_best_iteration(model)} "
+          f"of {model.get_booster().num_boosted_rounds()} rounds")
+    fast = FastPredictor.from_artifacts(model, preprocessor)
+    return np.abs(model.predict(preprocessor.transform(features)) - fast.predict(features)).max()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-path", default=os.path.join("artifacts", "test.csv"))
+    parser.add_argument("--train-path", default=os.path.join("artifacts", "train.csv"))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    # Score frames shaped like CustomData.get_data_as_data_frame(), with the derived fields present
+    features = FeatureEngineer().transform(pd.read_csv(args.data_path))
+    features = features.drop(columns=["ID", "Date_House_was_Sold", "Renovated_Year", "Purchase_Year",
+                                      "Sale_Price", "No_of_Times_Visited"])
+
+    pipeline = PredictPipeline()
+    fast_pipeline = PredictPipeline()
+    fast_pipeline.predict_pipeline_config.use_fast_path = True
+
+    max_diff = np.abs(pipeline.predict(features) - fast_pipeline.predict(features)).max()
+    print(f"max |PredictPipeline - FastPredictor| = {max_diff:.3g}")
+    assert max_diff <= 1e-6
+    max_diff = early_stopped_xgb_diff(features, args.train_path, pipeline.load_artifacts()[1])
+    print(f"max |XGBRegressor.predict - FastPredictor| after early stopping = {max_diff:.3g}")
+    assert max_diff <= 1e-6
+
+    rows = []
+    for batch_size in args.batch_sizes:
+        batch = features.iloc[:batch_size]
+        iterations = max(20, args.iterations // max(1, batch_size // 32))
+        for name, func in [("PredictPipeline", pipeline.predict), ("FastPredictor", fast_pipeline.predict)]:
+            timings = measure_latency(func, batch, iterations) * 1000
+            rows.append({
+                "path": name,
+                "batch_size": batch_size,
+                "p50_ms": f"{np.percentile(timings, 50):.3f}",
+                "p99_ms": f"{np.percentile(timings, 99):.3f}",
+                "rows_per_sec": f"{batch_size / np.percentile(timings, 50) * 1000:,.0f}",
+            })
+
+    print_table(rows, ["path", "batch_size", "p50_ms", "p99_ms", "rows_per_sec"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+'''
+Throughput of the shared FeatureEngineer against the previous per-split derivation
+(rename, then pd.DatetimeIndex without a format) on a replicated artifacts/data.csv.
+
+    python -m benchmarks.feature_engineering [--replicas 10]
+'''
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table, timed
+from src.components.feature_engineering import RAW_COLUMN_MAPPING, FeatureEngineer
+
+
+def legacy_feature_engineering(df):
+    df = df.rename(columns=RAW_COLUMN_MAPPING)
+    df['Ever_Renovated'] = np.where(df['Renovated_Year'] == 0, 'No', 'Yes')
+    df['Purchase_Year'] = pd.DatetimeIndex(df['Date_House_was_Sold']).year
+    df['Years_Since_Renovation'] = np.where(
+        df['Ever_Renovated'] == 'Yes',
+        abs(df['Purchase_Year'] - df['Renovated_Year']),
+        0
+    )
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-path", default=os.path.join("artifacts", "data.csv"))
+    parser.add_argument("--replicas", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.data_path)
+    df = pd.concat([df] * args.replicas, ignore_index=True)
+
+    feature_engineer = FeatureEngineer()
+    rows = []
+    for name, func in [("legacy", legacy_feature_engineering), ("FeatureEngineer", feature_engineer.transform)]:
+        seconds = min(timed(func, df)[1] for _ in range(args.repeat))
+        rows.append({
+            "implementation": name,
+            "rows": len(df),
+            "seconds": f"{seconds:.3f}",
+            "rows_per_sec": f"{len(df) / seconds:,.0f}",
+        })
+
+    print_table(rows, ["implementation", "rows", "seconds", "rows_per_sec"])
+
+
+if __name__ == "__main__":
+    main()
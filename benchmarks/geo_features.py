@@ -0,0 +1,99 @@
+'''
+Neighbor price features (src.components.geo_features): test R² of an XGBoost model with and
+without them, the cost of the leave-one-out features over the training split, and the
+load time and batched query latency of a persisted index scaled up to millions of sales
+(training sales replicated with ~100 m of coordinate jitter).
+
+    python -m benchmarks.geo_features [--scales 1 60 120] [--iterations 50]
+'''
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table, timed
+from src.components.data_transformation import DataTransformation
+from src.components.geo_features import GEO_COLUMNS, NeighborPriceIndex, neighbor_features
+from src.utils import load_object, measure_latency, save_object
+
+
+def transformed_arrays(use_geo_features, tmp_dir):
+    data_transformation = DataTransformation()
+    config = data_transformation.data_transformation_config
+    config.use_artifact_store = False
+    config.use_geo_features = use_geo_features
+    config.preprocessor_obj_file_path = os.path.join(tmp_dir, "preprocessor.pkl")
+    config.geo_index_file_path = os.path.join(tmp_dir, "geo_index.pkl")
+    (train_arr, test_arr, _), seconds = timed(
+        data_transformation.initiate_data_transformation,
+        os.path.join("artifacts", "train.csv"), os.path.join("artifacts", "test.csv"),
+    )
+    return train_arr, test_arr, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 60, 120])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    from sklearn.metrics import r2_score
+    from xgboost import XGBRegressor
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for use_geo_features in (False, True):
+            train_arr, test_arr, seconds = transformed_arrays(use_geo_features, tmp_dir)
+            model = XGBRegressor(n_estimators=300, learning_rate=0.05, random_state=42)
+            model.fit(train_arr[:, :-1], train_arr[:, -1])
+            rows.append({
+                "features": "with neighbor prices" if use_geo_features else "baseline",
+                "n_features": train_arr.shape[1] - 1,
+                "transform_s": f"{seconds:.2f}",
+                "xgb_test_r2": f"{r2_score(test_arr[:, -1], model.predict(test_arr[:, :-1])):.4f}",
+            })
+    print_table(rows, ["features", "n_features", "transform_s", "xgb_test_r2"])
+    print()
+
+    features, target = DataTransformation().split_features_target(pd.read_csv(os.path.join("artifacts", "train.csv")))
+    features = features[GEO_COLUMNS].assign(price=target.to_numpy()).dropna()
+    queries = pd.read_csv(os.path.join("artifacts", "test.csv"))[GEO_COLUMNS].dropna().to_numpy()
+    rng = np.random.default_rng(0)
+    fill = np.array([features["price"].median(), features["price"].median(), 0.0])
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scales:
+            coordinates = np.tile(features[GEO_COLUMNS].to_numpy(), (scale, 1))
+            if scale > 1:
+                coordinates = coordinates + rng.normal(0, 0.001, coordinates.shape)
+            prices = np.tile(features["price"].to_numpy(), scale)
+            index, build_seconds = timed(NeighborPriceIndex, coordinates, prices)
+            index_path = os.path.join(tmp_dir, "geo_index.pkl")
+            save_object(index_path, index)
+            index, load_seconds = timed(load_object, index_path)
+
+            row = {
+                "sales": f"{len(index):,}",
+                "build_s": f"{build_seconds:.2f}",
+                "size_mb": f"{os.path.getsize(index_path) / 2**20:.0f}",
+                "load_ms": f"{load_seconds * 1000:.0f}",
+            }
+            for batch_size in args.batch_sizes:
+                batch = queries[np.arange(batch_size) % len(queries)]
+                timings = measure_latency(lambda rows: neighbor_features(index, rows, 10, 1.0, fill), batch,
+                                          max(5, args.iterations // max(1, batch_size // 32))) * 1000
+                row[f"p50_ms@{batch_size}"] = f"{np.percentile(timings, 50):.2f}"
+            if scale == 1:
+                _, loo_seconds = timed(index.query, coordinates, 10, 1.0, np.arange(len(index)))
+                print(f"Leave-one-out features for {len(index):,} training sales: {loo_seconds:.2f}s")
+            rows.append(row)
+
+    print_table(rows, list(rows[0]))
+
+
+if __name__ == "__main__":
+    main()
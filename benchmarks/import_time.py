@@ -0,0 +1,119 @@
+'''
+Cold-start cost of the serving and training entry points, each measured in a fresh
+interpreter with `python -X importtime`: total import time, the heaviest top-level
+imports and whether the training-only libraries were pulled in. Then the time to the
+first prediction (import + load_artifacts + one-row predict) per artifact format.
+
+    python -m benchmarks.import_time [--repeat 3]
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import print_table
+
+
+MODULES = [
+    "src.pipeline.predict_pipeline",
+    "src.pipeline.fast_predict",
+    "src.pipeline.prediction_service",
+    "src.components.model_trainer",
+]
+
+HEAVY_PACKAGES = ["sklearn", "catboost", "xgboost", "scipy"]
+
+FIRST_PREDICTION = '''
+import json, time
+start = time.perf_counter()
+from src.pipeline.predict_pipeline import CustomData, PredictPipeline
+imported = time.perf_counter()
+pipeline = PredictPipeline()
+pipeline.predict_pipeline_config.artifact_format = {artifact_format!r}
+pipeline.load_artifacts()
+loaded = time.perf_counter()
+pipeline.predict(CustomData(
+    No_of_Bedrooms=3, No_of_Bathrooms=2.0, Flat_Area=1800, Lot_Area=5000, No_of_Floors=1,
+    Waterfront_View="No", Condition_of_the_House="Fair", Overall_Grade=7,
+    Area_of_the_House_from_Basement=1800, Basement_Area=0, Age_of_House=30, Zipcode=98103,
+    Latitude=47.6, Longitude=-122.3, Living_Area_after_Renovation=1800,
+    Lot_Area_after_Renovation=5000, Ever_Renovated="No", Years_Since_Renovation=0,
+).get_data_as_data_frame())
+predicted = time.perf_counter()
+print(json.dumps([imported - start, loaded - imported, predicted - loaded]))
+'''
+
+
+def python_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    return env
+
+
+def import_profile(module):
+    '''
+    Imports module in a fresh interpreter, run from an empty directory so that any file
+    created at import time shows up. Returns (cumulative ms per top-level import, files created).
+    '''
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=cwd, env=python_env(), capture_output=True, text=True, check=True)
+        created = os.listdir(cwd)
+
+    # Lines read "import time: self [us] | cumulative | <indent>name"; keep every module's
+    # cumulative time, a package and its submodules end up under the package name
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        if cumulative_us.strip().isdigit():
+            cumulative[name.strip()] = max(cumulative.get(name.strip(), 0), int(cumulative_us) / 1000)
+    return cumulative, created
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for module in MODULES:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        cumulative, created = min(runs, key=lambda run: run[0][module])
+        packages = [name for name in cumulative if "." not in name and not name.startswith("_")
+                    and name not in ("src", "site", "encodings")]
+        heaviest = sorted(packages, key=cumulative.get, reverse=True)[:3]
+        rows.append({
+            "module": module,
+            "import_ms": f"{cumulative[module]:.0f}",
+            "heaviest": ", ".join(f"{name} {cumulative[name]:.0f}" for name in heaviest),
+            "heavy_libs": ", ".join(p for p in HEAVY_PACKAGES if p in cumulative) or "-",
+            "files_created": ", ".join(created) or "-",
+        })
+    print(f"best of {args.repeat} fresh interpreters, times in ms")
+    print_table(rows, ["module", "import_ms", "heaviest", "heavy_libs", "files_created"])
+
+    rows = []
+    for artifact_format in ["pickle", "bundle"]:
+        runs = []
+        for _ in range(args.repeat):
+            result = subprocess.run([sys.executable, "-c", FIRST_PREDICTION.format(artifact_format=artifact_format)],
+                                    env=python_env(), capture_output=True, text=True, check=True)
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        import_s, load_s, predict_s = min(runs, key=sum)
+        rows.append({
+            "artifact_format": artifact_format,
+            "import_ms": f"{import_s * 1000:.0f}",
+            "load_ms": f"{load_s * 1000:.0f}",
+            "first_predict_ms": f"{predict_s * 1000:.0f}",
+            "total_ms": f"{(import_s + load_s + predict_s) * 1000:.0f}",
+        })
+    print("\ntime to first prediction")
+    print_table(rows, ["artifact_format", "import_ms", "load_ms", "first_predict_ms", "total_ms"])
+
+
+if __name__ == "__main__":
+    main()
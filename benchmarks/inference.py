@@ -0,0 +1,135 @@
+'''
+Serving cost of every candidate model next to its test R²: cold model load time,
+preprocessor.transform and model.predict p50/p99 latency and throughput at several batch
+sizes, on-disk size and peak memory. Each candidate is profiled in a fresh interpreter, so
+load time includes importing its library and peak memory is its own.
+
+Candidates are the models ModelTrainer saved to artifacts/candidates, which it only does
+when asked (python -m src.pipeline.train_pipeline --save-candidates); without them only
+artifacts/model.pkl is profiled.
+
+    python -m benchmarks.inference [--batch-sizes 1 32 1024] [--iterations 200] [--output report.json]
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import peak_rss_mb, print_table
+
+RUN_PROFILE = '''
+import json
+from benchmarks.inference import profile_candidate
+print(json.dumps(profile_candidate({model_path!r}, {preprocessor_path!r}, {data_path!r}, {batch_sizes!r}, {iterations!r})))
+'''
+
+
+def profile_candidate(model_path, preprocessor_path, data_path, batch_sizes, iterations):
+    import time
+
+    import numpy as np
+    from src.components.data_transformation import DataTransformation
+    from src.utils import load_object, measure_latency, read_dataset
+
+    # The preprocessor is shared by every candidate, so only the model load is timed; it
+    # includes importing the model's library
+    preprocessor = load_object(preprocessor_path)
+    start = time.perf_counter()
+    model = load_object(model_path)
+    load_seconds = time.perf_counter() - start
+
+    features, _ = DataTransformation().split_features_target(read_dataset(data_path))
+    X = preprocessor.transform(features)
+    result = {"load_ms": load_seconds * 1000, "batches": []}
+    for batch_size in batch_sizes:
+        rows = np.arange(batch_size) % len(features)
+        frame, array = features.iloc[rows], X[rows]
+        n = max(10, iterations // max(1, batch_size // 32))
+        timings = {
+            "transform": measure_latency(preprocessor.transform, frame, n) * 1000,
+            "predict": measure_latency(model.predict, array, n) * 1000,
+        }
+        entry = {"batch_size": batch_size}
+        for step, values in timings.items():
+            entry[f"{step}_p50_ms"] = float(np.percentile(values, 50))
+            entry[f"{step}_p99_ms"] = float(np.percentile(values, 99))
+        entry["rows_per_sec"] = batch_size / (entry["transform_p50_ms"] + entry["predict_p50_ms"]) * 1000
+        result["batches"].append(entry)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def load_candidates(candidates_dir, model_path):
+    index_path = os.path.join(candidates_dir, "candidates.json")
+    if not os.path.exists(index_path):
+        return {"model.pkl": {"path": model_path, "test_score": None}}
+    with open(index_path) as file_obj:
+        index = json.load(file_obj)
+    return {
+        name: {"path": os.path.join(candidates_dir, entry["file"]), "test_score": entry["test_score"]}
+        for name, entry in index.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates-dir", default=os.path.join("artifacts", "candidates"))
+    parser.add_argument("--model-path", default=os.path.join("artifacts", "model.pkl"))
+    parser.add_argument("--preprocessor-path", default=os.path.join("artifacts", "preprocessor.pkl"))
+    parser.add_argument("--data-path", default=os.path.join("artifacts", "test.csv"))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", default=None, help="Also write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    results = {}
+    for name, candidate in load_candidates(args.candidates_dir, args.model_path).items():
+        script = RUN_PROFILE.format(model_path=candidate["path"], preprocessor_path=args.preprocessor_path,
+                                    data_path=args.data_path, batch_sizes=args.batch_sizes,
+                                    iterations=args.iterations)
+        out = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+        results[name] = {
+            "test_score": candidate["test_score"],
+            "size_mb": os.path.getsize(candidate["path"]) / 2**20,
+            **json.loads(out.stdout.strip().splitlines()[-1]),
+        }
+
+    ranked = sorted(results, key=lambda name: -(results[name]["test_score"] or 0))
+    single, largest = min(args.batch_sizes), max(args.batch_sizes)
+    summary = []
+    for name in ranked:
+        result = results[name]
+        by_size = {entry["batch_size"]: entry for entry in result["batches"]}
+        summary.append({
+            "model": name,
+            "test_r2": "-" if result["test_score"] is None else f"{result['test_score']:.4f}",
+            "size_mb": f"{result['size_mb']:.2f}",
+            "load_ms": f"{result['load_ms']:.0f}",
+            "peak_rss_mb": f"{result['peak_rss_mb']:.0f}",
+            f"predict_p50_ms@{single}": f"{by_size[single]['predict_p50_ms']:.3f}",
+            f"predict_p99_ms@{single}": f"{by_size[single]['predict_p99_ms']:.3f}",
+            f"rows_per_sec@{largest}": f"{by_size[largest]['rows_per_sec']:,.0f}",
+        })
+    print_table(summary, list(summary[0]))
+    print()
+
+    detail = []
+    for name in ranked:
+        for entry in results[name]["batches"]:
+            detail.append({"model": name, **{
+                key: value if key == "batch_size" else (f"{value:,.0f}" if key == "rows_per_sec" else f"{value:.3f}")
+                for key, value in entry.items()
+            }})
+    print_table(detail, list(detail[0]))
+
+    if args.output:
+        with open(args.output, "w") as file_obj:
+            json.dump(results, file_obj, indent=2)
+
+
+if __name__ == "__main__":
+    main()
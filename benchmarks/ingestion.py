@@ -0,0 +1,79 @@
+'''
+Peak memory and wall time of DataIngestion on a source file scaled up from the sample
+(50x by default, ~1M rows): reading the whole CSV and calling train_test_split against
+streaming it in chunks with the hash split on ID. Each mode runs in a fresh interpreter
+in a scratch directory, with the artifact store on.
+
+    python -m benchmarks.ingestion [--scale 50] [--chunksize 100000]
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from benchmarks.common import print_table
+
+
+RUN_INGESTION = '''
+import json, time
+from benchmarks.common import peak_rss_mb
+from src.components.data_ingestion import DataIngestion
+ingestion = DataIngestion()
+ingestion.ingestion_config.source_data_path = {source!r}
+ingestion.ingestion_config.chunksize = {chunksize!r}
+start = time.perf_counter()
+train_path, test_path = ingestion.initiate_data_ingestion()
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "peak_rss_mb": peak_rss_mb()}}))
+'''
+
+
+def write_scaled_source(source_path, out_path, scale):
+    '''
+    Writes scale copies of the source rows, each copy with its own IDs, one copy at a time.
+    '''
+    df = pd.read_csv(source_path)
+    for copy in range(scale):
+        df.assign(ID=df["ID"] + copy * 10**10).to_csv(out_path, mode="w" if copy == 0 else "a",
+                                                    header=copy == 0, index=False)
+    return len(df) * scale
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source-path", default=os.path.join("research", "data", "Raw_Housing_Prices.csv"))
+    parser.add_argument("--scale", type=int, default=50)
+    parser.add_argument("--chunksize", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, "source.csv")
+        n_rows = write_scaled_source(args.source_path, source, args.scale)
+        print(f"{n_rows:,} source rows, {os.path.getsize(source) / 2**20:.0f} MB")
+
+        for name, chunksize in [("read whole + train_test_split", None), (f"chunks of {args.chunksize}", args.chunksize)]:
+            with tempfile.TemporaryDirectory(dir=tmp_dir) as cwd:
+                result = subprocess.run(
+                    [sys.executable, "-c", RUN_INGESTION.format(source=source, chunksize=chunksize)],
+                    cwd=cwd, env=env, capture_output=True, text=True, check=True,
+                )
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            rows.append({
+                "mode": name,
+                "seconds": f"{stats['seconds']:.1f}",
+                "peak_rss_mb": f"{stats['peak_rss_mb']:.0f}",
+            })
+
+    print_table(rows, ["mode", "seconds", "peak_rss_mb"])
+
+
+if __name__ == "__main__":
+    main()
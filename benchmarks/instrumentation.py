@@ -0,0 +1,94 @@
+'''
+Overhead of src.instrumentation: the cost of one span and one timed() call while
+disabled, enabled with metrics only, and enabled with JSON records and RSS tracking; then
+p50/p99 of PredictPipeline.predict (fast path, artifacts loaded) with instrumentation off
+and on, for batch sizes 1, 32 and 1024.
+
+    python -m benchmarks.instrumentation [--iterations 2000] [--calls 200000]
+'''
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table
+from src.components.feature_engineering import FeatureEngineer
+from src.instrumentation import instrumentation
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.utils import measure_latency
+
+
+def per_call_ns(n_calls):
+    def with_span():
+        with instrumentation.span("bench.span", rows=1):
+            pass
+
+    @instrumentation.timed("bench.timed")
+    def decorated():
+        pass
+
+    costs = {}
+    for name, func in (("span", with_span), ("timed", decorated)):
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            func()
+        costs[name] = (time.perf_counter() - start) / n_calls * 1e9
+    return costs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-path", default=os.path.join("artifacts", "test.csv"))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "instrumentation.jsonl")
+        modes = [
+            ("disabled", lambda: instrumentation.disable()),
+            ("metrics only", lambda: instrumentation.enable(log_path="", track_memory=False)),
+            ("json log + rss", lambda: instrumentation.enable(log_path=log_path, track_memory=True)),
+        ]
+
+        rows = []
+        for mode, switch in modes:
+            switch()
+            costs = per_call_ns(args.calls if mode == "disabled" else args.calls // 10)
+            rows.append({"mode": mode, "span_ns": f"{costs['span']:,.0f}", "timed_ns": f"{costs['timed']:,.0f}"})
+        instrumentation.disable()
+        print_table(rows, ["mode", "span_ns", "timed_ns"])
+        print()
+
+        features = FeatureEngineer().transform(pd.read_csv(args.data_path))
+        features = features.drop(columns=["ID", "Date_House_was_Sold", "Renovated_Year", "Purchase_Year",
+                                          "Sale_Price", "No_of_Times_Visited"])
+        pipeline = PredictPipeline()
+        pipeline.predict_pipeline_config.use_fast_path = True
+        pipeline.predict(features.iloc[:1])
+
+        rows = []
+        for batch_size in args.batch_sizes:
+            batch = features.iloc[np.arange(batch_size) % len(features)]
+            iterations = max(50, args.iterations // max(1, batch_size // 32))
+            row = {"batch_size": batch_size}
+            for mode, switch in (modes[0], modes[2]):
+                switch()
+                timings = measure_latency(pipeline.predict, batch, iterations) * 1000
+                row[f"{mode} p50_ms"] = f"{np.percentile(timings, 50):.3f}"
+                row[f"{mode} p99_ms"] = f"{np.percentile(timings, 99):.3f}"
+            instrumentation.disable()
+            rows.append(row)
+        print_table(rows, list(rows[0]))
+
+        with open(log_path) as file_obj:
+            records = file_obj.readlines()
+        print(f"\n{len(records):,} JSON records, e.g. {records[-1].strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+'''
+Load test for the prediction service: fires single-house /predict requests from an
+increasing number of concurrent clients and reports throughput and latency per level,
+which shows how micro-batching scales with concurrency.
+
+    python -m benchmarks.load_test --start-server
+    python -m benchmarks.load_test --url http://localhost:8000
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table
+from src.components.feature_engineering import FeatureEngineer
+from src.pipeline.prediction_service import HouseFeatures
+
+
+def load_payloads(data_path, n):
+    df = FeatureEngineer().transform(pd.read_csv(data_path)).head(n)
+    fields = list(HouseFeatures.model_fields)
+    return [json.dumps(record).encode() for record in df[fields].to_dict(orient="records")]
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def wait_until_healthy(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/health") as response:
+                return json.loads(response.read())
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"Service at {url} did not become healthy")
+
+
+def run_level(url, payloads, concurrency, n_requests):
+    bodies = [payloads[i % len(payloads)] for i in range(n_requests)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(lambda body: post(f"{url}/predict", body), bodies))
+        elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "req_per_sec": f"{n_requests / elapsed:,.0f}",
+        "p50_ms": f"{np.percentile(latencies, 50):.1f}",
+        "p99_ms": f"{np.percentile(latencies, 99):.1f}",
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--start-server", action="store_true", help="launch the service in a subprocess first")
+    parser.add_argument("--data-path", default=os.path.join("artifacts", "test.csv"))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.start_server:
+        port = args.url.rsplit(":", 1)[-1]
+        server = subprocess.Popen([sys.executable, "-m", "src.pipeline.prediction_service", "--port", port])
+    try:
+        wait_until_healthy(args.url)
+        payloads = load_payloads(args.data_path, 1000)
+        rows = [run_level(args.url, payloads, level, args.requests) for level in args.concurrency]
+        print_table(rows, ["concurrency", "requests", "req_per_sec", "p50_ms", "p99_ms"])
+        health = wait_until_healthy(args.url)
+        print(f"rows per predict call: {health['rows'] / max(1, health['batches']):.1f}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+'''
+Cold load time and on-disk size of the pickled artifacts versus the model bundle.
+Every load runs in a fresh interpreter so import and page-cache effects of earlier
+loads do not leak into the measurement.
+
+    python -m benchmarks.model_artifacts [--repeat 5]
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import print_table
+
+LOADERS = {
+    "pickle": (
+        "from src.utils import load_object\n"
+        "model = load_object({model_path!r}); preprocessor = load_object({preprocessor_path!r})"
+    ),
+    "bundle": (
+        "from src.model_io import load_model_bundle\n"
+        "model, preprocessor = load_model_bundle({bundle_dir!r}, allow_pickle=True)"
+    ),
+}
+
+SCRIPT = '''
+import json, time
+start = time.perf_counter()
+{loader}
+print(json.dumps({{"seconds": time.perf_counter() - start}}))
+'''
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def cold_load_seconds(loader, repeat, **paths):
+    script = SCRIPT.format(loader=LOADERS[loader].format(**paths))
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+        timings.append(json.loads(out.stdout.strip().splitlines()[-1])["seconds"])
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-path", default=os.path.join("artifacts", "model.pkl"))
+    parser.add_argument("--preprocessor-path", default=os.path.join("artifacts", "preprocessor.pkl"))
+    parser.add_argument("--bundle-dir", default=os.path.join("artifacts", "model_bundle"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    paths = {
+        "model_path": args.model_path,
+        "preprocessor_path": args.preprocessor_path,
+        "bundle_dir": args.bundle_dir,
+    }
+    sizes = {
+        "pickle": os.path.getsize(args.model_path) + os.path.getsize(args.preprocessor_path),
+        "bundle": dir_size(args.bundle_dir),
+    }
+    rows = [
+        {
+            "format": loader,
+            "size_kb": f"{sizes[loader] / 1024:.1f}",
+            "cold_load_ms": f"{cold_load_seconds(loader, args.repeat, **paths) * 1000:.1f}",
+        }
+        for loader in LOADERS
+    ]
+    print_table(rows, ["format", "size_kb", "cold_load_ms"])
+
+
+if __name__ == "__main__":
+    main()
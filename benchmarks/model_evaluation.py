@@ -0,0 +1,83 @@
+'''
+Cost of ModelEvaluation.evaluate on a ~1M-row test set (the test split replicated): metrics
+overall and per zipcode, grade and condition with 200-resample bootstrap intervals, against
+sklearn metrics per pandas group and a Python loop over resamples (timed on a few resamples
+and extrapolated). Predictions come from artifacts/model.pkl and are timed separately.
+
+    python -m benchmarks.model_evaluation [--scale 230] [--n-bootstrap 200] [--baseline-resamples 5]
+'''
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table, timed
+from src.components.data_transformation import DataTransformation
+from src.components.model_evaluation import ModelEvaluation
+from src.utils import load_object
+
+
+def loop_evaluate(y_true, y_pred, segments, n_resamples, seed=0):
+    '''
+    The same report the straightforward way: sklearn metrics per groupby group, then every
+    resample drawn and scored on its own.
+    '''
+    from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, mean_squared_error, r2_score
+
+    def metrics(y, p):
+        return [r2_score(y, p), mean_absolute_error(y, p), mean_squared_error(y, p) ** 0.5,
+                mean_absolute_percentage_error(y, p)]
+
+    frame = pd.DataFrame({"y": y_true, "p": y_pred, **segments})
+    rng = np.random.default_rng(seed)
+    for _ in range(n_resamples + 1):
+        metrics(frame["y"], frame["p"])
+        for name in segments:
+            for _, group in frame.groupby(name, dropna=False):
+                if len(group) > 1:
+                    metrics(group["y"], group["p"])
+        frame = frame.iloc[rng.integers(0, len(frame), len(frame))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--test-path", default=os.path.join("artifacts", "test.csv"))
+    parser.add_argument("--scale", type=int, default=230)
+    parser.add_argument("--n-bootstrap", type=int, default=200)
+    parser.add_argument("--baseline-resamples", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    test_df = pd.read_csv(args.test_path)
+    test_df = pd.concat([test_df] * args.scale, ignore_index=True)
+    features, target = DataTransformation().split_features_target(test_df)
+    X_test = load_object(os.path.join("artifacts", "preprocessor.pkl")).transform(features)
+    model = load_object(os.path.join("artifacts", "model.pkl"))
+    y_pred, predict_seconds = timed(model.predict, X_test)
+
+    evaluation = ModelEvaluation()
+    evaluation.model_evaluation_config.n_bootstrap = args.n_bootstrap
+    segments = {column: features[column].to_numpy() for column in evaluation.model_evaluation_config.segment_columns}
+    n = len(target)
+    print(f"{n:,} test rows, {type(model).__name__}.predict {predict_seconds:.2f}s")
+
+    rows = []
+    for n_bootstrap in (0, args.n_bootstrap):
+        evaluation.model_evaluation_config.n_bootstrap = n_bootstrap
+        report, seconds = timed(evaluation.evaluate, target.to_numpy(), y_pred, segments)
+        rows.append({"mode": f"vectorized, {n_bootstrap} resamples", "seconds": f"{seconds:.2f}"})
+
+    _, seconds = timed(loop_evaluate, target.to_numpy(), y_pred, segments, args.baseline_resamples)
+    per_pass = seconds / (args.baseline_resamples + 1)
+    rows.append({"mode": "sklearn + groupby, no resamples (est.)", "seconds": f"{per_pass:.2f}"})
+    rows.append({"mode": f"sklearn + groupby, {args.n_bootstrap} resamples (est.)",
+                 "seconds": f"{per_pass * (args.n_bootstrap + 1):.0f}"})
+
+    print_table(rows, ["mode", "seconds"])
+    overall = report["overall"]
+    print(f"R2 {overall['r2']:.4f} [{overall['ci']['r2'][0]:.4f}, {overall['ci']['r2'][1]:.4f}], "
+          + ", ".join(f"{name}: {len(entries)} segments" for name, entries in report["segments"].items()))
+
+
+if __name__ == "__main__":
+    main()
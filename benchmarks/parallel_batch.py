@@ -0,0 +1,56 @@
+'''
+Scaling of BatchPredictPipeline over worker processes: artifacts/data.csv replicated --scale
+times (~430k rows by default) is scored with 1, 2, 4 and 8 workers, and every output is
+compared byte for byte with the single-process one. The speedup is bounded by the cores
+reported at the top; past that the workers only add process and pickling overhead.
+
+    python -m benchmarks.parallel_batch [--scale 20] [--workers 1 2 4 8] [--chunksize 20000] [--fast-path]
+'''
+import argparse
+import filecmp
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.common import print_table, timed
+from src.pipeline.batch_predict import BatchPredictConfig, BatchPredictPipeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-path", default=os.path.join("artifacts", "data.csv"))
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunksize", type=int, default=20_000)
+    parser.add_argument("--start-method", default=None, choices=["fork", "spawn", "forkserver"])
+    parser.add_argument("--fast-path", action="store_true", help="Score through src.pipeline.fast_predict")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "input.csv")
+        pd.concat([pd.read_csv(args.data_path)] * args.scale, ignore_index=True).to_csv(input_path, index=False)
+        print(f"{os.cpu_count()} cores, {os.path.getsize(input_path) / 2**20:.0f} MB input")
+
+        rows, baseline = [], None
+        for n_workers in args.workers:
+            config = BatchPredictConfig(chunksize=args.chunksize, n_workers=n_workers, start_method=args.start_method)
+            pipeline = BatchPredictPipeline(config)
+            pipeline.predict_pipeline.predict_pipeline_config.use_fast_path = args.fast_path
+            output_path = os.path.join(tmp_dir, f"output_{n_workers}.csv")
+            stats, seconds = timed(pipeline.run, input_path, output_path)
+            baseline = baseline or (output_path, seconds)
+            rows.append({
+                "workers": n_workers,
+                "rows": f"{stats['rows']:,}",
+                "seconds": f"{seconds:.2f}",
+                "rows_per_sec": f"{stats['rows_per_sec']:,.0f}",
+                "speedup": f"{baseline[1] / seconds:.2f}x",
+                "same_output": filecmp.cmp(baseline[0], output_path, shallow=False),
+            })
+
+    print_table(rows, list(rows[0]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+'''
+Compares the exhaustive grid with successive halving (with and without early stopping)
+on widened grids for the boosting models: wall time to the selected model and its R².
+
+    python -m benchmarks.search_strategies [--n-jobs 4] [--models XGBRegressor ...]
+'''
+import argparse
+
+from catboost import CatBoostRegressor
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.metrics import r2_score
+from xgboost import XGBRegressor
+
+from benchmarks.common import load_train_test_arrays, print_table, timed
+from src.model_search import get_search
+
+MODELS = {
+    "XGBRegressor": (
+        XGBRegressor(random_state=42),
+        {"learning_rate": [0.01, 0.03, 0.05, 0.1, 0.2], "max_depth": [3, 4, 6, 8], "n_estimators": [100, 300, 600]},
+    ),
+    "CatBoosting Regressor": (
+        CatBoostRegressor(verbose=False, random_seed=42, allow_writing_files=False),
+        {"depth": [4, 6, 8, 10], "learning_rate": [0.03, 0.05, 0.1], "iterations": [100, 300]},
+    ),
+    "Gradient Boosting": (
+        GradientBoostingRegressor(random_state=42),
+        {"learning_rate": [0.05, 0.1], "subsample": [0.6, 0.8, 1.0], "n_estimators": [100, 300]},
+    ),
+}
+
+STRATEGIES = [
+    ("grid", {}),
+    ("halving", {}),
+    ("halving", {"early_stopping": True}),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n-jobs", type=int, default=1)
+    parser.add_argument("--models", nargs="+", default=list(MODELS), choices=list(MODELS))
+    args = parser.parse_args(argv)
+
+    X_train, y_train, X_test, y_test = load_train_test_arrays()
+
+    rows = []
+    for name in args.models:
+        model, grid = MODELS[name]
+        for strategy, search_kwargs in STRATEGIES:
+            search = get_search(strategy, model, grid, cv=3, n_jobs=args.n_jobs, **search_kwargs)
+            _, seconds = timed(search.fit, X_train, y_train)
+            rows.append({
+                "model": name,
+                "strategy": strategy + (" + early stopping" if search_kwargs.get("early_stopping") else ""),
+                "seconds": f"{seconds:.1f}",
+                "cv_r2": f"{search.best_score_:.4f}",
+                "test_r2": f"{r2_score(y_test, search.best_estimator_.predict(X_test)):.4f}",
+                "best_params": search.best_params_,
+            })
+            print_table(rows[-1:], list(rows[-1]))
+
+    print()
+    print_table(rows, ["model", "strategy", "seconds", "cv_r2", "test_r2", "best_params"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+'''
+Zipcode as a scaled number, one-hot encoded, or target/frequency encoded
+(DataTransformationConfig.zipcode_encoding): feature count, preprocessor size, transform
+throughput of the fitted preprocessor and of its compiled FastPredictor form, and the size
+and test R² of a KNN and an XGBoost model trained on each.
+
+--split-zipcodes 10 also runs every encoding on a copy of the data where each zipcode is
+split into 10 (zipcode * 10 + a random digit), for a few hundred zipcodes as in the full
+dataset.
+
+    python -m benchmarks.zipcode_encoding [--split-zipcodes 1 10] [--rows 100000]
+'''
+import argparse
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table, timed
+from src.components.data_transformation import DataTransformation
+from src.pipeline.fast_predict import FastPredictor
+from src.utils import load_object
+
+
+def split_zipcodes(df, n_splits, rng):
+    if n_splits == 1:
+        return df
+    df = df.copy()
+    df["Zipcode"] = df["Zipcode"] * n_splits + rng.integers(0, n_splits, len(df))
+    return df
+
+
+def run_encoding(encoding, train_path, test_path, serve_df, tmp_dir):
+    from sklearn.metrics import r2_score
+    from sklearn.neighbors import KNeighborsRegressor
+    from xgboost import XGBRegressor
+
+    data_transformation = DataTransformation()
+    config = data_transformation.data_transformation_config
+    config.use_artifact_store = False
+    config.zipcode_encoding = encoding
+    config.preprocessor_obj_file_path = os.path.join(tmp_dir, f"preprocessor-{encoding}.pkl")
+    train_arr, test_arr, preprocessor_path = data_transformation.initiate_data_transformation(train_path, test_path)
+    X_train, y_train, X_test, y_test = train_arr[:, :-1], train_arr[:, -1], test_arr[:, :-1], test_arr[:, -1]
+
+    preprocessor = load_object(preprocessor_path)
+    features, _ = data_transformation.split_features_target(serve_df)
+    _, transform_seconds = timed(preprocessor.transform, features)
+
+    row = {
+        "encoding": encoding,
+        "n_features": X_train.shape[1],
+        "preprocessor_kb": f"{os.path.getsize(preprocessor_path) / 1024:.1f}",
+        "transform_rows_s": f"{len(features) / transform_seconds:,.0f}",
+    }
+    for name, model in (("knn", KNeighborsRegressor()),
+                        ("xgb", XGBRegressor(n_estimators=300, learning_rate=0.05, random_state=42))):
+        model.fit(X_train, y_train)
+        row[f"{name}_mb"] = f"{len(pickle.dumps(model)) / 2**20:.2f}"
+        row[f"{name}_test_r2"] = f"{r2_score(y_test, model.predict(X_test)):.4f}"
+        if name == "xgb":
+            predictor = FastPredictor.from_artifacts(model, preprocessor)
+            _, seconds = timed(predictor.transform, features)
+            row["compiled_rows_s"] = f"{len(features) / seconds:,.0f}"
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train-path", default=os.path.join("artifacts", "train.csv"))
+    parser.add_argument("--test-path", default=os.path.join("artifacts", "test.csv"))
+    parser.add_argument("--split-zipcodes", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows of the transform throughput batch")
+    args = parser.parse_args(argv)
+
+    train_df, test_df = pd.read_csv(args.train_path), pd.read_csv(args.test_path)
+    columns = ["encoding", "n_features", "preprocessor_kb", "transform_rows_s", "compiled_rows_s",
+               "knn_mb", "knn_test_r2", "xgb_mb", "xgb_test_r2"]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_splits in args.split_zipcodes:
+            rng = np.random.default_rng(0)
+            train_path, test_path = os.path.join(tmp_dir, "train.csv"), os.path.join(tmp_dir, "test.csv")
+            split_zipcodes(train_df, n_splits, rng).to_csv(train_path, index=False)
+            split_test = split_zipcodes(test_df, n_splits, rng)
+            split_test.to_csv(test_path, index=False)
+            serve_df = split_test.iloc[np.arange(args.rows) % len(split_test)].reset_index(drop=True)
+
+            rows = [run_encoding(encoding, train_path, test_path, serve_df, tmp_dir)
+                    for encoding in ("numeric", "onehot", "target")]
+            print(f"{pd.read_csv(train_path)['Zipcode'].nunique()} zipcodes, "
+                  f"transform throughput on {args.rows:,} rows")
+            print_table(rows, columns)
+            print()
+
+
+if __name__ == "__main__":
+    main()
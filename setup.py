@@ -22,6 +22,13 @@ version='0.0.1',
 author='Mayank Sharma',
 author_email='mayanksharma88112@gmail.com',
 packages=find_packages(),
-install_requires=get_requirements('requirements.txt')
+install_requires=get_requirements('requirements.txt'),
+entry_points={
+    'console_scripts': [
+        'housing-batch-predict=src.pipeline.batch_predict:main',
+        'housing-serve=src.pipeline.prediction_service:main',
+        'housing-train=src.pipeline.train_pipeline:main',
+    ],
+},
 
 )
\ No newline at end of file
@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import logging
+
+
+@dataclass
+class ArtifactStoreConfig:
+    root_dir: str=os.path.join("artifacts", "store")
+    # Entries kept per kind; every save removes the least recently used beyond that. None keeps all
+    keep_entries: int=5
+
+
+def file_digest(file_path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for block in iter(lambda: file_obj.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def params_digest(params):
+    '''
+    Digest of a params dict such as estimator.get_params(deep=True); values are hashed
+    through their repr, so nested estimators contribute their own settings.
+    '''
+    return hashlib.sha256(repr(sorted(params.items(), key=lambda item: item[0])).encode()).hexdigest()
+
+
+def array_digest(arr, block_rows=1 << 16):
+    '''
+    Digest of an array's shape, dtype and contents, hashed in row blocks so memory-mapped
+    arrays are not read in one piece.
+    '''
+    digest = hashlib.sha256(f"{arr.shape}|{arr.dtype}".encode())
+    for start in range(0, len(arr), block_rows):
+        digest.update(np.ascontiguousarray(arr[start:start + block_rows]).tobytes())
+    return digest.hexdigest()
+
+
+def source_digest(*modules):
+    '''
+    Digest of the source files of the given modules, so cached results are recomputed once
+    the code that produced them changes.
+    '''
+    import inspect
+
+    return make_key(*(file_digest(inspect.getsourcefile(module)) for module in modules))
+
+
+def make_key(*parts):
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+
+
+class ArtifactStore:
+    '''
+    Content-addressed store for intermediate datasets. Each entry is a directory named after
+    a key derived from its inputs, holding Parquet frames and .npy arrays. Entries are written
+    to a temporary directory and renamed into place, so a present entry is always complete.
+    After every save only the keep_entries most recently used entries of that kind are kept.
+    '''
+    def __init__(self, config=None):
+        self.artifact_store_config = config or ArtifactStoreConfig()
+
+    def entry_path(self, kind, key):
+        return os.path.join(self.artifact_store_config.root_dir, kind, key)
+
+    def manifest_path(self, kind, key):
+        return os.path.join(self.entry_path(kind, key), "manifest.json")
+
+    def has(self, kind, key):
+        '''
+        Whether the entry exists. A hit counts as a use, so prune() keeps the entry longer.
+        '''
+        if not os.path.isfile(self.manifest_path(kind, key)):
+            return False
+        os.utime(self.manifest_path(kind, key))
+        return True
+
+    def prune(self, kind, keep=None):
+        '''
+        Removes all but the keep (default keep_entries) most recently saved or used entries of
+        kind and returns the removed keys.
+        '''
+        try:
+            keep = self.artifact_store_config.keep_entries if keep is None else keep
+            kind_dir = os.path.join(self.artifact_store_config.root_dir, kind)
+            if keep is None or not os.path.isdir(kind_dir):
+                return []
+            # Directories starting with "." are entries still being written by save()
+            entries = [key for key in os.listdir(kind_dir)
+                       if not key.startswith(".") and os.path.isfile(self.manifest_path(kind, key))]
+            entries.sort(key=lambda key: os.path.getmtime(self.manifest_path(kind, key)), reverse=True)
+            removed = entries[keep:]
+            for key in removed:
+                shutil.rmtree(self.entry_path(kind, key), ignore_errors=True)
+            if removed:
+                logging.info(f"Pruned {len(removed)} {kind} entries from the artifact store")
+            return removed
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def save(self, kind, key, frames=None, arrays=None, files=None, metadata=None):
+        '''
+        Stores DataFrames as Parquet, arrays as .npy and copies extra files into the entry
+        for (kind, key). Returns the entry directory.
+        '''
+        try:
+            final_path = self.entry_path(kind, key)
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            tmp_path = tempfile.mkdtemp(dir=os.path.dirname(final_path), prefix=f".{key}-")
+            # mkdtemp creates the directory as 0700
+            os.chmod(tmp_path, 0o755)
+
+            for name, df in (frames or {}).items():
+                df.to_parquet(os.path.join(tmp_path, f"{name}.parquet"), index=False)
+            for name, arr in (arrays or {}).items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(arr))
+            for name, file_path in (files or {}).items():
+                shutil.copyfile(file_path, os.path.join(tmp_path, name))
+
+            manifest = {
+                "key": key,
+                "frames": sorted(frames or {}),
+                "arrays": sorted(arrays or {}),
+                "files": sorted(files or {}),
+                "metadata": metadata or {},
+            }
+            with open(os.path.join(tmp_path, "manifest.json"), "w") as file_obj:
+                json.dump(manifest, file_obj, indent=2)
+
+            if os.path.isdir(final_path):
+                shutil.rmtree(final_path)
+            os.replace(tmp_path, final_path)
+            logging.info(f"Stored {kind} entry {key}")
+            self.prune(kind)
+            return final_path
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def load_metadata(self, kind, key):
+        with open(self.manifest_path(kind, key)) as file_obj:
+            return json.load(file_obj)["metadata"]
+
+    def frame_path(self, kind, key, name):
+        return os.path.join(self.entry_path(kind, key), f"{name}.parquet")
+
+    def file_path(self, kind, key, name):
+        return os.path.join(self.entry_path(kind, key), name)
+
+    def load_frame(self, kind, key, name):
+        return pd.read_parquet(self.frame_path(kind, key, name))
+
+    def load_array(self, kind, key, name, mmap_mode="r"):
+        '''
+        Loads a stored array; by default as a read-only memory map, so no data is copied
+        until it is actually touched.
+        '''
+        return np.load(os.path.join(self.entry_path(kind, key), f"{name}.npy"), mmap_mode=mmap_mode)
@@ -2,31 +2,110 @@ import os
 import sys
 from src.exception import CustomException
 from src.logger import logging
-from src.components.data_transformation import DataTransformation
-from src.components.data_transformation import DataTransformationConfig
-
-from src.components.model_trainer import ModelTrainerConfig
-from src.components.model_trainer import ModelTrainer
+from src.artifact_store import ArtifactStore, file_digest, make_key, source_digest
+from src.instrumentation import instrumentation
+import shutil
+import tempfile
+import numpy as np
 import pandas as pd
 
 from sklearn.model_selection import train_test_split
 from dataclasses import dataclass
 
+# Column types of the raw sales file. Numeric columns other than ID are read as float64 so that
+# a chunk with gaps has the same types as one without
+RAW_DATA_DTYPES = {
+    "ID": "int64",
+    "Date House was Sold": "object",
+    "Sale Price": "float64",
+    "No of Bedrooms": "float64",
+    "No of Bathrooms": "float64",
+    "Flat Area (in Sqft)": "float64",
+    "Lot Area (in Sqft)": "float64",
+    "No of Floors": "float64",
+    "Waterfront View": "object",
+    "No of Times Visited": "object",
+    "Condition of the House": "object",
+    "Overall Grade": "float64",
+    "Area of the House from Basement (in Sqft)": "float64",
+    "Basement Area (in Sqft)": "float64",
+    "Age of House (in Years)": "float64",
+    "Renovated Year": "float64",
+    "Zipcode": "float64",
+    "Latitude": "float64",
+    "Longitude": "float64",
+    "Living Area after Renovation (in Sqft)": "float64",
+    "Lot Area after Renovation (in Sqft)": "float64",
+}
+
+
+def is_test_row(ids, test_size):
+    '''
+    Stable train/test assignment from a hash of each ID, so a row lands in the same split
+    no matter how the data is chunked, which batch it arrives in or how small the batch is.
+    Repeat sales of a house share their ID and therefore their split.
+    '''
+    ids = pd.Series(np.asarray(ids, dtype=np.int64))
+    buckets = pd.util.hash_pandas_object(ids, index=False).to_numpy() % 10000
+    return buckets < test_size * 10000
+
+
 @dataclass
 class DataIngestionConfig:
     train_data_path: str=os.path.join('artifacts',"train.csv")
     test_data_path: str=os.path.join('artifacts',"test.csv")
     raw_data_path: str=os.path.join('artifacts',"data.csv")
+    source_data_path: str=os.path.join('research','data','Raw_Housing_Prices.csv')
+    # Sales added by src.components.incremental_trainer since, in the source's columns; read
+    # after the source and part of the cache key, so the source itself is never modified
+    appended_data_path: str=os.path.join('artifacts',"appended_data.csv")
+    test_size: float=0.2
+    random_state: int=42
+    # Keep the splits as Parquet in the artifact store, keyed on the source data, and reuse them on reruns
+    use_artifact_store: bool=True
+    # Stream the source CSV in chunks of this many rows and split on a hash of ID instead of
+    # reading it whole and calling train_test_split; peak memory then depends on the chunk size
+    chunksize: int=None
 
 
 class DataIngestion:
     def __init__(self):
         self.ingestion_config=DataIngestionConfig()
 
+    def get_cache_key(self):
+        '''
+        Artifact store key of the splits: the source data and appended rows, the split settings
+        and this module's code.
+        '''
+        appended_path=self.ingestion_config.appended_data_path
+        return make_key(
+            file_digest(self.ingestion_config.source_data_path),
+            file_digest(appended_path) if os.path.exists(appended_path) else None,
+            self.ingestion_config.test_size,
+            self.ingestion_config.random_state,
+            "hash" if self.ingestion_config.chunksize else "random",
+            source_digest(sys.modules[__name__]),
+        )
+
+    @instrumentation.timed("ingest")
     def initiate_data_ingestion(self):
         logging.info("Entered the data ingestion method or component")
         try:
-            df=pd.read_csv(r'research\data\Raw_Housing_Prices.csv')
+            store=key=None
+            if self.ingestion_config.use_artifact_store:
+                store=ArtifactStore()
+                key=self.get_cache_key()
+                if store.has("ingestion",key):
+                    logging.info(f"Reusing ingested train and test splits {key} from the artifact store")
+                    return(
+                        store.frame_path("ingestion",key,"train"),
+                        store.frame_path("ingestion",key,"test")
+                    )
+
+            if self.ingestion_config.chunksize:
+                return self.ingest_in_chunks(store,key)
+
+            df=pd.concat(list(self.read_source()),ignore_index=True)
             logging.info('Read the dataset as dataframe')
 
             os.makedirs(os.path.dirname(self.ingestion_config.train_data_path),exist_ok=True)
@@ -34,7 +113,8 @@ class DataIngestion:
             df.to_csv(self.ingestion_config.raw_data_path,index=False,header=True)
 
             logging.info("Train test split initiated")
-            train_set,test_set=train_test_split(df,test_size=0.2,random_state=42)
+            train_set,test_set=train_test_split(df,test_size=self.ingestion_config.test_size,
+                                                random_state=self.ingestion_config.random_state)
 
             train_set.to_csv(self.ingestion_config.train_data_path,index=False,header=True)
 
@@ -42,6 +122,13 @@ class DataIngestion:
 
             logging.info("Ingestion of the data is completed")
 
+            if store is not None:
+                store.save("ingestion",key,frames={"train":train_set,"test":test_set})
+                return(
+                    store.frame_path("ingestion",key,"train"),
+                    store.frame_path("ingestion",key,"test")
+                )
+
             return(
                 self.ingestion_config.train_data_path,
                 self.ingestion_config.test_data_path
@@ -49,15 +136,78 @@ class DataIngestion:
             )
         except Exception as e:
             raise CustomException(e,sys)
-        
 
-if __name__=="__main__":
-    obj=DataIngestion()
-    train_data,test_data = obj.initiate_data_ingestion()
+    def read_source(self,**read_csv_kwargs):
+        '''
+        Yields the source data followed by the appended rows, if any; with a chunksize in
+        read_csv_kwargs both are read in chunks.
+        '''
+        paths=[self.ingestion_config.source_data_path]
+        if os.path.exists(self.ingestion_config.appended_data_path):
+            paths.append(self.ingestion_config.appended_data_path)
+        for path in paths:
+            data=pd.read_csv(path,**read_csv_kwargs)
+            if "chunksize" in read_csv_kwargs:
+                yield from data
+            else:
+                yield data
+
+    def ingest_in_chunks(self,store=None,key=None):
+        '''
+        Streams the source CSV with RAW_DATA_DTYPES and appends every chunk to data.csv and,
+        split by is_test_row, to train.csv/test.csv (and to Parquet files for the artifact
+        store), so only one chunk is in memory at a time.
+        '''
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        config=self.ingestion_config
+        os.makedirs(os.path.dirname(config.train_data_path),exist_ok=True)
+        arrow_types={"int64":pa.int64(),"float64":pa.float64(),"object":pa.string()}
+        schema=pa.schema([(name,arrow_types[dtype]) for name,dtype in RAW_DATA_DTYPES.items()])
+        tmp_dir=tempfile.mkdtemp(dir=os.path.dirname(config.train_data_path),prefix=".ingest-")
+        writers={}
+        n_rows=n_test=0
+        try:
+            chunks=self.read_source(dtype=RAW_DATA_DTYPES,chunksize=config.chunksize)
+            for i,chunk in enumerate(chunks):
+                test_mask=is_test_row(chunk["ID"],config.test_size)
+                parts={"train":chunk[~test_mask],"test":chunk[test_mask]}
+                write_options={"mode":"w" if i==0 else "a","header":i==0,"index":False}
+                chunk.to_csv(config.raw_data_path,**write_options)
+                parts["train"].to_csv(config.train_data_path,**write_options)
+                parts["test"].to_csv(config.test_data_path,**write_options)
+
+                if store is not None:
+                    for name,part in parts.items():
+                        if name not in writers:
+                            writers[name]=pq.ParquetWriter(os.path.join(tmp_dir,f"{name}.parquet"),schema)
+                        writers[name].write_table(pa.Table.from_pandas(part,schema=schema,preserve_index=False))
+                n_rows+=len(chunk)
+                n_test+=int(test_mask.sum())
+            logging.info(f"Ingested {n_rows} rows in chunks of {config.chunksize}, {n_test} of them to the test split")
+
+            for writer in writers.values():
+                writer.close()
+            writers={}
+            if store is None:
+                return config.train_data_path,config.test_data_path
+
+            store.save(
+                "ingestion",key,
+                files={f"{name}.parquet":os.path.join(tmp_dir,f"{name}.parquet") for name in ("train","test")},
+                metadata={"rows":n_rows,"test_rows":n_test,"chunksize":config.chunksize},
+            )
+            return store.frame_path("ingestion",key,"train"),store.frame_path("ingestion",key,"test")
+
+        finally:
+            for writer in writers.values():
+                writer.close()
+            shutil.rmtree(tmp_dir,ignore_errors=True)
 
-    data_transformation = DataTransformation()
-    train_arr,test_arr,_ = data_transformation.initiate_data_transformation(train_data,test_data)
-    print("First 5 rows of train_arr:\n", train_arr[:5])
 
-    modeltrainer = ModelTrainer()
-    modeltrainer.initiate_model_trainer(train_arr,test_arr)
\ No newline at end of file
+if __name__=="__main__":
+    # Training runs through src.pipeline.train_pipeline, which reuses unchanged stages
+    from src.pipeline.train_pipeline import main
+
+    main()
\ No newline at end of file
@@ -4,17 +4,38 @@ from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
 from sklearn.impute import SimpleImputer
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import save_object
+from src.utils import save_object, read_dataset
+from src.instrumentation import instrumentation
+from src.artifact_store import ArtifactStore, file_digest, params_digest, make_key, source_digest
+from src.components import feature_engineering, geo_features, target_encoding
+from src.components.feature_engineering import FeatureEngineer, RAW_COLUMN_MAPPING
+from src.components.geo_features import GeoNeighborFeatures, GEO_COLUMNS
+from src.components.target_encoding import TargetFrequencyEncoder
 from dataclasses import dataclass
 import os
-import pandas as pd
 import numpy as np
 import sys
+import shutil
 
 
 @dataclass
 class DataTransformationConfig:
     preprocessor_obj_file_path=os.path.join('artifacts',"preprocessor.pkl")
+    # Keep the transformed arrays as .npy in the artifact store and memory-map them on reruns
+    use_artifact_store: bool=True
+    # Return each split as a C-contiguous float32 feature matrix and a separate float64 target,
+    # (X, y), instead of one float64 matrix with the target as its last column
+    compact_arrays: bool=False
+    # Add neighbor sale price features (src.components.geo_features); their ball tree is
+    # saved to geo_index_file_path next to the preprocessor
+    use_geo_features: bool=False
+    geo_index_file_path: str=os.path.join('artifacts',"geo_index.pkl")
+    geo_k: int=10
+    geo_radius_km: float=1.0
+    # Zipcode as a "numeric" column, "onehot" or "target": cross-fitted smoothed mean price
+    # and frequency per zipcode (src.components.target_encoding)
+    zipcode_encoding: str="numeric"
+    zipcode_smoothing: float=20.0
 
 class DataTransformation:
     def __init__(self):
@@ -34,6 +55,14 @@ class DataTransformation:
             ]
             ordinal_categorical_columns = ["Condition_of_the_House" ]
 
+            config = self.data_transformation_config
+            if config.zipcode_encoding not in ("numeric", "onehot", "target"):
+                raise ValueError(f"Unknown zipcode_encoding {config.zipcode_encoding!r}")
+            if config.zipcode_encoding != "numeric":
+                numerical_columns.remove("Zipcode")
+            if config.zipcode_encoding == "onehot":
+                nominal_categorical_columns.append("Zipcode")
+
             num_pipeline = Pipeline(
                 steps=[
                     ("imputer", SimpleImputer(strategy="median")),
@@ -60,13 +89,35 @@ class DataTransformation:
             logging.info(f"Ordinal Categorical columns: {ordinal_categorical_columns}")
             logging.info(f"Numerical columns: {numerical_columns}")
 
-            preprocessor = ColumnTransformer(
-                transformers=[
-                    ("num_pipeline", num_pipeline, numerical_columns),
-                    ("cat_nominal_pipeline", cat_nominal_pipeline, nominal_categorical_columns),
-                    ("cat_ordinal_pipeline", cat_ordinal_pipeline, ordinal_categorical_columns),
-                ]
-            )
+            transformers = [
+                ("num_pipeline", num_pipeline, numerical_columns),
+                ("cat_nominal_pipeline", cat_nominal_pipeline, nominal_categorical_columns),
+                ("cat_ordinal_pipeline", cat_ordinal_pipeline, ordinal_categorical_columns),
+            ]
+
+            if config.zipcode_encoding == "target":
+                zipcode_pipeline = Pipeline(
+                    steps=[
+                        ("encoder", TargetFrequencyEncoder(smoothing=config.zipcode_smoothing)),
+                        ("scaler", StandardScaler()),
+                    ]
+                )
+                logging.info("Target/frequency encoding Zipcode")
+                transformers.append(("zipcode_pipeline", zipcode_pipeline, ["Zipcode"]))
+
+            if config.use_geo_features:
+                geo_pipeline = Pipeline(
+                    steps=[
+                        ("neighbors", GeoNeighborFeatures(k=config.geo_k, radius_km=config.geo_radius_km,
+                                                          index_path=config.geo_index_file_path)),
+                        ("scaler", StandardScaler()),
+                    ]
+                )
+                logging.info(f"Neighbor price features from: {GEO_COLUMNS}")
+                transformers.append(("geo_pipeline", geo_pipeline, GEO_COLUMNS))
+
+            # Always dense: one-hot zipcodes would otherwise tip the output into a sparse matrix
+            preprocessor = ColumnTransformer(transformers=transformers, sparse_threshold=0)
 
             return preprocessor
         
@@ -74,107 +125,116 @@ class DataTransformation:
             raise CustomException(e,sys)
         
     def rename_columns(self, df):
-        column_mapping = {
-            "No of Bedrooms": "No_of_Bedrooms",
-            "No of Bathrooms": "No_of_Bathrooms",
-            "Flat Area (in Sqft)": "Flat_Area",
-            "Lot Area (in Sqft)": "Lot_Area",
-            "No of Floors": "No_of_Floors",
-            "Overall Grade": "Overall_Grade",
-            "Area of the House from Basement (in Sqft)": "Area_of_the_House_from_Basement",
-            "Basement Area (in Sqft)": "Basement_Area",
-            "Age of House (in Years)": "Age_of_House",
-            "Zipcode": "Zipcode",
-            "Latitude": "Latitude",
-            "Longitude": "Longitude",
-            "Living Area after Renovation (in Sqft)": "Living_Area_after_Renovation",
-            "Lot Area after Renovation (in Sqft)": "Lot_Area_after_Renovation",
-            "Waterfront View": "Waterfront_View",
-            "Condition of the House": "Condition_of_the_House",
-            "Renovated Year": "Renovated_Year",
-            "Date House was Sold": "Date_House_was_Sold",
-            "Sale Price": "Sale_Price",
-            "No of Times Visited": "No_of_Times_Visited",
-        }
-        df = df.rename(columns=column_mapping)
-        return df
-        
-
-    def initiate_data_transformation(self,train_path,test_path):
+        return df.rename(columns=RAW_COLUMN_MAPPING)
 
-        try:
-            train_df=pd.read_csv(train_path)
-            test_df=pd.read_csv(test_path)
+    def split_features_target(self, df):
+        '''
+        Turns raw-schema rows into (input features, Sale_Price): derives the engineered
+        features, drops rows without a target and the columns the model does not use.
+        '''
+        df = FeatureEngineer().transform(df)
 
-            logging.info("Read train and test data completed")
+        logging.info(f"Treating the missing values in target variable.")
 
-            logging.info("Rename columns in both train and test datasets")
+        # Drop rows with missing target values
+        df = df.dropna(subset=["Sale_Price"])
 
-            train_df = self.rename_columns(train_df)
-            test_df = self.rename_columns(test_df)
+        target_column_name="Sale_Price"
 
-            logging.info(f"Treating the missing values in target variable.")
+        logging.info(
+            "Removing target and unnecessary columns"
+        )
 
-            # Drop rows with missing target values
-            train_df = train_df.dropna(subset=["Sale_Price"])
-            test_df = test_df.dropna(subset=["Sale_Price"])
+        drop_columns=[target_column_name,'No_of_Times_Visited','ID']
 
-            logging.info(
-                f"Manipulating datetime variable in training dataframe and testing dataframe."
-            )
+        return df.drop(columns=drop_columns), df[target_column_name]
 
-            # New variable creation
-            train_df['Ever_Renovated'] = np.where(train_df['Renovated_Year'] == 0, 'No', 'Yes')
-            
-            # Manipulating datetime variable
-            train_df['Purchase_Year'] = pd.DatetimeIndex(train_df['Date_House_was_Sold']).year
-            train_df['Years_Since_Renovation'] = np.where(
-                train_df['Ever_Renovated'] == 'Yes',
-                abs(train_df['Purchase_Year'] - train_df['Renovated_Year']),
-                0
-            )
+    def get_cache_key(self,train_path,test_path,preprocessing_obj=None):
+        '''
+        Artifact store key of the transformed arrays: both splits, the preprocessor params
+        and the feature engineering code.
+        '''
+        preprocessing_obj=preprocessing_obj or self.get_data_transformer_object()
+        return make_key(
+            file_digest(train_path),
+            file_digest(test_path),
+            params_digest(preprocessing_obj.get_params(deep=True)),
+            self.data_transformation_config.compact_arrays,
+            source_digest(sys.modules[__name__],feature_engineering,geo_features,target_encoding),
+        )
 
-            test_df['Ever_Renovated'] = np.where(test_df['Renovated_Year'] == 0, 'No', 'Yes')
-            
-            test_df['Purchase_Year'] = pd.DatetimeIndex(test_df['Date_House_was_Sold']).year
-            test_df['Years_Since_Renovation'] = np.where(
-                test_df['Ever_Renovated'] == 'Yes',
-                abs(test_df['Purchase_Year'] - test_df['Renovated_Year']),
-                0
-            )
+    def initiate_data_transformation(self,train_path,test_path):
 
+        try:
             logging.info("Obtaining preprocessing object")
 
             preprocessing_obj=self.get_data_transformer_object()
 
-            target_column_name="Sale_Price"
+            store=None
+            if self.data_transformation_config.use_artifact_store:
+                store=ArtifactStore()
+                key=self.get_cache_key(train_path,test_path,preprocessing_obj)
+                if store.has("transformation",key):
+                    logging.info(f"Reusing transformed arrays {key} from the artifact store")
+                    preprocessor_path=self.data_transformation_config.preprocessor_obj_file_path
+                    os.makedirs(os.path.dirname(preprocessor_path),exist_ok=True)
+                    shutil.copyfile(store.file_path("transformation",key,"preprocessor.pkl"),preprocessor_path)
+                    if self.data_transformation_config.use_geo_features:
+                        shutil.copyfile(store.file_path("transformation",key,"geo_index.pkl"),
+                                        self.data_transformation_config.geo_index_file_path)
+                    if self.data_transformation_config.compact_arrays:
+                        return (
+                            (store.load_array("transformation",key,"X_train"),store.load_array("transformation",key,"y_train")),
+                            (store.load_array("transformation",key,"X_test"),store.load_array("transformation",key,"y_test")),
+                            preprocessor_path,
+                        )
+                    return (
+                        store.load_array("transformation",key,"train_arr"),
+                        store.load_array("transformation",key,"test_arr"),
+                        preprocessor_path,
+                    )
+
+            with instrumentation.span("transform.read") as span:
+                train_df=read_dataset(train_path)
+                test_df=read_dataset(test_path)
+                span.set(rows=len(train_df)+len(test_df))
 
-            input_feature_train_df=train_df.drop(columns=[target_column_name],axis=1)
-            target_feature_train_df=train_df[target_column_name]
+            logging.info("Read train and test data completed")
 
-            input_feature_test_df=test_df.drop(columns=[target_column_name],axis=1)
-            target_feature_test_df=test_df[target_column_name]
+            logging.info("Renaming columns and deriving features in both train and test datasets")
 
-            logging.info(
-                f"Removing unnecessary columns from training dataframe and testing dataframe."
-            )
-
-            input_feature_train_df = input_feature_train_df.drop(columns=['No_of_Times_Visited', 'ID'], axis=1)
-            input_feature_test_df = input_feature_test_df.drop(columns=['No_of_Times_Visited', 'ID'],axis=1)
+            with instrumentation.span("transform.features",rows=len(train_df)+len(test_df)):
+                input_feature_train_df,target_feature_train_df=self.split_features_target(train_df)
+                input_feature_test_df,target_feature_test_df=self.split_features_target(test_df)
 
 
             logging.info(
                 f"Applying preprocessing object on training dataframe and testing dataframe."
             )
 
-            input_feature_train_arr=preprocessing_obj.fit_transform(input_feature_train_df)
-            input_feature_test_arr=preprocessing_obj.transform(input_feature_test_df)
-
-
-            train_arr = np.c_[
-                input_feature_train_arr, np.array(target_feature_train_df)
-            ]
-            test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
+            # The target is passed on for the neighbor price features and the zipcode encoder, which fit on it
+            with instrumentation.span("transform.fit",rows=len(input_feature_train_df)):
+                input_feature_train_arr=preprocessing_obj.fit_transform(input_feature_train_df,target_feature_train_df)
+            with instrumentation.span("transform.apply",rows=len(input_feature_test_df)):
+                input_feature_test_arr=preprocessing_obj.transform(input_feature_test_df)
+
+
+            if self.data_transformation_config.compact_arrays:
+                train_arr = (
+                    np.ascontiguousarray(input_feature_train_arr, dtype=np.float32),
+                    target_feature_train_df.to_numpy(dtype=np.float64),
+                )
+                test_arr = (
+                    np.ascontiguousarray(input_feature_test_arr, dtype=np.float32),
+                    target_feature_test_df.to_numpy(dtype=np.float64),
+                )
+                arrays={"X_train":train_arr[0],"y_train":train_arr[1],"X_test":test_arr[0],"y_test":test_arr[1]}
+            else:
+                train_arr = np.c_[
+                    input_feature_train_arr, np.array(target_feature_train_df)
+                ]
+                test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
+                arrays={"train_arr":train_arr,"test_arr":test_arr}
 
 
 
@@ -187,6 +247,20 @@ class DataTransformation:
 
             )
 
+            files={"preprocessor.pkl":self.data_transformation_config.preprocessor_obj_file_path}
+            if self.data_transformation_config.use_geo_features:
+                geo_index=preprocessing_obj.named_transformers_["geo_pipeline"].named_steps["neighbors"].index_
+                save_object(file_path=self.data_transformation_config.geo_index_file_path,obj=geo_index)
+                files["geo_index.pkl"]=self.data_transformation_config.geo_index_file_path
+                logging.info(f"Saved the neighbor price index of {len(geo_index)} sales")
+
+            if store is not None:
+                store.save(
+                    "transformation",key,
+                    arrays=arrays,
+                    files=files,
+                )
+
             return (
                 train_arr,
                 test_arr,
@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import read_dataset
+from src.instrumentation import instrumentation
+from src.artifact_store import ArtifactStore, file_digest, make_key, source_digest
+from src.components.feature_engineering import FeatureEngineer
+
+
+# Checks per column of the renamed frame. Numeric columns are checked for type, range and,
+# where set, whole numbers; categorical columns against their domain. Nulls are only allowed
+# where the preprocessor imputes them.
+VALIDATION_RULES = {
+    "ID": {"kind": "numeric", "nullable": False, "min": 0, "integer": True},
+    "Sale_Price": {"kind": "numeric", "nullable": False, "min": 1},
+    "No_of_Bedrooms": {"kind": "numeric", "nullable": True, "min": 0, "max": 50, "integer": True},
+    "No_of_Bathrooms": {"kind": "numeric", "nullable": True, "min": 0, "max": 20},
+    "Flat_Area": {"kind": "numeric", "nullable": True, "min": 1},
+    "Lot_Area": {"kind": "numeric", "nullable": True, "min": 1},
+    "No_of_Floors": {"kind": "numeric", "nullable": True, "min": 1, "max": 10},
+    "Waterfront_View": {"kind": "category", "nullable": True, "categories": ["No", "Yes"]},
+    "Condition_of_the_House": {"kind": "category", "nullable": False,
+                               "categories": ["Bad", "Okay", "Fair", "Good", "Excellent"]},
+    "Overall_Grade": {"kind": "numeric", "nullable": True, "min": 1, "max": 10, "integer": True},
+    "Area_of_the_House_from_Basement": {"kind": "numeric", "nullable": True, "min": 0},
+    "Basement_Area": {"kind": "numeric", "nullable": True, "min": 0},
+    "Age_of_House": {"kind": "numeric", "nullable": True, "min": 0, "max": 500},
+    "Renovated_Year": {"kind": "numeric", "nullable": True, "min": 0, "max": 2100},
+    "Zipcode": {"kind": "numeric", "nullable": True, "min": 0, "max": 99999},
+    "Latitude": {"kind": "numeric", "nullable": True, "min": -90, "max": 90},
+    "Longitude": {"kind": "numeric", "nullable": True, "min": -180, "max": 180},
+    "Living_Area_after_Renovation": {"kind": "numeric", "nullable": True, "min": 0},
+    "Lot_Area_after_Renovation": {"kind": "numeric", "nullable": True, "min": 0},
+    "Ever_Renovated": {"kind": "category", "nullable": True, "categories": ["No", "Yes"]},
+    "Purchase_Year": {"kind": "numeric", "nullable": True, "min": 1900, "max": 2100},
+    "Years_Since_Renovation": {"kind": "numeric", "nullable": True, "min": 0},
+}
+
+# Columns the preprocessor reads; training rows also need the target and the ID
+FEATURE_COLUMNS = [
+    "No_of_Bedrooms", "No_of_Bathrooms", "Flat_Area", "Lot_Area", "No_of_Floors", "Waterfront_View",
+    "Condition_of_the_House", "Overall_Grade", "Area_of_the_House_from_Basement", "Basement_Area",
+    "Age_of_House", "Zipcode", "Latitude", "Longitude", "Living_Area_after_Renovation",
+    "Lot_Area_after_Renovation", "Ever_Renovated", "Years_Since_Renovation",
+]
+TRAINING_ONLY_COLUMNS = ["Sale_Price", "ID"]
+TRAINING_COLUMNS = FEATURE_COLUMNS + TRAINING_ONLY_COLUMNS
+
+
+@dataclass
+class DataValidationConfig:
+    validation_dir: str=os.path.join("artifacts","validation")
+    # Keep the validated splits in the artifact store, keyed on the input splits, and reuse them on reruns
+    use_artifact_store: bool=True
+
+
+class DataValidation:
+    '''
+    Column-wise checks of raw or CustomData-shaped rows against VALIDATION_RULES. Rows that
+    fail any check are split off into a quarantine frame with a validation_errors column
+    instead of failing the whole batch; only a frame missing required columns is rejected.
+    '''
+    def __init__(self):
+        self.data_validation_config=DataValidationConfig()
+
+    @staticmethod
+    def check_column(values, rule):
+        '''
+        Returns {check name: boolean mask of failing rows} for one column.
+        '''
+        failures = {}
+        if rule["kind"] == "category":
+            null = pd.isna(values).to_numpy()
+            failures["domain"] = ~values.isin(rule["categories"]).to_numpy() & ~null
+        else:
+            if values.dtype.kind in "biuf":
+                numbers = values.to_numpy(dtype=np.float64)
+            else:
+                coerced = pd.to_numeric(values, errors="coerce")
+                numbers = coerced.to_numpy(dtype=np.float64)
+                failures["dtype"] = np.isnan(numbers) & values.notna().to_numpy()
+            null = np.isnan(numbers)
+            if "dtype" in failures:
+                null &= ~failures["dtype"]
+            with np.errstate(invalid="ignore"):
+                if "min" in rule:
+                    failures["min"] = numbers < rule["min"]
+                if "max" in rule:
+                    failures["max"] = numbers > rule["max"]
+                if rule.get("integer"):
+                    failures["integer"] = ~np.isnan(numbers) & (numbers != np.floor(numbers))
+        if not rule["nullable"]:
+            failures["null"] = null
+        return failures
+
+    @instrumentation.timed("validate")
+    def validate(self, df, require_target=False):
+        '''
+        Validates df (raw data.csv columns or CustomData fields) and returns
+        (valid rows, quarantined rows, report). Both frames keep the columns of df; the
+        quarantined rows get an extra validation_errors column such as "Flat_Area.min;Zipcode.max".
+        The Sale_Price and ID rules only apply with require_target, so rows being scored are
+        judged on their features alone.
+        '''
+        try:
+            start = time.perf_counter()
+            renamed = FeatureEngineer().transform(df)
+
+            required = TRAINING_COLUMNS if require_target else FEATURE_COLUMNS
+            missing = [column for column in required if column not in renamed.columns]
+            if missing:
+                raise ValueError(f"Missing required columns {missing}")
+
+            invalid = np.zeros(len(df), dtype=bool)
+            failures = {}
+            for column, rule in VALIDATION_RULES.items():
+                if column not in renamed.columns or (not require_target and column in TRAINING_ONLY_COLUMNS):
+                    continue
+                for check, mask in self.check_column(renamed[column], rule).items():
+                    if mask.any():
+                        failures[f"{column}.{check}"] = mask
+                        invalid |= mask
+
+            quarantined = df[invalid]
+            if len(quarantined):
+                errors = np.full(int(invalid.sum()), "", dtype=object)
+                for label, mask in failures.items():
+                    flagged = mask[invalid]
+                    errors[flagged] = errors[flagged] + label + ";"
+                quarantined = quarantined.assign(validation_errors=[error.rstrip(";") for error in errors])
+
+            report = {
+                "rows": int(len(df)),
+                "valid_rows": int(len(df) - invalid.sum()),
+                "quarantined_rows": int(invalid.sum()),
+                "failures": {label: int(mask.sum()) for label, mask in failures.items()},
+                "unexpected_columns": sorted(set(renamed.columns) - set(VALIDATION_RULES)
+                                             - {"Date_House_was_Sold", "No_of_Times_Visited"}),
+                "seconds": round(time.perf_counter() - start, 4),
+            }
+            return df[~invalid], quarantined, report
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def get_cache_key(self,train_path,test_path):
+        return make_key(file_digest(train_path),file_digest(test_path),source_digest(sys.modules[__name__]))
+
+    def initiate_data_validation(self,train_path,test_path):
+        '''
+        Validates the ingested splits. Writes report.json and <split>_quarantine.csv files to
+        validation_dir and returns the paths of the validated train and test splits.
+        '''
+        try:
+            config=self.data_validation_config
+            store=key=None
+            if config.use_artifact_store:
+                store=ArtifactStore()
+                key=self.get_cache_key(train_path,test_path)
+                if store.has("validation",key):
+                    logging.info(f"Reusing validated splits {key} from the artifact store")
+                    return store.frame_path("validation",key,"train"),store.frame_path("validation",key,"test")
+
+            os.makedirs(config.validation_dir,exist_ok=True)
+            valid,report={},{}
+            for name,path in (("train",train_path),("test",test_path)):
+                valid[name],quarantined,report[name]=self.validate(read_dataset(path),require_target=True)
+                quarantine_path=os.path.join(config.validation_dir,f"{name}_quarantine.csv")
+                if len(quarantined):
+                    quarantined.to_csv(quarantine_path,index=False)
+                elif os.path.exists(quarantine_path):
+                    os.remove(quarantine_path)
+                logging.info(
+                    f"Validated {name} split: {report[name]['quarantined_rows']} of {report[name]['rows']} rows "
+                    f"quarantined {report[name]['failures']}"
+                )
+
+            with open(os.path.join(config.validation_dir,"report.json"),"w") as file_obj:
+                json.dump(report,file_obj,indent=2)
+
+            if store is not None:
+                store.save("validation",key,frames=valid,metadata=report)
+                return store.frame_path("validation",key,"train"),store.frame_path("validation",key,"test")
+
+            paths=[]
+            for name in ("train","test"):
+                paths.append(os.path.join(config.validation_dir,f"{name}.parquet"))
+                valid[name].to_parquet(paths[-1],index=False)
+            return tuple(paths)
+
+        except Exception as e:
+            raise CustomException(e,sys)
@@ -0,0 +1,88 @@
+import sys
+import numpy as np
+import pandas as pd
+from src.exception import CustomException
+
+
+RAW_COLUMN_MAPPING = {
+    "No of Bedrooms": "No_of_Bedrooms",
+    "No of Bathrooms": "No_of_Bathrooms",
+    "Flat Area (in Sqft)": "Flat_Area",
+    "Lot Area (in Sqft)": "Lot_Area",
+    "No of Floors": "No_of_Floors",
+    "Overall Grade": "Overall_Grade",
+    "Area of the House from Basement (in Sqft)": "Area_of_the_House_from_Basement",
+    "Basement Area (in Sqft)": "Basement_Area",
+    "Age of House (in Years)": "Age_of_House",
+    "Zipcode": "Zipcode",
+    "Latitude": "Latitude",
+    "Longitude": "Longitude",
+    "Living Area after Renovation (in Sqft)": "Living_Area_after_Renovation",
+    "Lot Area after Renovation (in Sqft)": "Lot_Area_after_Renovation",
+    "Waterfront View": "Waterfront_View",
+    "Condition of the House": "Condition_of_the_House",
+    "Renovated Year": "Renovated_Year",
+    "Date House was Sold": "Date_House_was_Sold",
+    "Sale Price": "Sale_Price",
+    "No of Times Visited": "No_of_Times_Visited",
+}
+
+# Raw column names that actually change when renamed
+_RENAMED_COLUMNS = frozenset(raw for raw, name in RAW_COLUMN_MAPPING.items() if raw != name)
+
+# Dates in the raw data look like "14 October 2017"
+DATE_FORMAT = "%d %B %Y"
+
+
+class FeatureEngineer:
+    '''
+    Turns raw-schema rows (the columns of artifacts/data.csv) into the frame the preprocessor
+    expects: renames the columns and derives Ever_Renovated, Purchase_Year and
+    Years_Since_Renovation from Renovated_Year and Date_House_was_Sold.
+
+    The input frame is left untouched and its column data is shared rather than copied.
+    Rows that already carry the derived fields (e.g. from CustomData) pass through as is.
+    '''
+    def __init__(self, date_format=DATE_FORMAT):
+        self.date_format = date_format
+
+    def fit(self, X, y=None):
+        return self
+
+    def purchase_year(self, dates):
+        '''
+        Parses the sale dates with an explicit format. A sales file only has a few hundred
+        distinct dates, so each distinct string is parsed once and broadcast back.
+        '''
+        codes, uniques = pd.factorize(dates)
+        years = pd.to_datetime(uniques, format=self.date_format, errors="coerce").year.to_numpy()
+        if (codes < 0).any() or np.isnan(years.astype(float)).any():
+            years = np.append(years.astype(float), np.nan)
+        return years[codes]
+
+    def transform(self, X):
+        try:
+            df = X
+            if not _RENAMED_COLUMNS.isdisjoint(X.columns):
+                df = X.rename(columns=RAW_COLUMN_MAPPING, copy=False)
+            if "Renovated_Year" not in df.columns or "Date_House_was_Sold" not in df.columns:
+                return df
+            if df is X:
+                df = X.copy(deep=False)
+
+            renovated_year = df["Renovated_Year"].to_numpy()
+            ever_renovated = renovated_year != 0
+            purchase_year = self.purchase_year(df["Date_House_was_Sold"])
+
+            df["Ever_Renovated"] = np.where(ever_renovated, "Yes", "No")
+            df["Purchase_Year"] = purchase_year
+            df["Years_Since_Renovation"] = np.where(
+                ever_renovated, np.abs(purchase_year - renovated_year), 0
+            )
+            return df
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X, y).transform(X)
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from src.utils import load_cached_object
+
+
+GEO_COLUMNS = ["Latitude", "Longitude"]
+GEO_FEATURE_NAMES = ["geo_knn_median_price", "geo_radius_median_price", "geo_radius_count"]
+EARTH_RADIUS_KM = 6371.0088
+
+
+def grouped_median(groups, values, n_groups):
+    '''
+    Median of values per group id in [0, n_groups) and the group sizes, from one sort;
+    empty groups get NaN.
+    '''
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    medians = np.full(n_groups, np.nan)
+    present = counts > 0
+    lower = starts[present] + (counts[present] - 1) // 2
+    upper = starts[present] + counts[present] // 2
+    medians[present] = (sorted_values[lower] + sorted_values[upper]) / 2
+    return medians, counts
+
+
+class NeighborPriceIndex:
+    '''
+    Ball tree over the coordinates of past sales (haversine distance) with their sale prices.
+    Queries are batched: one tree query for all rows, then vectorized medians.
+    '''
+    def __init__(self, coordinates, prices, leaf_size=40):
+        from sklearn.neighbors import BallTree
+
+        self.coordinates = np.asarray(coordinates, dtype=np.float64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.tree = BallTree(np.radians(self.coordinates), leaf_size=leaf_size, metric="haversine")
+
+    def __len__(self):
+        return len(self.prices)
+
+    def query(self, coordinates, k, radius_km, exclude=None):
+        '''
+        Returns an (n, 3) array: median price of the k nearest sales, median price and count of
+        the sales within radius_km. exclude holds, per row, the position of a sale to leave
+        out (the row itself at training time, for leave-one-out features) or -1.
+        '''
+        points = np.radians(np.asarray(coordinates, dtype=np.float64))
+        n = len(points)
+        k = min(k, len(self) - (exclude is not None))
+
+        neighbors = self.tree.query(points, k=k + (exclude is not None), return_distance=False)
+        if exclude is not None:
+            keep = neighbors != exclude[:, None]
+            # Rows whose own sale was not among the k + 1 nearest drop the farthest instead
+            keep[:, -1] &= ~keep.all(axis=1)
+            neighbors = neighbors[keep].reshape(n, k)
+        knn_median = np.median(self.prices[neighbors], axis=1)
+
+        within = self.tree.query_radius(points, radius_km / EARTH_RADIUS_KM, return_distance=False)
+        rows = np.repeat(np.arange(n), [len(ids) for ids in within])
+        ids = np.concatenate(within) if n else np.empty(0, dtype=np.intp)
+        if exclude is not None:
+            keep = ids != exclude[rows]
+            rows, ids = rows[keep], ids[keep]
+        radius_median, radius_count = grouped_median(rows, self.prices[ids], n)
+
+        return np.column_stack([knn_median, radius_median, radius_count])
+
+
+def neighbor_features(index, coordinates, k, radius_km, fill_values, exclude=None):
+    '''
+    NeighborPriceIndex.query for rows that may lack coordinates: those rows, and features
+    without any neighbor, take fill_values.
+    '''
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    out = np.tile(fill_values, (len(coordinates), 1))
+    valid = ~np.isnan(coordinates).any(axis=1)
+    if valid.any():
+        features = index.query(coordinates[valid], k, radius_km, None if exclude is None else exclude[valid])
+        out[valid] = np.where(np.isnan(features), fill_values, features)
+    return out
+
+
+class GeoNeighborFeatures(BaseEstimator, TransformerMixin):
+    '''
+    Neighbor-price features from Latitude/Longitude: the median sale price of the k nearest
+    training sales and the median price and number of sales within radius_km.
+
+    fit_transform computes them leave-one-out, so a training row never sees its own price;
+    transform queries the fitted index as is. With index_path set, the index is not pickled
+    with the estimator but saved to that file (see DataTransformation) and loaded through the
+    process-wide artifact cache on first use.
+    '''
+    def __init__(self, k=10, radius_km=1.0, leaf_size=40, index_path=None):
+        self.k = k
+        self.radius_km = radius_km
+        self.leaf_size = leaf_size
+        self.index_path = index_path
+
+    @staticmethod
+    def _coordinates(X):
+        if isinstance(X, pd.DataFrame):
+            X = X[GEO_COLUMNS]
+        return np.asarray(X, dtype=np.float64)
+
+    def _fit(self, X, y):
+        if y is None:
+            raise ValueError("GeoNeighborFeatures needs the sale prices to fit")
+        coordinates = self._coordinates(X)
+        prices = np.asarray(y, dtype=np.float64)
+        indexed = ~np.isnan(coordinates).any(axis=1) & ~np.isnan(prices)
+        self.index_ = NeighborPriceIndex(coordinates[indexed], prices[indexed], leaf_size=self.leaf_size)
+        # Rows without coordinates (or neighbors within the radius) fall back to the overall median
+        self.fill_values_ = np.array([np.median(prices[indexed]), np.median(prices[indexed]), 0.0])
+        self.n_features_in_ = coordinates.shape[1]
+        return coordinates, indexed
+
+    def fit(self, X, y=None):
+        self._fit(X, y)
+        return self
+
+    def fit_transform(self, X, y=None, **fit_params):
+        coordinates, indexed = self._fit(X, y)
+        exclude = np.full(len(coordinates), -1)
+        exclude[indexed] = np.arange(indexed.sum())
+        return neighbor_features(self.index_, coordinates, self.k, self.radius_km, self.fill_values_, exclude)
+
+    def transform(self, X):
+        return neighbor_features(self.index, self._coordinates(X), self.k, self.radius_km, self.fill_values_)
+
+    @property
+    def index(self):
+        index = self.__dict__.get("index_")
+        return index if index is not None else load_cached_object(self.index_path)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array(GEO_FEATURE_NAMES, dtype=object)
+
+    def __getstate__(self):
+        # A copy: the state sklearn returns can be the instance's own __dict__
+        state = dict(super().__getstate__())
+        if self.index_path is not None:
+            state.pop("index_", None)
+        return state
@@ -0,0 +1,342 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import save_object, load_object, read_dataset
+from src.components.data_transformation import DataTransformation
+from src.artifact_store import file_digest
+from src.model_io import xgb_best_iteration
+from src.components.data_ingestion import DataIngestionConfig, is_test_row
+from src.components.data_validation import DataValidation
+
+
+@dataclass
+class IncrementalTrainerConfig:
+    # New rows are also appended to the file DataIngestion reads after its source, so the
+    # ingestion key changes and a later TrainPipeline run re-ingests and retrains with them
+    # instead of restoring stale splits and model.pkl from the store
+    appended_data_path: str=DataIngestionConfig.appended_data_path
+    raw_data_path: str=os.path.join("artifacts","data.csv")
+    train_data_path: str=os.path.join("artifacts","train.csv")
+    test_data_path: str=os.path.join("artifacts","test.csv")
+    model_file_path: str=os.path.join("artifacts","model.pkl")
+    preprocessor_file_path: str=os.path.join("artifacts","preprocessor.pkl")
+    export_model_bundle: bool=True
+    model_bundle_dir: str=os.path.join("artifacts","model_bundle")
+    # Running feature/target statistics and the update history
+    state_file_path: str=os.path.join("artifacts","incremental_state.json")
+    id_column: str="ID"
+    # Share of new rows that go to the test split, decided by a hash of the ID
+    test_size: float=0.2
+    # Trees added per update to XGBoost, CatBoost and Gradient Boosting models
+    boost_rounds: int=50
+    # A full transformation + model search runs once the rows added since the last full fit
+    # (at least min_drift_rows of them) have any tracked column's mean more than drift_threshold
+    # reference standard deviations away, or once they exceed max_new_fraction of the reference rows
+    drift_threshold: float=0.2
+    min_drift_rows: int=500
+    max_new_fraction: float=0.5
+    # An update is only kept if its test R2 is at most this much below the current model's
+    max_score_drop: float=0.01
+
+
+class RunningStats:
+    '''
+    Per-column count, mean and sum of squared deviations, merged batch by batch with the
+    parallel variance formula so the statistics of all rows never need the rows themselves.
+    Missing values are skipped.
+    '''
+    def __init__(self, count, mean, m2):
+        self.count = dict(count)
+        self.mean = dict(mean)
+        self.m2 = dict(m2)
+
+    @classmethod
+    def from_frame(cls, df, columns):
+        stats = cls({}, {}, {})
+        for column in columns:
+            values = df[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            stats.count[column] = int(len(values))
+            stats.mean[column] = float(values.mean()) if len(values) else 0.0
+            stats.m2[column] = float(((values - stats.mean[column]) ** 2).sum())
+        return stats
+
+    def update(self, df):
+        batch = RunningStats.from_frame(df, list(self.count))
+        for column in self.count:
+            n_a, n_b = self.count[column], batch.count[column]
+            n = n_a + n_b
+            if n_b == 0:
+                continue
+            delta = batch.mean[column] - self.mean[column]
+            self.mean[column] += delta * n_b / n
+            self.m2[column] += batch.m2[column] + delta ** 2 * n_a * n_b / n
+            self.count[column] = n
+        return self
+
+    def std(self, column):
+        return (self.m2[column] / self.count[column]) ** 0.5 if self.count[column] else 0.0
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state["count"], state["mean"], state["m2"])
+
+
+def drift_scores(reference, current):
+    '''
+    Per column, how far the mean of current is from the mean of reference, in reference
+    standard deviations. (Standard deviations of sparse columns such as
+    Years_Since_Renovation swing too much between samples to be compared directly.)
+    '''
+    return {
+        column: abs(current.mean[column] - reference.mean[column]) / (reference.std(column) or 1.0)
+        for column in reference.count
+    }
+
+
+class IncrementalTrainer:
+    '''
+    Folds newly arrived sales into the existing splits and model without redoing the full
+    search. The fitted preprocessor stays frozen between full fits so the trees already in
+    the model keep seeing the same feature encoding. Running statistics of the numeric
+    features and the target of the rows added since the last full fit are compared with
+    those of the last full fit, and a full retrain runs once they drift too far.
+    '''
+    def __init__(self):
+        self.incremental_trainer_config=IncrementalTrainerConfig()
+        self.data_transformation=DataTransformation()
+        self.data_validation=DataValidation()
+
+    def tracked_columns(self, preprocessor):
+        for name, _, columns in preprocessor.transformers_:
+            if name == "num_pipeline":
+                return list(columns) + ["Sale_Price"]
+        return ["Sale_Price"]
+
+    def load_state(self, preprocessor):
+        '''
+        Returns the saved state, or a fresh one whose reference statistics come from the
+        current training split. A saved state written for another model.pkl (one a full
+        TrainPipeline run has replaced since) only keeps its history.
+        '''
+        config = self.incremental_trainer_config
+        if os.path.exists(config.state_file_path):
+            with open(config.state_file_path) as file_obj:
+                state = json.load(file_obj)
+            if state.get("model_sha256") == file_digest(config.model_file_path):
+                return state
+            logging.info("model.pkl changed since the last incremental update, starting fresh statistics")
+            return {**self.fresh_state(preprocessor), "history": state.get("history", [])}
+        return self.fresh_state(preprocessor)
+
+    def fresh_state(self, preprocessor):
+        features, target = self.data_transformation.split_features_target(
+            read_dataset(self.incremental_trainer_config.train_data_path)
+        )
+        frame = features.assign(Sale_Price=target.to_numpy())
+        stats = RunningStats.from_frame(frame, self.tracked_columns(preprocessor)).to_dict()
+        added = RunningStats.from_frame(frame.iloc[:0], self.tracked_columns(preprocessor)).to_dict()
+        # reference: the rows of the last full fit, added: rows since then, current: both
+        return {"reference": stats, "added": added, "current": stats, "history": []}
+
+    def save_state(self, state):
+        path = self.incremental_trainer_config.state_file_path
+        state["model_sha256"] = file_digest(self.incremental_trainer_config.model_file_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file_obj:
+            json.dump(state, file_obj, indent=2)
+
+    def new_rows(self, new_df):
+        '''
+        Drops rows whose ID is already ingested, and repeated IDs within the batch (keeping
+        the last), then orders the columns like the raw data file.
+        '''
+        config = self.incremental_trainer_config
+        header = pd.read_csv(config.raw_data_path, nrows=0).columns
+        known_ids = pd.read_csv(config.raw_data_path, usecols=[config.id_column])[config.id_column]
+        new_df = new_df.drop_duplicates(subset=[config.id_column], keep="last")
+        new_df = new_df[~new_df[config.id_column].isin(known_ids)]
+        return new_df.reindex(columns=header)
+
+    def quarantine(self, quarantined):
+        validation_dir = self.data_validation.data_validation_config.validation_dir
+        os.makedirs(validation_dir, exist_ok=True)
+        path = os.path.join(validation_dir, "incremental_quarantine.csv")
+        quarantined.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+        logging.info(f"Quarantined {len(quarantined)} new rows to {path}")
+
+    def append_rows(self, new_df, test_mask):
+        config = self.incremental_trainer_config
+        os.makedirs(os.path.dirname(config.appended_data_path), exist_ok=True)
+        new_df.to_csv(config.appended_data_path, mode="a", header=not os.path.exists(config.appended_data_path),
+                      index=False)
+        new_df.to_csv(config.raw_data_path, mode="a", header=False, index=False)
+        new_df[~test_mask].to_csv(config.train_data_path, mode="a", header=False, index=False)
+        new_df[test_mask].to_csv(config.test_data_path, mode="a", header=False, index=False)
+        logging.info(f"Appended {int((~test_mask).sum())} train and {int(test_mask.sum())} test rows")
+
+    def continue_training(self, model, X, y, X_train_all, y_train_all):
+        '''
+        Adds boost_rounds trees fitted on the new rows to XGBoost, CatBoost and Gradient
+        Boosting models. Any other model is refitted with its current hyperparameters on the
+        whole (frozen-preprocessor) training split. Returns (model, mode).
+        '''
+        rounds = self.incremental_trainer_config.boost_rounds
+        name = type(model).__name__
+        if name == "XGBRegressor":
+            booster = model.get_booster()
+            best_iteration = xgb_best_iteration(model)
+            if best_iteration is not None:
+                # Build on the rounds that were served, not the tail early stopping cut off
+                booster = booster[: best_iteration + 1]
+            model.set_params(n_estimators=rounds, early_stopping_rounds=None)
+            model.fit(X, y, xgb_model=booster, verbose=False)
+            return model, "continued"
+        if name == "CatBoostRegressor":
+            updated = type(model)(**{**model.get_params(), "iterations": rounds})
+            updated.fit(X, y, init_model=model, verbose=False)
+            return updated, "continued"
+        if name == "GradientBoostingRegressor":
+            model.set_params(warm_start=True, n_estimators=model.n_estimators_ + rounds, n_iter_no_change=None)
+            model.fit(X, y)
+            return model, "continued"
+
+        from sklearn.base import clone
+
+        return clone(model).fit(X_train_all, y_train_all), "refit"
+
+    def full_retrain(self):
+        from src.components.model_trainer import ModelTrainer
+
+        config = self.incremental_trainer_config
+        self.data_transformation.data_transformation_config.preprocessor_obj_file_path = config.preprocessor_file_path
+        train_arr, test_arr, _ = self.data_transformation.initiate_data_transformation(
+            config.train_data_path, config.test_data_path
+        )
+        model_trainer = ModelTrainer()
+        model_trainer.model_trainer_config.trained_model_file_path = config.model_file_path
+        model_trainer.model_trainer_config.preprocessor_obj_file_path = config.preprocessor_file_path
+        model_trainer.model_trainer_config.export_model_bundle = config.export_model_bundle
+        model_trainer.model_trainer_config.model_bundle_dir = config.model_bundle_dir
+        return model_trainer.initiate_model_trainer(train_arr, test_arr)
+
+    def initiate_incremental_training(self, new_data_path, force_full=False):
+        '''
+        Appends the unseen rows of new_data_path to the splits and updates the model.
+        Returns a report with the mode ("no_new_rows", "continued", "refit", "rejected" or
+        "full_retrain"), the number of new rows, the largest drift score and the test R2.
+        '''
+        try:
+            from sklearn.metrics import r2_score
+
+            start = time.perf_counter()
+            config = self.incremental_trainer_config
+            preprocessor = load_object(config.preprocessor_file_path)
+            state = self.load_state(preprocessor)
+
+            new_df, quarantined, _ = self.data_validation.validate(
+                self.new_rows(read_dataset(new_data_path)), require_target=True
+            )
+            if len(quarantined):
+                self.quarantine(quarantined)
+            report = {
+                "new_rows": int(len(new_df)),
+                "quarantined_rows": int(len(quarantined)),
+                "started": datetime.now().isoformat(timespec="seconds"),
+            }
+            if new_df.empty and not force_full:
+                logging.info(f"No new rows in {new_data_path}")
+                report.update(mode="no_new_rows", seconds=time.perf_counter() - start)
+                return report
+
+            test_mask = is_test_row(new_df[config.id_column], config.test_size)
+            X_new, y_new = self.data_transformation.split_features_target(new_df[~test_mask])
+            new_frame = X_new.assign(Sale_Price=y_new.to_numpy())
+            added = RunningStats.from_dict(state["added"]).update(new_frame)
+            state["added"] = added.to_dict()
+            state["current"] = RunningStats.from_dict(state["current"]).update(new_frame).to_dict()
+
+            added_rows = added.count["Sale_Price"]
+            new_fraction = added_rows / max(state["reference"]["count"]["Sale_Price"], 1)
+            scores = drift_scores(RunningStats.from_dict(state["reference"]), added)
+            max_drift_column = max(scores, key=scores.get)
+            report["max_drift"] = {"column": max_drift_column, "score": scores[max_drift_column]}
+            drifted = added_rows >= config.min_drift_rows and scores[max_drift_column] > config.drift_threshold
+
+            if force_full or drifted or new_fraction > config.max_new_fraction:
+                logging.info(
+                    f"Running a full retrain: drift {scores[max_drift_column]:.3f} on {max_drift_column}, "
+                    f"{added_rows} rows ({new_fraction:.1%}) added since the last full fit"
+                )
+                self.append_rows(new_df, test_mask)
+                report["test_score"] = self.full_retrain()
+                state = self.fresh_state(load_object(config.preprocessor_file_path))
+                report["mode"] = "full_retrain"
+            else:
+                # Train and score on the splits with the new rows in memory; the files are
+                # only appended to once the update went through
+                model = load_object(config.model_file_path)
+                X_train_all, y_train_all = self.data_transformation.split_features_target(
+                    pd.concat([read_dataset(config.train_data_path), new_df[~test_mask]], ignore_index=True)
+                )
+                X_test, y_test = self.data_transformation.split_features_target(
+                    pd.concat([read_dataset(config.test_data_path), new_df[test_mask]], ignore_index=True)
+                )
+                X_test = preprocessor.transform(X_test)
+                previous_score = r2_score(y_test, model.predict(X_test))
+
+                updated, mode = self.continue_training(
+                    model,
+                    preprocessor.transform(X_new), y_new.to_numpy(),
+                    preprocessor.transform(X_train_all), y_train_all.to_numpy(),
+                )
+                score = r2_score(y_test, updated.predict(X_test))
+                report.update(previous_test_score=previous_score, test_score=score, mode=mode)
+
+                if score < previous_score - config.max_score_drop:
+                    logging.info(f"Rejected the {mode} model: test R2 {score:.4f} vs {previous_score:.4f}")
+                    report["mode"] = "rejected"
+                else:
+                    save_object(config.model_file_path, updated)
+                    if config.export_model_bundle:
+                        from src.model_io import save_model_bundle
+
+                        save_model_bundle(config.model_bundle_dir, updated, preprocessor)
+                    logging.info(f"Updated the model ({mode}): test R2 {previous_score:.4f} -> {score:.4f}")
+                self.append_rows(new_df, test_mask)
+
+            report["seconds"] = time.perf_counter() - start
+            state["history"].append(report)
+            self.save_state(state)
+            return report
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fold new sales rows into the training data and update the model.")
+    parser.add_argument("new_data_path", help="CSV or Parquet file in the raw data schema")
+    parser.add_argument("--full", action="store_true", help="Run the full transformation and model search")
+    parser.add_argument("--drift-threshold", type=float, default=IncrementalTrainerConfig.drift_threshold)
+    args = parser.parse_args(argv)
+
+    trainer = IncrementalTrainer()
+    trainer.incremental_trainer_config.drift_threshold = args.drift_threshold
+    print(json.dumps(trainer.initiate_incremental_training(args.new_data_path, force_full=args.full), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import os
+import sys
+import json
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, asdict
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import load_object, read_dataset, split_xy
+from src.artifact_store import ArtifactStore, file_digest, params_digest, make_key, source_digest
+from src.components import feature_engineering
+from src.components.data_transformation import DataTransformation
+
+
+METRICS = ["r2", "mae", "rmse", "mape"]
+# Per-row statistics whose sums give every metric: count, |error|, error², centered target,
+# centered target², |error| / |target| and whether the target is non-zero (MAPE denominator)
+N_STATS = 7
+
+
+def row_stats(y_true, y_pred):
+    y_true = np.asarray(y_true, dtype=np.float64)
+    error = np.asarray(y_pred, dtype=np.float64) - y_true
+    # Centering keeps sum(y²) - sum(y)²/n well conditioned for prices in the millions
+    centered = y_true - y_true.mean()
+    nonzero = y_true != 0
+    pct_error = np.divide(np.abs(error), np.abs(y_true), out=np.zeros_like(error), where=nonzero)
+    return np.column_stack([np.ones_like(error), np.abs(error), error**2, centered, centered**2, pct_error, nonzero])
+
+
+def metrics_from_sums(sums):
+    '''
+    R², MAE, RMSE and MAPE from summed row_stats; works on any leading shape, e.g.
+    (resamples, segments, N_STATS).
+    '''
+    n, abs_error, squared_error, target, squared_target, pct_error, n_pct = np.moveaxis(sums[..., :N_STATS], -1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = squared_target - target**2 / n
+        return {
+            "r2": np.where(total > 0, 1 - squared_error / total, np.nan),
+            "mae": abs_error / n,
+            "rmse": np.sqrt(squared_error / n),
+            "mape": pct_error / n_pct,
+        }
+
+
+def _json_float(value):
+    return float(value) if np.isfinite(value) else None
+
+
+def _json_label(value):
+    if pd.isna(value):
+        return None
+    value = value.item() if hasattr(value, "item") else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+@dataclass
+class ModelEvaluationConfig:
+    report_file_path: str=os.path.join("artifacts","evaluation","report.json")
+    # Columns of the engineered test frame the metrics are broken down by
+    segment_columns: tuple=("Zipcode","Overall_Grade","Condition_of_the_House")
+    # Bootstrap resamples of the test set behind the confidence intervals, 0 to skip them
+    n_bootstrap: int=200
+    confidence: float=0.95
+    # Segments with fewer test rows get point metrics only
+    min_segment_rows: int=30
+    # Resamples x test rows materialised per batch, which bounds the bootstrap's memory
+    max_batch_cells: int=2**24
+    random_state: int=42
+    # Keep the report in the artifact store, keyed on the model, preprocessor and test split
+    use_artifact_store: bool=True
+
+
+class ModelEvaluation:
+    '''
+    Test-set R², MAE, RMSE and MAPE overall and per segment, with percentile bootstrap
+    confidence intervals. Every metric is a function of a few per-row sums, so segments are
+    grouped sums and a batch of resamples is one index matrix turned into per-row counts and
+    multiplied with the row statistics; nothing loops over rows in Python.
+    '''
+    def __init__(self):
+        self.model_evaluation_config=ModelEvaluationConfig()
+
+    @staticmethod
+    def segment_codes(values):
+        codes,labels=pd.factorize(pd.Series(values),sort=True,use_na_sentinel=False)
+        return codes,[_json_label(label) for label in labels]
+
+    def bootstrap_sums(self,stats,segments):
+        '''
+        Sums of stats over n_bootstrap resamples of the rows: an array of shape
+        (n_bootstrap, n_stats) overall and, per segmentation name in segments ({name: (codes,
+        n_groups)}), one of shape (n_bootstrap, n_groups, N_STATS).
+        '''
+        config=self.model_evaluation_config
+        n=len(stats)
+        rng=np.random.default_rng(config.random_state)
+        # Rows sorted by segment, so each segment's sums are a matrix product over one slice
+        layouts={}
+        for name,(codes,n_groups) in segments.items():
+            order=np.argsort(codes,kind="stable")
+            bounds=np.concatenate([[0],np.cumsum(np.bincount(codes,minlength=n_groups))])
+            layouts[name]=(order,list(zip(bounds[:-1],bounds[1:])),stats[order,:N_STATS])
+
+        overall=np.empty((config.n_bootstrap,stats.shape[1]))
+        by_segment={name:np.empty((config.n_bootstrap,len(slices),N_STATS)) for name,(_,slices,_) in layouts.items()}
+        batch=max(1,config.max_batch_cells//n)
+        for start in range(0,config.n_bootstrap,batch):
+            size=min(batch,config.n_bootstrap-start)
+            index=rng.integers(0,n,size=(size,n))
+            # How often each row was drawn in each resample, from one bincount over the batch.
+            # Counts are about Poisson(1), so uint16 holds them and keeps the reordering cheap
+            index+=(np.arange(size)*n)[:,None]
+            counts=np.bincount(index.ravel(),minlength=size*n).reshape(size,n).astype(np.uint16)
+            overall[start:start+size]=counts.astype(np.float64)@stats
+            for name,(order,slices,sorted_stats) in layouts.items():
+                sorted_counts=counts.take(order,axis=1).astype(np.float64)
+                for group,(lo,hi) in enumerate(slices):
+                    by_segment[name][start:start+size,group]=sorted_counts[:,lo:hi]@sorted_stats[lo:hi]
+        return overall,by_segment
+
+    def interval(self,replicates):
+        '''
+        Percentile interval of each metric over the resamples (axis 0), as {metric: [low, high]}.
+        '''
+        alpha=(1-self.model_evaluation_config.confidence)/2
+        with warnings.catch_warnings():
+            # Resamples that miss a small segment entirely leave its metrics undefined
+            warnings.simplefilter("ignore",RuntimeWarning)
+            return {name:np.nanquantile(values,[alpha,1-alpha],axis=0) for name,values in replicates.items()}
+
+    def evaluate(self,y_true,y_pred,segments=None,baseline_pred=None):
+        '''
+        Returns the report dict. segments maps a name to one value per test row; baseline_pred,
+        the predictions of e.g. the deployed model, adds a "delta" entry whose intervals come
+        from the same resamples, so it tells whether the new model is better beyond noise.
+        '''
+        try:
+            config=self.model_evaluation_config
+            start=time.perf_counter()
+            stats=row_stats(y_true,y_pred)
+            if baseline_pred is not None:
+                stats=np.hstack([stats,row_stats(y_true,baseline_pred)])
+
+            codes,labels={},{}
+            for name,values in (segments or {}).items():
+                codes[name],labels[name]=self.segment_codes(values)
+            segment_sums={
+                name:np.stack([np.bincount(codes[name],weights=column,minlength=len(labels[name]))
+                               for column in stats[:,:N_STATS].T],axis=1)
+                for name in codes
+            }
+
+            point=metrics_from_sums(stats.sum(axis=0))
+            overall={name:_json_float(point[name]) for name in METRICS}
+            delta=None
+            if baseline_pred is not None:
+                baseline=metrics_from_sums(stats[:,N_STATS:].sum(axis=0))
+                delta={name:_json_float(point[name]-baseline[name]) for name in METRICS}
+
+            report={
+                "n_test":int(len(stats)),
+                "n_bootstrap":config.n_bootstrap,
+                "confidence":config.confidence,
+                "overall":overall,
+                "segments":{},
+            }
+
+            boot_overall=boot_segments=None
+            if config.n_bootstrap:
+                boot_overall,boot_segments=self.bootstrap_sums(
+                    stats,{name:(codes[name],len(labels[name])) for name in codes}
+                )
+                replicates=metrics_from_sums(boot_overall[:,:N_STATS])
+                ci=self.interval(replicates)
+                overall["ci"]={name:[_json_float(bound) for bound in ci[name]] for name in METRICS}
+                if delta is not None:
+                    baseline_replicates=metrics_from_sums(boot_overall[:,N_STATS:])
+                    ci=self.interval({name:replicates[name]-baseline_replicates[name] for name in METRICS})
+                    delta["ci"]={name:[_json_float(bound) for bound in ci[name]] for name in METRICS}
+            if delta is not None:
+                report["delta"]=delta
+
+            for name in codes:
+                point=metrics_from_sums(segment_sums[name])
+                ci=self.interval(metrics_from_sums(boot_segments[name])) if boot_segments is not None else None
+                entries=[]
+                for group,label in enumerate(labels[name]):
+                    n_rows=int(segment_sums[name][group,0])
+                    entry={"value":label,"n":n_rows}
+                    entry.update({metric:_json_float(point[metric][group]) for metric in METRICS})
+                    if ci is not None and n_rows>=config.min_segment_rows:
+                        entry["ci"]={metric:[_json_float(bound) for bound in ci[metric][:,group]] for metric in METRICS}
+                    entries.append(entry)
+                report["segments"][name]=entries
+
+            report["seconds"]=round(time.perf_counter()-start,3)
+            return report
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def get_cache_key(self,model_path,preprocessor_path,test_path):
+        return make_key(
+            file_digest(model_path),
+            file_digest(preprocessor_path),
+            file_digest(test_path),
+            params_digest(asdict(self.model_evaluation_config)),
+            source_digest(sys.modules[__name__],feature_engineering),
+        )
+
+    def write_report(self,report):
+        report_path=self.model_evaluation_config.report_file_path
+        os.makedirs(os.path.dirname(report_path),exist_ok=True)
+        with open(report_path,"w") as file_obj:
+            json.dump(report,file_obj,indent=2)
+        logging.info(f"Evaluation report written to {report_path}")
+
+    def initiate_model_evaluation(self,test_path,test_array=None,
+                                  model_path=os.path.join("artifacts","model.pkl"),
+                                  preprocessor_path=os.path.join("artifacts","preprocessor.pkl")):
+        '''
+        Evaluates the model on the test split and writes the report to report_file_path.
+        test_array, the transformed test split in either DataTransformation layout, saves
+        running the preprocessor again; its rows line up with the split because both come
+        from DataTransformation.split_features_target.
+        '''
+        try:
+            config=self.model_evaluation_config
+            store=key=None
+            if config.use_artifact_store:
+                store=ArtifactStore()
+                key=self.get_cache_key(model_path,preprocessor_path,test_path)
+                if store.has("evaluation",key):
+                    logging.info(f"Reusing evaluation report {key} from the artifact store")
+                    report=store.load_metadata("evaluation",key)
+                    self.write_report(report)
+                    return report
+
+            features,target=DataTransformation().split_features_target(read_dataset(test_path))
+            if test_array is None:
+                X_test,y_test=load_object(preprocessor_path).transform(features),target.to_numpy()
+            else:
+                X_test,y_test=split_xy(test_array)
+                if len(X_test)!=len(features):
+                    raise ValueError(f"test_array has {len(X_test)} rows, the test split {len(features)}")
+
+            model=load_object(model_path)
+            y_pred=model.predict(X_test)
+            segments={column:features[column].to_numpy() for column in config.segment_columns}
+            report={"model":type(model).__name__,**self.evaluate(y_test,y_pred,segments)}
+            logging.info(
+                f"Evaluated {report['model']} on {report['n_test']} rows: "
+                f"R2 {report['overall']['r2']:.4f} in {report['seconds']:.2f}s"
+            )
+
+            self.write_report(report)
+            if store is not None:
+                store.save("evaluation",key,metadata=report)
+            return report
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+
+def main(argv=None):
+    import argparse
+
+    parser=argparse.ArgumentParser(description="Evaluate the trained model on the test split.")
+    parser.add_argument("--test-path",default=os.path.join("artifacts","test.csv"))
+    parser.add_argument("--n-bootstrap",type=int,default=ModelEvaluationConfig.n_bootstrap)
+    args=parser.parse_args(argv)
+
+    evaluation=ModelEvaluation()
+    evaluation.model_evaluation_config.n_bootstrap=args.n_bootstrap
+    report=evaluation.initiate_model_evaluation(args.test_path)
+    for metric in METRICS:
+        value=report["overall"][metric]
+        bounds=report["overall"].get("ci",{}).get(metric)
+        print(f"{metric:<5} {value:.4f}" + (f"  [{bounds[0]:.4f}, {bounds[1]:.4f}]" if bounds else ""))
+
+
+if __name__ == "__main__":
+    main()
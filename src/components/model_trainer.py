@@ -1,107 +1,313 @@
 import os
 import sys
+import json
+import pickle
+import shutil
 # sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from dataclasses import dataclass
 
-from catboost import CatBoostRegressor
-from sklearn.ensemble import (
-    AdaBoostRegressor,
-    GradientBoostingRegressor,
-    RandomForestRegressor,
-)
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
-from sklearn.neighbors import KNeighborsRegressor
-from sklearn.tree import DecisionTreeRegressor
-from xgboost import XGBRegressor
-
 from src.exception import CustomException
 from src.logger import logging
 
-from src.utils import save_object,evaluate_models
+from src.utils import save_object,load_object,evaluate_models,measure_latency,split_xy
+from src.model_io import save_model_bundle
+from src.artifact_store import ArtifactStore, array_digest, params_digest, make_key, source_digest
 
 @dataclass
 class ModelTrainerConfig:
     trained_model_file_path=os.path.join("artifacts","model.pkl")
+    # Also export the winner with its preprocessor as a native-format bundle (src.model_io)
+    export_model_bundle: bool=True
+    model_bundle_dir: str=os.path.join("artifacts","model_bundle")
+    preprocessor_obj_file_path: str=os.path.join("artifacts","preprocessor.pkl")
+    # Worker processes for the hyperparameter search, -1 uses every core
+    n_jobs: int=1
+    # Wall-clock cap in seconds on the search of each model, None for no limit
+    time_budget_per_model: float=None
+    random_state: int=42
+    # "grid" (exhaustive) or "halving" (successive halving), see src.model_search.SEARCH_STRATEGIES
+    search_strategy: str="grid"
+    halving_factor: int=3
+    # Native early stopping on a held-out split for XGBoost, CatBoost and Gradient Boosting
+    early_stopping: bool=False
+    # Keep the winning model in the artifact store, keyed on the arrays, grids and settings,
+    # and reuse it when they are unchanged
+    use_artifact_store: bool=True
+    # Also keep every fitted candidate, with an index of their test scores, so their serving
+    # cost can be compared (benchmarks.inference). Off by default: they take ~150 MB per run,
+    # twice over with the copy in the artifact store; train_pipeline --save-candidates sets it
+    save_candidates: bool=False
+    candidates_dir: str=os.path.join("artifacts","candidates")
+    # Selection: candidates are taken in order of test R² (those below min_test_score never
+    # qualify) and the first whose serving cost fits every budget below wins; None leaves a
+    # budget open. At least n_finalists are measured so the report shows the trade-off.
+    min_test_score: float=0.6
+    n_finalists: int=3
+    max_single_row_p99_ms: float=None
+    max_batch_p99_ms: float=None
+    max_model_size_mb: float=None
+    # Rows per batch and timed calls behind the latency figures
+    latency_batch_size: int=1024
+    latency_iterations: int=20
 
 class ModelTrainer:
     def __init__(self):
         self.model_trainer_config=ModelTrainerConfig()
 
 
+    def get_models(self):
+        '''
+        Candidate estimators, seeded. The model libraries are imported here rather than at
+        module level so importing this module stays cheap.
+        '''
+        from catboost import CatBoostRegressor
+        from sklearn.ensemble import (
+            AdaBoostRegressor,
+            GradientBoostingRegressor,
+            RandomForestRegressor,
+        )
+        from sklearn.linear_model import LinearRegression
+        from sklearn.neighbors import KNeighborsRegressor
+        from sklearn.tree import DecisionTreeRegressor
+        from xgboost import XGBRegressor
+
+        seed = self.model_trainer_config.random_state
+        return {
+            "Random Forest": RandomForestRegressor(random_state=seed),
+            "Decision Tree": DecisionTreeRegressor(random_state=seed),
+            "KNN": KNeighborsRegressor(),
+            "Gradient Boosting": GradientBoostingRegressor(random_state=seed),
+            "Linear Regression": LinearRegression(),
+            "XGBRegressor": XGBRegressor(random_state=seed),
+            "CatBoosting Regressor": CatBoostRegressor(verbose=False, random_seed=seed),
+            "AdaBoost Regressor": AdaBoostRegressor(random_state=seed),
+        }
+
+    def get_param_grids(self):
+        '''
+        Hyperparameter grid of every candidate in get_models.
+        '''
+        return {
+            "Decision Tree": {
+                'criterion': ['squared_error', 'friedman_mse'],
+                'min_samples_split': [2, 5, 10],
+                'max_depth': [3, 5, 10, None]
+                },
+            "Random Forest": {
+                'n_estimators': [10, 50, 100]  
+                },
+            "KNN": {
+                'n_neighbors': [3, 5, 7, 9],
+                'weights': ['uniform', 'distance'],
+                'algorithm': ['ball_tree', 'kd_tree', 'brute']
+                },
+            "Gradient Boosting": {
+                'learning_rate': [0.1, 0.05],
+                'subsample': [0.6, 0.8],
+                'n_estimators': [10, 50, 100]  
+                },
+            "Linear Regression": {},  
+            "XGBRegressor": {
+                'learning_rate': [0.1, 0.05],
+                'n_estimators': [10, 50, 100]
+                },
+            "CatBoosting Regressor": {
+                'depth': [6, 8, 10],  
+                'learning_rate': [0.05, 0.1],
+                'iterations': [30, 50]  
+                },
+            "AdaBoost Regressor": {
+                'learning_rate': [0.1, 0.05],
+                'n_estimators': [10, 50, 100]  
+                }
+        }
+
+    def get_search_kwargs(self):
+        search_kwargs = {"early_stopping": self.model_trainer_config.early_stopping}
+        if self.model_trainer_config.search_strategy == "halving":
+            search_kwargs["factor"] = self.model_trainer_config.halving_factor
+        return search_kwargs
+
+    def get_cache_key(self,train_array,test_array):
+        '''
+        Artifact store key of a training run: the arrays, every candidate's params and grid,
+        the search settings and the code of the trainer and the search.
+        '''
+        from src import model_search, utils
+
+        config=self.model_trainer_config
+        return make_key(
+            *map(array_digest,split_xy(train_array)),
+            *map(array_digest,split_xy(test_array)),
+            params_digest({name: model.get_params() for name, model in self.get_models().items()}),
+            params_digest(self.get_param_grids()),
+            config.time_budget_per_model,
+            config.search_strategy,
+            config.halving_factor,
+            config.early_stopping,
+            config.min_test_score,
+            config.n_finalists,
+            config.max_single_row_p99_ms,
+            config.max_batch_p99_ms,
+            config.max_model_size_mb,
+            config.latency_batch_size,
+            config.latency_iterations,
+            # Entries stored without the candidates cannot restore them
+            config.save_candidates,
+            source_digest(sys.modules[__name__],model_search,utils),
+        )
+
+    @staticmethod
+    def candidate_file_name(name):
+        return name.lower().replace(" ","_")+".pkl"
+
+    def save_candidates(self,model_report):
+        '''
+        Pickles every fitted candidate to candidates_dir and writes candidates.json, which maps
+        each name to its file, test R² and best params. Returns the written files by name.
+        '''
+        candidates_dir=self.model_trainer_config.candidates_dir
+        files,index={},{}
+        for name,entry in model_report.items():
+            file_name=self.candidate_file_name(name)
+            save_object(os.path.join(candidates_dir,file_name),entry["model"])
+            files[file_name]=os.path.join(candidates_dir,file_name)
+            index[name]={"file":file_name,"test_score":entry["test_score"],"best_params":entry["best_params"]}
+        with open(os.path.join(candidates_dir,"candidates.json"),"w") as file_obj:
+            json.dump(index,file_obj,indent=2,default=str)
+        files["candidates.json"]=os.path.join(candidates_dir,"candidates.json")
+        logging.info(f"Saved {len(model_report)} candidate models to {candidates_dir}")
+        return files
+
+    def measure_serving_cost(self,model,X):
+        '''
+        Single-row and batch predict latency (p50/p99 in ms) on rows of X and the pickled size in MB.
+        '''
+        import numpy as np
+
+        config=self.model_trainer_config
+        batch=X[np.arange(config.latency_batch_size)%len(X)]
+        single=measure_latency(model.predict,X[:1],config.latency_iterations)*1000
+        batched=measure_latency(model.predict,batch,max(3,config.latency_iterations//4))*1000
+        return {
+            "single_row_p50_ms":float(np.percentile(single,50)),
+            "single_row_p99_ms":float(np.percentile(single,99)),
+            "batch_size":config.latency_batch_size,
+            "batch_p50_ms":float(np.percentile(batched,50)),
+            "batch_p99_ms":float(np.percentile(batched,99)),
+            "model_size_mb":len(pickle.dumps(model))/2**20,
+        }
+
+    def budget_violations(self,cost):
+        config=self.model_trainer_config
+        budgets={
+            "single_row_p99_ms":config.max_single_row_p99_ms,
+            "batch_p99_ms":config.max_batch_p99_ms,
+            "model_size_mb":config.max_model_size_mb,
+        }
+        return [field for field,limit in budgets.items() if limit is not None and cost[field]>limit]
+
+    def select_model(self,model_report,X_test):
+        '''
+        Returns the name of the most accurate candidate that fits the serving budget. Adds a
+        "serving" entry (cost and budget violations) to every measured candidate's report and
+        sets self.selection to a summary of the trade-off.
+        '''
+        config=self.model_trainer_config
+        ranked=sorted(model_report,key=lambda name: model_report[name]["test_score"],reverse=True)
+        ranked=[name for name in ranked if model_report[name]["test_score"]>=config.min_test_score]
+        if not ranked:
+            raise ValueError("No best model found")
+
+        selected=None
+        for rank,name in enumerate(ranked):
+            if selected is not None and rank>=config.n_finalists:
+                break
+            cost=self.measure_serving_cost(model_report[name]["model"],X_test)
+            cost["violations"]=self.budget_violations(cost)
+            model_report[name]["serving"]=cost
+            logging.info(
+                f"{name}: test R2 {model_report[name]['test_score']:.4f}, single row p99 "
+                f"{cost['single_row_p99_ms']:.2f}ms, batch p99 {cost['batch_p99_ms']:.1f}ms, "
+                f"{cost['model_size_mb']:.1f}MB{', over budget: '+', '.join(cost['violations']) if cost['violations'] else ''}"
+            )
+            if selected is None and not cost["violations"]:
+                selected=name
+        if selected is None:
+            raise ValueError(f"No candidate with test R2 >= {config.min_test_score} fits the serving budget")
+
+        self.selection={
+            "selected":selected,
+            "most_accurate":ranked[0],
+            "test_score_given_up":model_report[ranked[0]]["test_score"]-model_report[selected]["test_score"],
+            "budget":{
+                "max_single_row_p99_ms":config.max_single_row_p99_ms,
+                "max_batch_p99_ms":config.max_batch_p99_ms,
+                "max_model_size_mb":config.max_model_size_mb,
+            },
+        }
+        if selected!=ranked[0]:
+            logging.info(
+                f"Selected {selected} over {ranked[0]} for the serving budget, "
+                f"giving up {self.selection['test_score_given_up']:.4f} test R2"
+            )
+        return selected
+
+    def export_bundle(self,model):
+        save_model_bundle(
+            self.model_trainer_config.model_bundle_dir,
+            model,
+            load_object(self.model_trainer_config.preprocessor_obj_file_path),
+        )
+
     def initiate_model_trainer(self,train_array,test_array):
+        '''
+        Searches every candidate, keeps the selected model and returns its test R². The splits
+        come from DataTransformation: (X, y) pairs in compact mode, otherwise matrices with the
+        target as their last column.
+        '''
         try:
+            store=None
+            if self.model_trainer_config.use_artifact_store:
+                store=ArtifactStore()
+                key=self.get_cache_key(train_array,test_array)
+                if store.has("training",key):
+                    logging.info(f"Reusing trained model {key} from the artifact store")
+                    metadata=store.load_metadata("training",key)
+                    model_path=self.model_trainer_config.trained_model_file_path
+                    os.makedirs(os.path.dirname(model_path),exist_ok=True)
+                    shutil.copyfile(store.file_path("training",key,"model.pkl"),model_path)
+                    # The cached report has every entry but the fitted "model"
+                    self.model_report=metadata["report"]
+                    self.selection=metadata["selection"]
+                    if self.model_trainer_config.save_candidates and metadata.get("candidates"):
+                        os.makedirs(self.model_trainer_config.candidates_dir,exist_ok=True)
+                        for file_name in metadata["candidates"]:
+                            shutil.copyfile(store.file_path("training",key,file_name),
+                                            os.path.join(self.model_trainer_config.candidates_dir,file_name))
+                    if self.model_trainer_config.export_model_bundle:
+                        self.export_bundle(load_object(model_path))
+                    return metadata["test_score"]
+
             logging.info("Split training and test input data")
-            X_train,y_train,X_test,y_test=(
-                train_array[:,:-1],
-                train_array[:,-1],
-                test_array[:,:-1],
-                test_array[:,-1]
-            )
-            models = {
-                "Random Forest": RandomForestRegressor(),
-                "Decision Tree": DecisionTreeRegressor(),
-                "KNN": KNeighborsRegressor(),
-                "Gradient Boosting": GradientBoostingRegressor(),
-                "Linear Regression": LinearRegression(),
-                "XGBRegressor": XGBRegressor(),
-                "CatBoosting Regressor": CatBoostRegressor(verbose=False),
-                "AdaBoost Regressor": AdaBoostRegressor(),
-            }
-
-            params = {
-                "Decision Tree": {
-                    'criterion': ['squared_error', 'friedman_mse'],
-                    'min_samples_split': [2, 5, 10],
-                    'max_depth': [3, 5, 10, None]
-                    },
-                "Random Forest": {
-                    'n_estimators': [10, 50, 100]  
-                    },
-                "KNN": {
-                    'n_neighbors': [3, 5, 7, 9],
-                    'weights': ['uniform', 'distance'],
-                    'algorithm': ['ball_tree', 'kd_tree', 'brute']
-                    },
-                "Gradient Boosting": {
-                    'learning_rate': [0.1, 0.05],
-                    'subsample': [0.6, 0.8],
-                    'n_estimators': [10, 50, 100]  
-                    },
-                "Linear Regression": {},  
-                "XGBRegressor": {
-                    'learning_rate': [0.1, 0.05],
-                    'n_estimators': [10, 50, 100]
-                    },
-                "CatBoosting Regressor": {
-                    'depth': [6, 8, 10],  
-                    'learning_rate': [0.05, 0.1],
-                    'iterations': [30, 50]  
-                    },
-                "AdaBoost Regressor": {
-                    'learning_rate': [0.1, 0.05],
-                    'n_estimators': [10, 50, 100]  
-                    }
-            }
-            
+            X_train,y_train=split_xy(train_array)
+            X_test,y_test=split_xy(test_array)
+            models = self.get_models()
 
-            
+            params = self.get_param_grids()
 
             model_report:dict=evaluate_models(X_train=X_train,y_train=y_train,X_test=X_test,y_test=y_test,
-                                             models=models,param = params)
-            
-            ## To get best model score from dict
-            best_model_score = max(sorted(model_report.values()))
-
-            ## To get best model name from dict
+                                             models=models,param = params,
+                                             n_jobs=self.model_trainer_config.n_jobs,
+                                             time_budget=self.model_trainer_config.time_budget_per_model,
+                                             search_strategy=self.model_trainer_config.search_strategy,
+                                             search_kwargs=self.get_search_kwargs())
+            self.model_report = model_report
 
-            best_model_name = list(model_report.keys())[
-                list(model_report.values()).index(best_model_score)
-            ]
-            best_model = models[best_model_name]
-
-            if best_model_score<0.6:
-                raise CustomException("No best model found")
+            ## The most accurate model that fits the serving budget
+            best_model_name = self.select_model(model_report, X_test)
+            best_model_score = model_report[best_model_name]["test_score"]
+            best_model = model_report[best_model_name]["model"]
             logging.info(f"Best found model on both training and testing dataset")
 
             save_object(
@@ -109,10 +315,27 @@ class ModelTrainer:
                 obj=best_model
             )
 
-            predicted=best_model.predict(X_test)
+            if self.model_trainer_config.export_model_bundle:
+                self.export_bundle(best_model)
+
+            candidate_files={}
+            if self.model_trainer_config.save_candidates:
+                candidate_files=self.save_candidates(model_report)
+
+            if store is not None:
+                report={
+                    name:{field:value for field,value in entry.items() if field!="model"}
+                    for name,entry in model_report.items()
+                }
+                store.save(
+                    "training",key,
+                    files={"model.pkl":self.model_trainer_config.trained_model_file_path,**candidate_files},
+                    metadata={"best_model":best_model_name,"test_score":best_model_score,"report":report,
+                              "selection":self.selection,"candidates":sorted(candidate_files)},
+                )
 
-            r2_square = r2_score(y_test, predicted)
-            print(f"R Squared Value : {r2_square}")
+            r2_square = best_model_score
+            logging.info(f"R Squared Value : {r2_square}")
             return r2_square
             
 
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+def lookup(categories, table, values, fill):
+    '''
+    Rows of table for values found in the sorted categories array, fill for the others
+    (unseen or missing). One binary search per value, no hashing.
+    '''
+    values = np.asarray(values, dtype=np.float64).ravel()
+    positions = np.searchsorted(categories, values)
+    np.minimum(positions, len(categories) - 1, out=positions)
+    # NaN never compares equal, so missing values take the fill too
+    found = categories[positions] == values
+    return np.where(found[:, None], table[positions], fill)
+
+
+class TargetFrequencyEncoder(BaseEstimator, TransformerMixin):
+    '''
+    Encodes one numeric-coded categorical column (Zipcode) as two features: the smoothed mean
+    target of its category and the category's share of the training rows.
+
+    The mean is shrunk towards the overall mean with `smoothing` pseudo-rows, so rare and
+    unseen categories fall back to the prior. fit_transform cross-fits it: each training row
+    is encoded with statistics from the other n_folds - 1 folds, so it never sees its own
+    target. The fitted encoder is a sorted category array and an (n_categories, 2) table.
+    '''
+    def __init__(self, smoothing=20.0, n_folds=5, random_state=42):
+        self.smoothing = smoothing
+        self.n_folds = n_folds
+        self.random_state = random_state
+
+    @staticmethod
+    def _values(X):
+        values = X.to_numpy(dtype=np.float64) if isinstance(X, pd.DataFrame) else np.asarray(X, dtype=np.float64)
+        if values.ndim == 2 and values.shape[1] != 1:
+            raise ValueError(f"TargetFrequencyEncoder encodes one column, got {values.shape[1]}")
+        return values.ravel()
+
+    def _smoothed_means(self, sums, counts):
+        return (sums + self.smoothing * self.prior_) / (counts + self.smoothing)
+
+    def _fit(self, X, y):
+        if y is None:
+            raise ValueError("TargetFrequencyEncoder needs the target to fit")
+        values = self._values(X)
+        target = np.asarray(y, dtype=np.float64)
+        known = ~np.isnan(values) & ~np.isnan(target)
+
+        self.categories_, codes = np.unique(values[known], return_inverse=True)
+        self.prior_ = float(target[known].mean())
+        sums = np.bincount(codes, weights=target[known], minlength=len(self.categories_))
+        counts = np.bincount(codes, minlength=len(self.categories_)).astype(np.float64)
+        self.table_ = np.column_stack([self._smoothed_means(sums, counts), counts / len(values)])
+        # Unseen and missing categories: the prior and a frequency of zero
+        self.fill_values_ = np.array([self.prior_, 0.0])
+        self.n_features_in_ = 1
+        return values, target, known, codes, sums, counts
+
+    def fit(self, X, y=None):
+        self._fit(X, y)
+        return self
+
+    def fit_transform(self, X, y=None, **fit_params):
+        from sklearn.model_selection import KFold
+
+        values, target, known, codes, sums, counts = self._fit(X, y)
+        out = np.tile(self.fill_values_, (len(values), 1))
+        rows = np.flatnonzero(known)
+        out[rows, 1] = self.table_[codes, 1]
+
+        folds = KFold(n_splits=self.n_folds, shuffle=True, random_state=self.random_state)
+        for _, fold in folds.split(rows):
+            # Out-of-fold statistics are the totals minus the fold's own rows
+            fold_sums = np.bincount(codes[fold], weights=target[rows[fold]], minlength=len(sums))
+            fold_counts = np.bincount(codes[fold], minlength=len(counts))
+            means = self._smoothed_means(sums - fold_sums, counts - fold_counts)
+            out[rows[fold], 0] = means[codes[fold]]
+        return out
+
+    def transform(self, X):
+        return lookup(self.categories_, self.table_, self._values(X), self.fill_values_)
+
+    def get_feature_names_out(self, input_features=None):
+        column = "x0" if input_features is None else input_features[0]
+        return np.array([f"{column}_target_mean", f"{column}_frequency"], dtype=object)
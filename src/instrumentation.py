@@ -0,0 +1,339 @@
+import os
+import json
+import time
+import bisect
+import functools
+import threading
+from datetime import datetime
+from dataclasses import dataclass
+from logging.handlers import MemoryHandler
+from src.logger import logging, LazyFileHandler
+
+
+# Upper bounds in ms of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000,
+                      10000, 30000, 60000, 300000)
+
+
+# Records buffered before they are written to the JSON log
+LOG_BUFFER_RECORDS = 256
+
+_statm = {}
+
+
+def current_rss_mb():
+    '''
+    Resident set size of this process in MB, from /proc/self/statm; None where that is missing.
+    The file stays open, so each call is a single pread.
+    '''
+    try:
+        pid = os.getpid()
+        if _statm.get("pid") != pid:
+            _statm.update(pid=pid, fd=os.open("/proc/self/statm", os.O_RDONLY),
+                          page_mb=os.sysconf("SC_PAGE_SIZE") / 2**20)
+        return int(os.pread(_statm["fd"], 128, 0).split()[1]) * _statm["page_mb"]
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Histogram:
+    '''
+    Fixed-bucket latency histogram: count, sum, min, max and per-bucket counts, with
+    percentiles interpolated linearly within the bucket they fall in.
+    '''
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, snapshot):
+        '''
+        Adds the counts of another histogram's snapshot() (same bounds) to this one.
+        '''
+        if not snapshot["count"]:
+            return
+        labels = {str(bound): i for i, bound in enumerate(self.bounds)}
+        for label, n in snapshot["buckets"].items():
+            self.buckets[labels.get(label, len(self.bounds))] += n
+        self.count += snapshot["count"]
+        self.total += snapshot["sum"]
+        self.min = min(self.min, snapshot["min"])
+        self.max = max(self.max, snapshot["max"])
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank, seen = q / 100 * self.count, 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                lower = max(self.bounds[i - 1] if i else 0.0, self.min)
+                upper = min(self.bounds[i] if i < len(self.bounds) else self.max, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": {("+Inf" if i == len(self.bounds) else str(self.bounds[i])): n
+                        for i, n in enumerate(self.buckets) if n},
+        }
+
+
+class MetricsRegistry:
+    '''
+    In-process counters and latency histograms, safe to update from several threads.
+    snapshot() returns them as a JSON-able dict and dump() writes that to a file.
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {name: histogram.snapshot() for name, histogram in self.histograms.items()},
+            }
+
+    def merge(self, snapshot):
+        '''
+        Adds a snapshot() taken elsewhere, e.g. in a worker process, to this registry.
+        '''
+        with self._lock:
+            for name, value in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, histogram_snapshot in snapshot["histograms"].items():
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = Histogram()
+                histogram.merge(histogram_snapshot)
+
+    def dump(self, file_path):
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        with open(file_path, "w") as file_obj:
+            json.dump(self.snapshot(), file_obj, indent=2)
+        return file_path
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+class _NullSpan:
+    '''
+    What span() returns while instrumentation is off: entering, leaving and set() do nothing.
+    '''
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    '''
+    One timed section. On exit it records its duration in the "<name>" latency histogram,
+    adds its rows to the "<name>.rows" counter (and failures to "<name>.errors") and writes a
+    JSON record with the duration, rows, RSS before/after and the enclosing span.
+    '''
+    __slots__ = ("instrumentation", "name", "fields", "parent", "_start", "_rss")
+
+    def __init__(self, instrumentation, name, fields):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.fields = fields
+
+    def set(self, **fields):
+        '''
+        Adds fields to the record, e.g. span.set(rows=len(df)) once the row count is known.
+        '''
+        self.fields.update(fields)
+
+    def __enter__(self):
+        stack = self.instrumentation._stack()
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self._rss = current_rss_mb() if self.instrumentation.config.track_memory else None
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        self.instrumentation._stack().pop()
+        self.instrumentation.finish(self, duration_ms, exc_type)
+        return False
+
+
+@dataclass
+class InstrumentationConfig:
+    # Off by default; enable() turns it on for the process
+    enabled: bool=False
+    # One JSON object per line for every finished span, None to only update the metrics
+    log_path: str=os.path.join("logs","instrumentation.jsonl")
+    # RSS before and after every span (one read of /proc/self/statm each)
+    track_memory: bool=True
+
+
+class Instrumentation:
+    '''
+    Timing spans and a metrics registry for the pipelines:
+
+        with instrumentation.span("predict.transform", rows=len(features)):
+            ...
+
+        @instrumentation.timed("ingest")
+        def initiate_data_ingestion(self): ...
+
+    While disabled, span() hands back a shared no-op object and timed() calls straight
+    through, so instrumented code costs one attribute check per call.
+    '''
+    def __init__(self, config=None):
+        self.config = config or InstrumentationConfig()
+        self.metrics = MetricsRegistry()
+        self._local = threading.local()
+        self._logger = logging.getLogger("src.instrumentation")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._handler = None
+
+    @property
+    def enabled(self):
+        return self.config.enabled
+
+    def enable(self, log_path=None, track_memory=None):
+        if log_path is not None:
+            self.config.log_path = log_path
+        if track_memory is not None:
+            self.config.track_memory = track_memory
+        self._set_handler(self.config.log_path)
+        self.config.enabled = True
+        return self
+
+    def disable(self):
+        self.config.enabled = False
+        self._set_handler(None)
+
+    def reset_worker(self, enabled):
+        '''
+        Starts a pool worker process afresh: an empty registry and no JSON log, with records the
+        parent had buffered before a fork dropped rather than written twice. When enabled, spans
+        only update the metrics, which the worker hands back to the parent to merge.
+        '''
+        if self._handler is not None:
+            self._handler.buffer.clear()
+        self.disable()
+        self.metrics.reset()
+        if enabled:
+            self.enable(log_path="", track_memory=False)
+
+    def _set_handler(self, log_path):
+        if self._handler is not None:
+            target = self._handler.target
+            self._logger.removeHandler(self._handler)
+            # MemoryHandler.close() flushes the buffer but leaves its target open
+            self._handler.close()
+            target.close()
+            self._handler = None
+        if log_path:
+            target = LazyFileHandler(log_path)
+            target.setFormatter(logging.Formatter("%(message)s"))
+            # Written in blocks rather than flushed per record; disable() and exit flush the rest
+            self._handler = MemoryHandler(LOG_BUFFER_RECORDS, flushLevel=logging.ERROR, target=target)
+            self._logger.addHandler(self._handler)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, **fields):
+        if not self.config.enabled:
+            return _NULL_SPAN
+        return Span(self, name, fields)
+
+    def timed(self, name):
+        '''
+        Decorator running every call of the function inside span(name).
+        '''
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.config.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, name, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def finish(self, span, duration_ms, exc_type=None):
+        self.metrics.observe(span.name, duration_ms)
+        rows = span.fields.get("rows")
+        if rows is not None:
+            self.metrics.increment(f"{span.name}.rows", rows)
+        if exc_type is not None:
+            self.metrics.increment(f"{span.name}.errors")
+        if not self._logger.handlers:
+            return
+
+        record = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "span": span.name,
+            "parent": span.parent,
+            "duration_ms": round(duration_ms, 3),
+            "status": "ok" if exc_type is None else f"error:{exc_type.__name__}",
+            **span.fields,
+        }
+        if span._rss is not None:
+            rss = current_rss_mb()
+            record["rss_mb"] = round(rss, 1)
+            record["rss_delta_mb"] = round(rss - span._rss, 1)
+        # makeRecord + handle skips the caller lookup logger.info() would do for every span
+        self._logger.handle(self._logger.makeRecord(
+            self._logger.name, logging.INFO, "", 0, json.dumps(record, default=str), None, None
+        ))
+
+
+# Process-wide instance used by the pipelines
+instrumentation = Instrumentation()
@@ -4,12 +4,25 @@ from datetime import datetime
 
 LOG_FILE=f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
 logs_path=os.path.join(os.getcwd(),"logs",LOG_FILE)
-os.makedirs(logs_path,exist_ok=True)
 
 LOG_FILE_PATH=os.path.join(logs_path,LOG_FILE)
 
+
+class LazyFileHandler(logging.FileHandler):
+    '''
+    FileHandler that creates the log directory and file when the first record is written,
+    so importing the package has no filesystem side effects.
+    '''
+    def __init__(self,filename,mode="a",encoding=None):
+        super().__init__(filename,mode=mode,encoding=encoding,delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename),exist_ok=True)
+        return super()._open()
+
+
 logging.basicConfig(
-    filename=LOG_FILE_PATH,
+    handlers=[LazyFileHandler(LOG_FILE_PATH)],
     format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
     level=logging.INFO,
 
@@ -0,0 +1,342 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+from src.exception import CustomException
+from src.logger import logging
+
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+PREPROCESSOR_FILE = "preprocessor.npz"
+
+# Native serializers: estimator class name -> (format name, file name)
+NATIVE_MODEL_FORMATS = {
+    "XGBRegressor": ("xgboost-ubj", "model.ubj"),
+    "CatBoostRegressor": ("catboost-cbm", "model.cbm"),
+}
+
+
+def _sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for block in iter(lambda: file_obj.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _to_json_values(values):
+    return [v.item() if isinstance(v, np.generic) else v for v in values]
+
+
+def compile_preprocessor(preprocessor):
+    '''
+    Flattens the fitted ColumnTransformer from DataTransformation.get_data_transformer_object
+    into a JSON-able spec plus a dict of float arrays. Each transformer becomes a list of
+    ops (impute, scale, onehot, ordinal, geo_neighbors, lookup) over its columns; string
+    categories and fill values live in the spec, numeric statistics and tables in the arrays.
+    '''
+    spec, arrays = [], {}
+    for name, pipeline, columns in preprocessor.transformers_:
+        if name == "remainder":
+            if pipeline != "drop":
+                raise ValueError("Only remainder='drop' can be compiled")
+            continue
+
+        steps = pipeline.steps if hasattr(pipeline, "steps") else [(name, pipeline)]
+        ops = []
+        for step_name, step in steps:
+            prefix = f"{name}.{step_name}"
+            kind = type(step).__name__
+            if kind == "SimpleImputer":
+                statistics = step.statistics_
+                if statistics.dtype.kind in "fiu":
+                    arrays[f"{prefix}.statistics"] = statistics.astype(np.float64)
+                    ops.append({"op": "impute", "array": f"{prefix}.statistics"})
+                else:
+                    ops.append({"op": "impute", "values": _to_json_values(statistics)})
+            elif kind == "StandardScaler":
+                op = {"op": "scale"}
+                if step.mean_ is not None and step.with_mean:
+                    arrays[f"{prefix}.mean"] = step.mean_
+                    op["mean"] = f"{prefix}.mean"
+                if step.scale_ is not None and step.with_std:
+                    arrays[f"{prefix}.scale"] = step.scale_
+                    op["scale"] = f"{prefix}.scale"
+                ops.append(op)
+            elif kind == "OneHotEncoder":
+                if step.drop_idx_ is not None or step.handle_unknown != "ignore":
+                    raise ValueError("Only OneHotEncoder(handle_unknown='ignore') without drop can be compiled")
+                ops.append({"op": "onehot", "categories": [_to_json_values(c) for c in step.categories_]})
+            elif kind == "OrdinalEncoder":
+                ops.append({"op": "ordinal", "categories": [_to_json_values(c) for c in step.categories_]})
+            elif kind == "GeoNeighborFeatures":
+                # The ball tree itself is rebuilt from the indexed sales when the bundle is loaded
+                index = step.index
+                arrays[f"{prefix}.coordinates"] = index.coordinates
+                arrays[f"{prefix}.prices"] = index.prices
+                arrays[f"{prefix}.fill"] = step.fill_values_
+                ops.append({
+                    "op": "geo_neighbors", "k": step.k, "radius_km": step.radius_km, "leaf_size": step.leaf_size,
+                    "coordinates": f"{prefix}.coordinates", "prices": f"{prefix}.prices", "fill": f"{prefix}.fill",
+                })
+            elif kind == "TargetFrequencyEncoder":
+                # A sorted key array and its table rows, searched with np.searchsorted at transform
+                arrays[f"{prefix}.keys"] = step.categories_
+                arrays[f"{prefix}.table"] = step.table_
+                arrays[f"{prefix}.fill"] = step.fill_values_
+                ops.append({
+                    "op": "lookup", "keys": f"{prefix}.keys", "table": f"{prefix}.table",
+                    "fill": f"{prefix}.fill",
+                })
+            else:
+                raise ValueError(f"Cannot compile preprocessing step {kind}")
+
+        numeric = ops[0]["op"] in ("scale", "geo_neighbors", "lookup") or "array" in ops[0]
+        spec.append({
+            "name": name,
+            "columns": list(columns),
+            "dtype": "float64" if numeric else "object",
+            "ops": ops,
+        })
+    return spec, arrays
+
+
+def build_geo_index(op, arrays):
+    '''
+    NeighborPriceIndex of a compiled geo_neighbors op.
+    '''
+    from src.components.geo_features import NeighborPriceIndex
+
+    return NeighborPriceIndex(arrays[op["coordinates"]], arrays[op["prices"]], leaf_size=op["leaf_size"])
+
+
+class ArrayPreprocessor:
+    '''
+    NumPy re-implementation of the fitted preprocessor from a compiled spec and arrays.
+    transform() returns the same dense float matrix as the ColumnTransformer it was compiled from.
+    '''
+    def __init__(self, spec, arrays):
+        self.spec = spec
+        self.arrays = arrays
+        self.feature_names_in_ = list(dict.fromkeys(column for block in spec for column in block["columns"]))
+        self._geo_indexes = {}
+
+    @staticmethod
+    def _is_missing(values):
+        return pd.isna(values)
+
+    def _apply(self, op, values):
+        kind = op["op"]
+        if kind == "impute":
+            fill = self.arrays[op["array"]] if "array" in op else np.array(op["values"], dtype=object)
+            missing = self._is_missing(values)
+            if missing.any():
+                values = np.where(missing, fill, values)
+            return values
+        if kind == "scale":
+            values = values.astype(np.float64)
+            if "mean" in op:
+                values = values - self.arrays[op["mean"]]
+            if "scale" in op:
+                values = values / self.arrays[op["scale"]]
+            return values
+        if kind == "onehot":
+            blocks = [
+                (values[:, [i]] == np.array(categories, dtype=object)).astype(np.float64)
+                for i, categories in enumerate(op["categories"])
+            ]
+            return np.hstack(blocks)
+        if kind == "ordinal":
+            out = np.empty(values.shape, dtype=np.float64)
+            for i, categories in enumerate(op["categories"]):
+                codes = pd.Categorical(values[:, i], categories=categories).codes
+                if (codes < 0).any():
+                    unknown = values[codes < 0, i][0]
+                    raise ValueError(f"Found unknown category {unknown!r} in column {i} during transform")
+                out[:, i] = codes
+            return out
+        if kind == "geo_neighbors":
+            from src.components.geo_features import neighbor_features
+
+            index = self._geo_indexes.get(op["coordinates"])
+            if index is None:
+                index = self._geo_indexes[op["coordinates"]] = build_geo_index(op, self.arrays)
+            return neighbor_features(index, values, op["k"], op["radius_km"], self.arrays[op["fill"]])
+        if kind == "lookup":
+            from src.components.target_encoding import lookup
+
+            return lookup(self.arrays[op["keys"]], self.arrays[op["table"]], values, self.arrays[op["fill"]])
+        raise ValueError(f"Unknown op {kind}")
+
+    def transform(self, X):
+        blocks = []
+        for block in self.spec:
+            values = X[block["columns"]].to_numpy(dtype=block["dtype"])
+            for op in block["ops"]:
+                values = self._apply(op, values)
+            blocks.append(values)
+        return np.hstack(blocks)
+
+
+def save_model_bundle(bundle_dir, model, preprocessor):
+    '''
+    Writes model and preprocessor to bundle_dir: the model through its library's native
+    format where there is one (pickle otherwise), the preprocessor as preprocessor.npz plus
+    its spec, and a manifest.json with the input schema and the sha256 of every file.
+    The directory is swapped in atomically.
+    '''
+    try:
+        parent = os.path.dirname(os.path.abspath(bundle_dir))
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".bundle-")
+        # mkdtemp creates the directory as 0700
+        os.chmod(tmp_dir, 0o755)
+
+        model_class = type(model).__name__
+        model_format, model_file = NATIVE_MODEL_FORMATS.get(model_class, ("pickle", "model.pkl"))
+        model_path = os.path.join(tmp_dir, model_file)
+        if model_format == "xgboost-ubj":
+            model.save_model(model_path)
+        elif model_format == "catboost-cbm":
+            model.save_model(model_path, format="cbm")
+        else:
+            from src.utils import save_object
+            save_object(model_path, model)
+
+        spec, arrays = compile_preprocessor(preprocessor)
+        np.savez(os.path.join(tmp_dir, PREPROCESSOR_FILE), **arrays)
+
+        manifest = {
+            "format_version": BUNDLE_FORMAT_VERSION,
+            "model": {
+                "class": model_class,
+                "format": model_format,
+                "file": model_file,
+                "sha256": _sha256(model_path),
+            },
+            "preprocessor": {
+                "file": PREPROCESSOR_FILE,
+                "sha256": _sha256(os.path.join(tmp_dir, PREPROCESSOR_FILE)),
+                "spec": spec,
+            },
+            "schema": {
+                "input_columns": list(dict.fromkeys(column for block in spec for column in block["columns"])),
+                "n_output_features": int(ArrayPreprocessor(spec, arrays).transform(
+                    _example_frame(spec)).shape[1]),
+            },
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as file_obj:
+            json.dump(manifest, file_obj, indent=2)
+
+        if os.path.isdir(bundle_dir):
+            shutil.rmtree(bundle_dir)
+        os.replace(tmp_dir, bundle_dir)
+        logging.info(f"Saved {model_class} model bundle to {bundle_dir}")
+        return bundle_dir
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def _example_frame(spec):
+    '''
+    One-row frame with a valid value for every input column, used to record the output width.
+    '''
+    row = {}
+    for block in spec:
+        categories = next((op["categories"] for op in block["ops"] if "categories" in op), None)
+        for i, column in enumerate(block["columns"]):
+            row[column] = [categories[i][0] if categories else 0.0]
+    return pd.DataFrame(row)
+
+
+def xgb_best_iteration(model):
+    '''
+    best_iteration of an XGBRegressor fitted with early stopping; None otherwise, where
+    XGBoost raises instead.
+    '''
+    try:
+        return model.best_iteration
+    except AttributeError:
+        return None
+
+
+def _load_native_model(model_format, model_path, model_class):
+    if model_format == "xgboost-ubj":
+        from xgboost import XGBRegressor
+
+        model = XGBRegressor()
+        model.load_model(model_path)
+        return model
+    if model_format == "catboost-cbm":
+        from catboost import CatBoostRegressor
+
+        model = CatBoostRegressor()
+        model.load_model(model_path, format="cbm")
+        return model
+    raise ValueError(f"Unknown native model format {model_format} for {model_class}")
+
+
+def load_model_bundle(bundle_dir, verify=True, allow_pickle=False):
+    '''
+    Returns (model, ArrayPreprocessor) from a bundle written by save_model_bundle.
+    With verify, every file is checked against the manifest's sha256 before it is read.
+    That catches truncated or corrupted files, but it is an integrity check, not a safety
+    guarantee: the manifest sits next to the files, so whoever can replace a file can
+    rewrite its checksum too. A model in the pickle fallback format is therefore refused
+    unless allow_pickle is set for a bundle from a trusted source.
+    '''
+    try:
+        with open(os.path.join(bundle_dir, MANIFEST_FILE)) as file_obj:
+            manifest = json.load(file_obj)
+        if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model bundle format {manifest.get('format_version')}")
+
+        model_info, preprocessor_info = manifest["model"], manifest["preprocessor"]
+        model_path = os.path.join(bundle_dir, model_info["file"])
+        preprocessor_path = os.path.join(bundle_dir, preprocessor_info["file"])
+        if verify:
+            for info, file_path in ((model_info, model_path), (preprocessor_info, preprocessor_path)):
+                if _sha256(file_path) != info["sha256"]:
+                    raise ValueError(f"Checksum mismatch for {file_path}")
+
+        if model_info["format"] == "pickle":
+            if not allow_pickle:
+                raise ValueError(f"{model_path} is a pickled {model_info['class']}; "
+                                 f"pass allow_pickle=True to load pickles from a trusted bundle")
+            from src.utils import load_object
+            model = load_object(model_path)
+        else:
+            model = _load_native_model(model_info["format"], model_path, model_info["class"])
+
+        with np.load(preprocessor_path, allow_pickle=False) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        preprocessor = ArrayPreprocessor(preprocessor_info["spec"], arrays)
+        return model, preprocessor
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export model.pkl and preprocessor.pkl as a model bundle.")
+    parser.add_argument("--model-path", default=os.path.join("artifacts", "model.pkl"))
+    parser.add_argument("--preprocessor-path", default=os.path.join("artifacts", "preprocessor.pkl"))
+    parser.add_argument("--bundle-dir", default=os.path.join("artifacts", "model_bundle"))
+    args = parser.parse_args(argv)
+
+    from src.utils import load_object
+
+    save_model_bundle(args.bundle_dir, load_object(args.model_path), load_object(args.preprocessor_path))
+    print(f"Model bundle written to {args.bundle_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+import sys
+import time
+import numpy as np
+from joblib import Parallel, delayed, cpu_count
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ParameterGrid, train_test_split
+from src.exception import CustomException
+from src.logger import logging
+
+
+# Learners that run their own thread pool, and the constructor argument that sizes it.
+NATIVE_THREAD_PARAMS = {
+    "XGBRegressor": "n_jobs",
+    "CatBoostRegressor": "thread_count",
+    "RandomForestRegressor": "n_jobs",
+    "KNeighborsRegressor": "n_jobs",
+}
+
+# Ensembles whose number of boosting rounds / trees serves as the successive-halving resource.
+RESOURCE_PARAMS = {
+    "RandomForestRegressor": "n_estimators",
+    "GradientBoostingRegressor": "n_estimators",
+    "AdaBoostRegressor": "n_estimators",
+    "XGBRegressor": "n_estimators",
+    "CatBoostRegressor": "iterations",
+}
+
+EARLY_STOPPING_ROUNDS = 10
+EARLY_STOPPING_VALIDATION_FRACTION = 0.1
+
+
+def effective_n_jobs(n_jobs):
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, cpu_count() + 1 + n_jobs)
+    return n_jobs
+
+
+def limit_native_threads(estimator, n_threads):
+    '''
+    Caps the native thread pool of XGBoost/CatBoost/RandomForest/KNN so that
+    n_jobs worker processes times n_threads does not exceed the available cores.
+    '''
+    param = NATIVE_THREAD_PARAMS.get(type(estimator).__name__)
+    if param is not None:
+        estimator.set_params(**{param: n_threads})
+    return estimator
+
+
+def fit_estimator(estimator, X, y, early_stopping=False):
+    '''
+    Fits estimator on X, y. With early_stopping the boosting models stop adding rounds
+    once the score on a held-out split stops improving: GradientBoostingRegressor through
+    its own n_iter_no_change, XGBoost and CatBoost through an eval_set carved out of X.
+    '''
+    name = type(estimator).__name__
+    if early_stopping and name == "GradientBoostingRegressor":
+        estimator.set_params(
+            n_iter_no_change=EARLY_STOPPING_ROUNDS,
+            validation_fraction=EARLY_STOPPING_VALIDATION_FRACTION,
+        )
+    elif early_stopping and name in ("XGBRegressor", "CatBoostRegressor"):
+        fit_idx, val_idx = train_test_split(
+            np.arange(len(y)), test_size=EARLY_STOPPING_VALIDATION_FRACTION, random_state=0
+        )
+        estimator.set_params(early_stopping_rounds=EARLY_STOPPING_ROUNDS)
+        return estimator.fit(
+            X[fit_idx], y[fit_idx], eval_set=[(X[val_idx], y[val_idx])], verbose=False
+        )
+    return estimator.fit(X, y)
+
+
+def kfold_views(n_samples, cv):
+    '''
+    The KFold(cv) splits of n_samples rows, with every contiguous part as a slice: indexing
+    with a slice gives a view, so the test fold and the training part of the first and last
+    folds are not copied. Only the training part of a middle fold stays an index array.
+    '''
+    splits = []
+    for train, test in KFold(n_splits=cv).split(np.empty((n_samples, 0))):
+        start, stop = int(test[0]), int(test[-1]) + 1
+        if start == 0:
+            train = slice(stop, n_samples)
+        elif stop == n_samples:
+            train = slice(0, start)
+        splits.append((train, slice(start, stop)))
+    return splits
+
+
+def _fit_and_score(estimator, params, X, y, train, test, early_stopping=False):
+    estimator = clone(estimator).set_params(**params)
+
+    start = time.perf_counter()
+    fit_estimator(estimator, X[train], y[train], early_stopping=early_stopping)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score = r2_score(y[test], estimator.predict(X[test]))
+    score_time = time.perf_counter() - start
+
+    return score, fit_time, score_time
+
+
+def _fit_and_score_task(c, f, estimator, params, X, y, train, test, early_stopping):
+    return c, f, _fit_and_score(estimator, params, X, y, train, test, early_stopping)
+
+
+class GridSearch:
+    '''
+    Exhaustive search over param_grid scored with R² on KFold(cv) splits, like
+    GridSearchCV(estimator, param_grid, cv=cv) for a regressor.
+
+    With n_jobs != 1 every (candidate, fold) fit is scheduled on a joblib process pool
+    and the natively threaded learners are limited to cores // n_jobs threads each.
+    time_budget (seconds) stops scheduling new fits once exceeded; candidates that did
+    not finish all their folds are left out of the selection.
+
+    With refit=True the best candidate is fitted once on the whole of X and exposed as
+    best_estimator_, with its native thread settings left as configured.
+    early_stopping turns on native early stopping for the boosting models (see fit_estimator).
+    fold_views passes the folds as slices where they are contiguous (see kfold_views) rather
+    than as index arrays, which copy X for every fit; the splits are the same.
+    '''
+    def __init__(self, estimator, param_grid, cv=3, n_jobs=1, time_budget=None, refit=True,
+                 early_stopping=False, fold_views=True):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.time_budget = time_budget
+        self.refit = refit
+        self.early_stopping = early_stopping
+        self.fold_views = fold_views
+
+    def _worker_estimator(self):
+        estimator = clone(self.estimator)
+        n_jobs = effective_n_jobs(self.n_jobs)
+        if n_jobs > 1:
+            limit_native_threads(estimator, max(1, cpu_count() // n_jobs))
+        return estimator
+
+    def _iter_results(self, estimator, candidates, splits, X, y):
+        tasks = [
+            (c, f) for c in range(len(candidates)) for f in range(len(splits))
+        ]
+        n_jobs = effective_n_jobs(self.n_jobs)
+
+        if n_jobs == 1:
+            for c, f in tasks:
+                yield _fit_and_score_task(
+                    c, f, estimator, candidates[c], X, y, *splits[f], self.early_stopping
+                )
+            return
+
+        # X and y go through the task arguments so joblib memory-maps them for the workers
+        parallel = Parallel(n_jobs=n_jobs, return_as="generator_unordered")
+        results = parallel(
+            delayed(_fit_and_score_task)(
+                c, f, estimator, candidates[c], X, y, *splits[f], self.early_stopping
+            )
+            for c, f in tasks
+        )
+        try:
+            yield from results
+        finally:
+            # Closing the generator cancels the fits that have not started yet
+            results.close()
+
+    def _over_budget(self):
+        return (
+            self.time_budget is not None
+            and time.perf_counter() - self._start > self.time_budget
+        )
+
+    def _score_candidates(self, estimator, candidates, X, y):
+        '''
+        Cross-validates every candidate and returns the per-candidate mean R² (-inf for
+        candidates cut off by the time budget), mean fit time, mean score time and
+        whether the time budget ran out.
+        '''
+        if self.fold_views:
+            splits = kfold_views(len(X), self.cv)
+        else:
+            splits = list(KFold(n_splits=self.cv).split(X))
+        scores = np.full((len(candidates), len(splits)), np.nan)
+        fit_times = np.full_like(scores, np.nan)
+        score_times = np.full_like(scores, np.nan)
+
+        exhausted = False
+        results = self._iter_results(estimator, candidates, splits, X, y)
+        try:
+            for c, f, (score, fit_time, score_time) in results:
+                scores[c, f] = score
+                fit_times[c, f] = fit_time
+                score_times[c, f] = score_time
+
+                if self._over_budget() and not np.isnan(scores).any(axis=1).all():
+                    logging.info(
+                        f"Time budget of {self.time_budget}s exhausted for {type(self.estimator).__name__}"
+                    )
+                    exhausted = True
+                    break
+        finally:
+            results.close()
+
+        complete = ~np.isnan(scores).any(axis=1)
+        return (
+            np.where(complete, scores.mean(axis=1), -np.inf),
+            np.where(complete, fit_times.mean(axis=1), np.nan),
+            np.where(complete, score_times.mean(axis=1), np.nan),
+            exhausted,
+        )
+
+    def _refit(self, X, y):
+        start = time.perf_counter()
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+        fit_estimator(self.best_estimator_, X, y, early_stopping=self.early_stopping)
+        self.refit_time_ = time.perf_counter() - start
+
+    def fit(self, X, y):
+        try:
+            self._start = time.perf_counter()
+            candidates = list(ParameterGrid(self.param_grid))
+            mean_scores, fit_times, score_times, _ = self._score_candidates(
+                self._worker_estimator(), candidates, X, y
+            )
+
+            self.cv_results_ = {
+                "params": candidates,
+                "mean_test_score": np.where(np.isfinite(mean_scores), mean_scores, np.nan),
+                "mean_fit_time": fit_times,
+                "mean_score_time": score_times,
+            }
+            # argmax keeps the first of tied candidates, as GridSearchCV's ranking does
+            self.best_index_ = int(np.argmax(mean_scores))
+            self.best_params_ = candidates[self.best_index_]
+            self.best_score_ = float(mean_scores[self.best_index_])
+            self.search_time_ = time.perf_counter() - self._start
+
+            if self.refit:
+                self._refit(X, y)
+            return self
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+class SuccessiveHalvingSearch(GridSearch):
+    '''
+    Successive halving over param_grid: all candidates are cross-validated with a small
+    resource, then only the best 1/factor of them go on to the next round with factor
+    times more resource, until one candidate is left and the full resource is reached.
+
+    The resource is n_estimators/iterations for the ensembles in RESOURCE_PARAMS (the
+    largest grid value, or the estimator's own setting, is the full resource) and the
+    number of training rows for every other model. Combine with early_stopping=True so
+    the boosting models also stop on a held-out split within each fit.
+    '''
+    def __init__(self, estimator, param_grid, cv=3, n_jobs=1, time_budget=None, refit=True,
+                 early_stopping=False, fold_views=True, factor=3, min_samples=500):
+        super().__init__(estimator, param_grid, cv=cv, n_jobs=n_jobs, time_budget=time_budget,
+                         refit=refit, early_stopping=early_stopping, fold_views=fold_views)
+        self.factor = factor
+        self.min_samples = min_samples
+
+    def _resource_schedule(self, param_grid, n_samples):
+        '''
+        Removes the resource parameter from param_grid and returns it together with the
+        resource to use in each round, ending at the full resource.
+        '''
+        resource = RESOURCE_PARAMS.get(type(self.estimator).__name__, "n_samples")
+        if resource == "n_samples":
+            max_resource, min_resource = n_samples, min(self.min_samples, n_samples)
+        else:
+            values = param_grid.pop(resource, None)
+            max_resource = max(values) if values else (self.estimator.get_params().get(resource) or 100)
+            min_resource = 1
+
+        n_candidates = len(ParameterGrid(param_grid))
+        n_rounds = 1
+        while self.factor ** (n_rounds - 1) < n_candidates:
+            n_rounds += 1
+        schedule = [
+            max(min_resource, max_resource // self.factor ** (n_rounds - 1 - i))
+            for i in range(n_rounds)
+        ]
+        return resource, schedule
+
+    def fit(self, X, y):
+        try:
+            self._start = time.perf_counter()
+            param_grid = dict(self.param_grid)
+            resource, schedule = self._resource_schedule(param_grid, len(y))
+            candidates = list(ParameterGrid(param_grid))
+            estimator = self._worker_estimator()
+            row_order = np.random.RandomState(0).permutation(len(y))
+
+            self.cv_results_ = {"resource": resource, "rounds": []}
+            survivors = candidates
+            best_params, best_score = candidates[0], -np.inf
+            for round_resource in schedule:
+                if resource == "n_samples":
+                    rows = np.sort(row_order[:round_resource])
+                    X_round, y_round = X[rows], y[rows]
+                    round_params = survivors
+                else:
+                    X_round, y_round = X, y
+                    round_params = [{**params, resource: round_resource} for params in survivors]
+
+                mean_scores, fit_times, _, exhausted = self._score_candidates(
+                    estimator, round_params, X_round, y_round
+                )
+                self.cv_results_["rounds"].append({
+                    "resource": round_resource,
+                    "params": round_params,
+                    "mean_test_score": np.where(np.isfinite(mean_scores), mean_scores, np.nan),
+                    "mean_fit_time": fit_times,
+                })
+
+                if np.isfinite(mean_scores).any():
+                    best = int(np.argmax(mean_scores))
+                    best_params, best_score = survivors[best], float(mean_scores[best])
+                if exhausted or len(survivors) == 1:
+                    break
+
+                n_keep = max(1, int(np.ceil(len(survivors) / self.factor)))
+                # a stable sort keeps the earlier candidate on ties
+                keep = np.argsort(-mean_scores, kind="stable")[:n_keep]
+                survivors = [survivors[i] for i in sorted(keep)]
+
+            if resource != "n_samples":
+                best_params = {**best_params, resource: schedule[-1]}
+            self.best_params_ = best_params
+            self.best_score_ = best_score
+            self.search_time_ = time.perf_counter() - self._start
+
+            if self.refit:
+                self._refit(X, y)
+            return self
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+# Search strategies selectable through ModelTrainerConfig.search_strategy
+SEARCH_STRATEGIES = {
+    "grid": GridSearch,
+    "halving": SuccessiveHalvingSearch,
+}
+
+
+def get_search(strategy, estimator, param_grid, **kwargs):
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unknown search strategy {strategy!r}, expected one of {sorted(SEARCH_STRATEGIES)}")
+    return SEARCH_STRATEGIES[strategy](estimator, param_grid, **kwargs)
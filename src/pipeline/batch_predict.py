@@ -0,0 +1,245 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import logging
+from src.instrumentation import instrumentation
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.components.data_validation import DataValidation
+from src.model_search import effective_n_jobs, limit_native_threads
+
+
+@dataclass
+class BatchPredictConfig:
+    chunksize: int=50_000
+    id_column: str="ID"
+    prediction_column: str="Predicted_Sale_Price"
+    # Rows failing src.components.data_validation are left out of the output and written,
+    # with their validation_errors, to quarantine_path (default: <output>_quarantine.csv)
+    validate: bool=True
+    quarantine_path: str=None
+    # Chunks are validated and scored by a pool of n_workers processes (-1: one per core) and
+    # written in input order; at most max_pending_chunks (default 2 per worker) are in flight
+    n_workers: int=1
+    max_pending_chunks: int=None
+    # "fork" (the Linux default) hands the workers the artifacts the parent already loaded,
+    # shared copy-on-write; under "spawn" each worker loads them once in its initializer
+    start_method: str=None
+
+
+def _is_parquet(file_path):
+    return os.path.splitext(file_path)[1].lower() in (".parquet", ".pq")
+
+
+def _read_chunks(file_path, chunksize):
+    if _is_parquet(file_path):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(file_path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file_path, chunksize=chunksize)
+
+
+class _ChunkWriter:
+    '''
+    Appends prediction chunks to a CSV or Parquet file so that nothing is held in memory.
+    '''
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._parquet_writer = None
+        self._header_written = False
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+    def write(self, df):
+        if _is_parquet(self.file_path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.file_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.file_path, mode="a" if self._header_written else "w",
+                      header=not self._header_written, index=False)
+            self._header_written = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+# The pipeline of a pool worker, built once by _init_worker
+_worker = {}
+
+
+def _init_worker(batch_predict_config, predict_pipeline_config, n_threads, instrument):
+    instrumentation.reset_worker(instrument)
+    pipeline = BatchPredictPipeline(batch_predict_config)
+    pipeline.predict_pipeline.predict_pipeline_config = predict_pipeline_config
+    model, _ = pipeline.predict_pipeline.load_artifacts()
+    # n_workers processes each running a full native thread pool would oversubscribe the cores.
+    # A fitted CatBoost model refuses set_params; the fast path already predicts it on one thread
+    if type(model).__name__ != "CatBoostRegressor":
+        limit_native_threads(model, n_threads)
+    _worker["pipeline"] = pipeline
+
+
+def _score_in_worker(chunk):
+    try:
+        with instrumentation.span("batch.chunk", rows=len(chunk)):
+            result = _worker["pipeline"].score_chunk(chunk)
+    except Exception as e:
+        # CustomException cannot be unpickled in the parent, its message can
+        raise RuntimeError(str(e)) from None
+    if not instrumentation.enabled:
+        return result, None
+    # The spans of this chunk go back with it, for the parent to merge into its registry
+    metrics = instrumentation.metrics.snapshot()
+    instrumentation.metrics.reset()
+    return result, metrics
+
+
+class BatchPredictPipeline:
+    def __init__(self, config=None):
+        self.batch_predict_config = config or BatchPredictConfig()
+        self.predict_pipeline = PredictPipeline()
+        self.data_validation = DataValidation()
+
+    def predict_chunk(self, df):
+        '''
+        Scores one raw-schema chunk (the column names of artifacts/data.csv) and returns
+        a frame with the ID column (when present) and the predicted sale price.
+        '''
+        preds = self.predict_pipeline.predict(df)
+
+        id_column = self.batch_predict_config.id_column
+        out = pd.DataFrame({self.batch_predict_config.prediction_column: preds})
+        if id_column in df.columns:
+            out.insert(0, id_column, df[id_column].to_numpy())
+        return out
+
+    def quarantine_path(self, output_path):
+        if self.batch_predict_config.quarantine_path:
+            return self.batch_predict_config.quarantine_path
+        return f"{os.path.splitext(output_path)[0]}_quarantine.csv"
+
+    def score_chunk(self, chunk):
+        '''
+        Validates and scores one raw chunk. Returns (n_rows, predictions or None, quarantined rows or None).
+        '''
+        n_rows, quarantined = len(chunk), None
+        if self.batch_predict_config.validate:
+            chunk, quarantined, _ = self.data_validation.validate(chunk)
+        scored = self.predict_chunk(chunk) if len(chunk) else None
+        return n_rows, scored, quarantined
+
+    def _scored_chunks(self, chunks):
+        '''
+        score_chunk() of every chunk, in input order, either in this process or on a process pool.
+        '''
+        config = self.batch_predict_config
+        n_workers = effective_n_jobs(config.n_workers)
+        if n_workers <= 1:
+            for chunk in chunks:
+                with instrumentation.span("batch.chunk", rows=len(chunk)):
+                    yield self.score_chunk(chunk)
+            return
+
+        n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+        max_pending = config.max_pending_chunks or 2 * n_workers
+        context = multiprocessing.get_context(config.start_method)
+        with ProcessPoolExecutor(n_workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(config, self.predict_pipeline.predict_pipeline_config, n_threads,
+                                           instrumentation.enabled)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_score_in_worker, chunk))
+                # Results are taken oldest first, which keeps the output in input order
+                if len(pending) >= max_pending:
+                    yield self._collect(pending.popleft())
+            while pending:
+                yield self._collect(pending.popleft())
+
+    @staticmethod
+    def _collect(future):
+        result, metrics = future.result()
+        if metrics is not None:
+            instrumentation.metrics.merge(metrics)
+        return result
+
+    def run(self, input_path, output_path):
+        try:
+            logging.info(f"Batch scoring {input_path} into {output_path}")
+            self.predict_pipeline.load_artifacts()
+
+            writer = _ChunkWriter(output_path)
+            quarantine_writer = None
+            n_rows = n_quarantined = 0
+            start = time.perf_counter()
+            try:
+                chunks = _read_chunks(input_path, self.batch_predict_config.chunksize)
+                for chunk_rows, scored, quarantined in self._scored_chunks(chunks):
+                    n_rows += chunk_rows
+                    if quarantined is not None and len(quarantined):
+                        if quarantine_writer is None:
+                            quarantine_writer = _ChunkWriter(self.quarantine_path(output_path))
+                        quarantine_writer.write(quarantined)
+                        n_quarantined += len(quarantined)
+                    if scored is not None:
+                        with instrumentation.span("batch.write", rows=len(scored)):
+                            writer.write(scored)
+                    logging.info(f"Scored {n_rows} rows, {n_quarantined} quarantined")
+            finally:
+                writer.close()
+                if quarantine_writer is not None:
+                    quarantine_writer.close()
+
+            elapsed = time.perf_counter() - start
+            rows_per_sec = n_rows / elapsed if elapsed > 0 else float("inf")
+            logging.info(f"Batch scoring completed: {n_rows} rows in {elapsed:.2f}s ({rows_per_sec:,.0f} rows/sec)")
+
+            return {"rows": n_rows, "quarantined": n_quarantined, "seconds": elapsed, "rows_per_sec": rows_per_sec}
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def batch_predict(input_path, output_path, chunksize=BatchPredictConfig.chunksize, n_workers=BatchPredictConfig.n_workers):
+    config = BatchPredictConfig(chunksize=chunksize, n_workers=n_workers)
+    return BatchPredictPipeline(config).run(input_path, output_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a raw housing CSV/Parquet file in chunks.")
+    parser.add_argument("input_path", help="CSV or Parquet file with the raw data.csv schema")
+    parser.add_argument("output_path", help="CSV or Parquet file to write predictions to")
+    parser.add_argument("--chunksize", type=int, default=BatchPredictConfig.chunksize)
+    parser.add_argument("--workers", type=int, default=BatchPredictConfig.n_workers,
+                        help="Score chunks on this many processes (-1: one per core); the output order is unchanged")
+    parser.add_argument("--metrics-path", default=None,
+                        help="Time the run's stages (src.instrumentation) and write the metrics as JSON to this path; "
+                             "with --workers the spans of every worker are merged in")
+    args = parser.parse_args(argv)
+
+    if args.metrics_path:
+        instrumentation.enable()
+    stats = batch_predict(args.input_path, args.output_path, chunksize=args.chunksize, n_workers=args.workers)
+    if args.metrics_path:
+        instrumentation.metrics.dump(args.metrics_path)
+    print(f"Scored {stats['rows']} rows in {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec), "
+          f"{stats['quarantined']} quarantined")
+
+
+if __name__ == "__main__":
+    main()
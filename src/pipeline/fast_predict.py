@@ -0,0 +1,203 @@
+import sys
+import numpy as np
+import pandas as pd
+from src.exception import CustomException
+from src.model_io import ArrayPreprocessor, build_geo_index, compile_preprocessor, xgb_best_iteration
+from src.components.geo_features import neighbor_features
+from src.components.target_encoding import lookup
+
+
+class _NumericBlock:
+    def __init__(self, columns, out_slice, fill, mean, scale):
+        self.columns = columns
+        self.out_slice = out_slice
+        self.fill = fill
+        self.mean = mean
+        self.scale = scale
+
+
+class _CategoricalBlock:
+    '''
+    One categorical input column: missing values take the fill value, then the column is
+    one-hot ("onehot") or integer ("ordinal") encoded into out_slice and scaled per output.
+    '''
+    def __init__(self, column, out_slice, fill, categories, encoding, mean, scale):
+        self.column = column
+        self.out_slice = out_slice
+        self.fill = fill
+        self.categories = np.asarray(categories, dtype=object)
+        self.encoding = encoding
+        self.mean = mean
+        self.scale = scale
+
+    def codes(self, values):
+        missing = pd.isna(values)
+        if missing.any():
+            values = np.where(missing, self.fill, values)
+        # sklearn keeps categories_ sorted, so a binary search finds each value's code
+        codes = np.searchsorted(self.categories, values)
+        np.minimum(codes, len(self.categories) - 1, out=codes)
+        known = self.categories[codes] == values
+        return codes, known, values
+
+
+class _FeatureBlock:
+    '''
+    Features computed from a float matrix of the input columns by a single function
+    (neighbor prices, zipcode lookups), written to out_slice and scaled.
+    '''
+    def __init__(self, columns, out_slice, features, mean, scale):
+        self.columns = columns
+        self.out_slice = out_slice
+        self.features = features
+        self.mean = mean
+        self.scale = scale
+
+
+class FastPredictor:
+    '''
+    Single-call predictor for small batches. The fitted preprocessor is compiled once into
+    per-block fill/mean/scale vectors and sorted category tables, so transform() is a handful
+    of NumPy ops into one preallocated float matrix, and the model is called through its
+    native entry point (XGBoost inplace_predict, single-threaded CatBoost predict).
+
+    Matches PredictPipeline.predict; the arithmetic is the same subtract-then-divide
+    StandardScaler uses, so the features are bit-identical.
+    '''
+    def __init__(self, model, spec, arrays):
+        self.model = model
+        self._compile(spec, arrays)
+        self._predict = self._native_predict(model)
+
+    @classmethod
+    def from_artifacts(cls, model, preprocessor):
+        '''
+        Builds a FastPredictor from a fitted ColumnTransformer or a bundle's ArrayPreprocessor.
+        '''
+        try:
+            if isinstance(preprocessor, ArrayPreprocessor):
+                return cls(model, preprocessor.spec, preprocessor.arrays)
+            return cls(model, *compile_preprocessor(preprocessor))
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _compile(self, spec, arrays):
+        self.numeric_blocks, self.categorical_blocks, self.feature_blocks = [], [], []
+        offset = 0
+        for block in spec:
+            ops = list(block["ops"])
+            feature = ops.pop(0) if ops and ops[0]["op"] in ("geo_neighbors", "lookup") else None
+            impute = ops.pop(0) if ops and ops[0]["op"] == "impute" else None
+            encoder = ops.pop(0) if ops and ops[0]["op"] in ("onehot", "ordinal") else None
+            scale = ops.pop(0) if ops and ops[0]["op"] == "scale" else None
+            if ops:
+                raise ValueError(f"Cannot compile ops {[op['op'] for op in ops]} of block {block['name']}")
+            mean = arrays[scale["mean"]] if scale and "mean" in scale else None
+            std = arrays[scale["scale"]] if scale and "scale" in scale else None
+
+            if feature is not None:
+                width = len(arrays[feature["fill"]])
+                self.feature_blocks.append(_FeatureBlock(
+                    block["columns"], slice(offset, offset + width), self._feature_function(feature, arrays), mean, std
+                ))
+                offset += width
+                continue
+
+            if encoder is None:
+                width = len(block["columns"])
+                fill = arrays[impute["array"]] if impute else None
+                self.numeric_blocks.append(_NumericBlock(
+                    block["columns"], slice(offset, offset + width), fill, mean, std
+                ))
+                offset += width
+                continue
+
+            encoded = 0
+            for i, (column, categories) in enumerate(zip(block["columns"], encoder["categories"])):
+                width = len(categories) if encoder["op"] == "onehot" else 1
+                out = slice(offset, offset + width)
+                self.categorical_blocks.append(_CategoricalBlock(
+                    column, out,
+                    impute["values"][i] if impute else None,
+                    categories, encoder["op"],
+                    None if mean is None else mean[encoded:encoded + width],
+                    None if std is None else std[encoded:encoded + width],
+                ))
+                offset += width
+                encoded += width
+        self.n_features = offset
+
+    @staticmethod
+    def _feature_function(op, arrays):
+        fill = arrays[op["fill"]]
+        if op["op"] == "geo_neighbors":
+            index = build_geo_index(op, arrays)
+            return lambda values: neighbor_features(index, values, op["k"], op["radius_km"], fill)
+        keys, table = arrays[op["keys"]], arrays[op["table"]]
+        return lambda values: lookup(keys, table, values, fill)
+
+    @staticmethod
+    def _native_predict(model):
+        name = type(model).__name__
+        if name == "XGBRegressor":
+            booster = model.get_booster()
+            # After early stopping model.predict stops at best_iteration; so must the booster
+            best_iteration = xgb_best_iteration(model)
+            if best_iteration is not None:
+                return lambda X: booster.inplace_predict(X, iteration_range=(0, best_iteration + 1))
+            return lambda X: booster.inplace_predict(X)
+        if name == "CatBoostRegressor":
+            return lambda X: model.predict(X, thread_count=1)
+        return model.predict
+
+    def transform(self, X):
+        n_rows = len(X)
+        out = np.empty((n_rows, self.n_features), dtype=np.float64)
+
+        for block in self.numeric_blocks:
+            # column-by-column copies into the output avoid building an intermediate sub-frame
+            values = out[:, block.out_slice]
+            for j, column in enumerate(block.columns):
+                values[:, j] = X[column].to_numpy(dtype=np.float64)
+            if block.fill is not None:
+                missing = np.isnan(values)
+                if missing.any():
+                    np.copyto(values, block.fill, where=missing)
+            if block.mean is not None:
+                values -= block.mean
+            if block.scale is not None:
+                values /= block.scale
+
+        for block in self.feature_blocks:
+            values = block.features(np.column_stack([X[column].to_numpy(dtype=np.float64) for column in block.columns]))
+            if block.mean is not None:
+                values -= block.mean
+            if block.scale is not None:
+                values /= block.scale
+            out[:, block.out_slice] = values
+
+        rows = np.arange(n_rows)
+        for block in self.categorical_blocks:
+            codes, known, values = block.codes(X[block.column].to_numpy(dtype=object))
+            if block.encoding == "ordinal":
+                if not known.all():
+                    raise ValueError(f"Found unknown category {values[~known][0]!r} in {block.column}")
+                encoded = codes.astype(np.float64)[:, None]
+            else:
+                encoded = np.zeros((n_rows, len(block.categories)))
+                encoded[rows[known], codes[known]] = 1.0
+            if block.mean is not None:
+                encoded = encoded - block.mean
+            if block.scale is not None:
+                encoded = encoded / block.scale
+            out[:, block.out_slice] = encoded
+
+        return out
+
+    def predict(self, X):
+        try:
+            return self._predict(self.transform(X))
+
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -1,33 +1,215 @@
 import os
 import sys
+import numpy as np
 import pandas as pd
+from operator import attrgetter, itemgetter
+from dataclasses import dataclass
 from src.exception import CustomException
-from src.utils import load_object
+from src.utils import artifact_cache
+from src.instrumentation import instrumentation
+from src.components.feature_engineering import FeatureEngineer
+
+
+@dataclass
+class PredictPipelineConfig:
+    model_file_path: str=os.path.join("artifacts", "model.pkl")
+    preprocessor_file_path: str=os.path.join("artifacts", "preprocessor.pkl")
+    # "pickle" reads the two .pkl files, "bundle" the native-format bundle from src.model_io
+    artifact_format: str="pickle"
+    model_bundle_dir: str=os.path.join("artifacts", "model_bundle")
+    # Bundles only hold pickles for models without a native format; those are refused unless allowed
+    allow_pickle_bundle: bool=False
+    # Score through src.pipeline.fast_predict.FastPredictor instead of preprocessor.transform + model.predict
+    use_fast_path: bool=False
+    # Serve repeated rows from src.pipeline.prediction_cache.prediction_cache
+    use_prediction_cache: bool=False
 
 
 class PredictPipeline:
     def __init__(self):
-        pass
+        self.predict_pipeline_config=PredictPipelineConfig()
+        self.feature_engineer=FeatureEngineer()
+        self._fast_predictor=None
+        self._input_columns=None
+
+    def load_artifacts(self):
+        '''
+        Returns the (model, preprocessor) pair from the process-wide artifact cache.
+        The pickles are only read again when they change on disk.
+        '''
+        try:
+            if self.predict_pipeline_config.artifact_format=="bundle":
+                from src.model_io import MANIFEST_FILE, load_model_bundle
+
+                manifest_path=os.path.join(self.predict_pipeline_config.model_bundle_dir,MANIFEST_FILE)
+                allow_pickle=self.predict_pipeline_config.allow_pickle_bundle
+                return artifact_cache.get(
+                    manifest_path,loader=lambda path: load_model_bundle(os.path.dirname(path),allow_pickle=allow_pickle)
+                )
+
+            model=artifact_cache.get(self.predict_pipeline_config.model_file_path)
+            preprocessor=artifact_cache.get(self.predict_pipeline_config.preprocessor_file_path)
+            return model,preprocessor
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def reload(self):
+        '''
+        Drops the cached model and preprocessor and loads them again from disk.
+        '''
+        artifact_cache.invalidate(self.predict_pipeline_config.model_file_path)
+        artifact_cache.invalidate(self.predict_pipeline_config.preprocessor_file_path)
+        artifact_cache.invalidate(os.path.join(self.predict_pipeline_config.model_bundle_dir,"manifest.json"))
+        return self.load_artifacts()
+
+    def get_fast_predictor(self):
+        '''
+        Returns a FastPredictor for the currently loaded artifacts, rebuilt only when the
+        artifact cache hands out a different model or preprocessor.
+        '''
+        from src.pipeline.fast_predict import FastPredictor
+
+        model,preprocessor=self.load_artifacts()
+        cached=self._fast_predictor
+        if cached is None or cached[0] is not model or cached[1] is not preprocessor:
+            cached=(model,preprocessor,FastPredictor.from_artifacts(model,preprocessor))
+            self._fast_predictor=cached
+        return cached[2]
+
+    def artifact_version(self):
+        '''
+        Identifies the loaded artifacts by path and on-disk (mtime, size) signature.
+        '''
+        self.load_artifacts()
+        config=self.predict_pipeline_config
+        if config.artifact_format=="bundle":
+            paths=[os.path.join(config.model_bundle_dir,"manifest.json")]
+        else:
+            paths=[config.model_file_path,config.preprocessor_file_path]
+        return tuple((os.path.abspath(path),artifact_cache.version(path)) for path in paths)
+
+    def get_input_columns(self):
+        '''
+        Columns the preprocessor actually reads, in order (the remainder it drops is left out).
+        '''
+        _,preprocessor=self.load_artifacts()
+        cached=self._input_columns
+        if cached is None or cached[0] is not preprocessor:
+            if hasattr(preprocessor,"transformers_"):
+                # Blocks may share a column (the coordinates feed the neighbor price features too)
+                columns=list(dict.fromkeys(
+                    column for name,_,cols in preprocessor.transformers_ if name!="remainder" for column in cols
+                ))
+            else:
+                columns=list(preprocessor.feature_names_in_)
+            cached=(preprocessor,columns)
+            self._input_columns=cached
+        return cached[1]
 
     def predict(self,features):
+        '''
+        Predicts sale prices for features, either CustomData frames or raw-schema rows
+        (the columns of artifacts/data.csv), whose derived fields are computed here.
+        '''
         try:
-            model_path = os.path.join("artifacts", "model.pkl")
-            preprocessor_path = os.path.join("artifacts", "preprocessor.pkl")
-            print("Before Loading")
-            model=load_object(file_path=model_path)
-            preprocessor=load_object(file_path=preprocessor_path)
-            print("After Loading")
-            data_scaled=preprocessor.transform(features)
-            preds=model.predict(data_scaled)
-            # print("Predictions:", preds)
-            return preds
-        
+            with instrumentation.span("predict",rows=len(features)):
+                with instrumentation.span("predict.features"):
+                    features=self.feature_engineer.transform(features)
+                if self.predict_pipeline_config.use_prediction_cache:
+                    return self._predict_cached(features)
+                return self._predict(features)
+
         except Exception as e:
             raise CustomException(e,sys)
 
+    def _predict_cached(self,features):
+        from src.pipeline.prediction_cache import prediction_cache
+
+        keys=prediction_cache.make_keys(features,self.get_input_columns(),self.artifact_version())
+        preds,missing=prediction_cache.get_many(keys)
+        if missing:
+            fresh=self._predict(features.iloc[missing])
+            prediction_cache.put_many([keys[i] for i in missing],fresh)
+            preds[missing]=fresh
+        if instrumentation.enabled:
+            instrumentation.metrics.increment("predict.cache_hits",len(keys)-len(missing))
+        return preds
+
+    def _predict(self,features):
+        if self.predict_pipeline_config.use_fast_path:
+            predictor=self.get_fast_predictor()
+            with instrumentation.span("predict.fast",rows=len(features)):
+                return predictor.predict(features)
+
+        model,preprocessor=self.load_artifacts()
+        with instrumentation.span("predict.transform",rows=len(features)):
+            data_scaled=preprocessor.transform(features)
+        with instrumentation.span("predict.model",rows=len(features)):
+            preds=model.predict(data_scaled)
+        return preds
+
+
+
+# CustomData fields and the dtype of their column in the frame handed to the preprocessor
+CUSTOM_DATA_SCHEMA = {
+    "No_of_Bedrooms": "int64",
+    "No_of_Bathrooms": "float64",
+    "Flat_Area": "float64",
+    "Lot_Area": "float64",
+    "No_of_Floors": "float64",
+    "Waterfront_View": "object",
+    "Condition_of_the_House": "object",
+    "Overall_Grade": "int64",
+    "Area_of_the_House_from_Basement": "float64",
+    "Basement_Area": "int64",
+    "Age_of_House": "int64",
+    "Zipcode": "float64",
+    "Latitude": "float64",
+    "Longitude": "float64",
+    "Living_Area_after_Renovation": "float64",
+    "Lot_Area_after_Renovation": "int64",
+    "Ever_Renovated": "object",
+    "Years_Since_Renovation": "float64",
+}
+
+
+def _coerce_value(name,dtype,value):
+    if dtype=="object":
+        if not isinstance(value,str):
+            raise ValueError(f"{name} must be a string, got {value!r}")
+        return value
+    number=float(value)
+    if dtype=="int64":
+        if not number.is_integer():
+            raise ValueError(f"{name} must be a whole number, got {value!r}")
+        return int(number)
+    return number
+
+
+def _coerce_column(name,dtype,values):
+    if dtype=="object":
+        column=np.empty(len(values),dtype=object)
+        column[:]=values
+        if not all(isinstance(value,str) for value in column):
+            raise ValueError(f"{name} must only hold strings")
+        return column
+    column=np.asarray(values,dtype=np.float64)
+    if dtype=="int64":
+        if not (np.isfinite(column).all() and (column==np.trunc(column)).all()):
+            raise ValueError(f"{name} must only hold whole numbers")
+        column=column.astype(np.int64)
+    return column
 
 
 class CustomData:
+    '''
+    One validated house record. Values are checked and coerced to the dtype of their
+    column in CUSTOM_DATA_SCHEMA on construction; many records are turned into one
+    preprocessor-ready frame with records_to_data_frame instead of one frame per house.
+    '''
+    __slots__=tuple(CUSTOM_DATA_SCHEMA)
+
     def __init__(  self,
         No_of_Bedrooms: int,
         No_of_Bathrooms: float,
@@ -48,49 +230,63 @@ class CustomData:
         Ever_Renovated: str,
         Years_Since_Renovation: float):
 
-        self.No_of_Bedrooms = No_of_Bedrooms
-        self.No_of_Bathrooms = No_of_Bathrooms
-        self.Flat_Area = Flat_Area
-        self.Lot_Area = Lot_Area
-        self.No_of_Floors = No_of_Floors
-        self.Waterfront_View = Waterfront_View
-        self.Condition_of_the_House = Condition_of_the_House
-        self.Overall_Grade = Overall_Grade
-        self.Area_of_the_House_from_Basement = Area_of_the_House_from_Basement
-        self.Basement_Area = Basement_Area
-        self.Age_of_House = Age_of_House
-        self.Zipcode = Zipcode
-        self.Latitude = Latitude
-        self.Longitude = Longitude
-        self.Living_Area_after_Renovation = Living_Area_after_Renovation
-        self.Lot_Area_after_Renovation = Lot_Area_after_Renovation
-        self.Ever_Renovated = Ever_Renovated
-        self.Years_Since_Renovation = Years_Since_Renovation
+        try:
+            values=locals()
+            for name,dtype in CUSTOM_DATA_SCHEMA.items():
+                setattr(self,name,_coerce_value(name,dtype,values[name]))
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def __repr__(self):
+        return "CustomData(" + ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__) + ")"
 
     def get_data_as_data_frame(self):
         try:
             custom_data_input_dict = {
-                "No_of_Bedrooms": [self.No_of_Bedrooms],
-                "No_of_Bathrooms": [self.No_of_Bathrooms],
-                "Flat_Area": [self.Flat_Area],
-                "Lot_Area": [self.Lot_Area],
-                "No_of_Floors": [self.No_of_Floors],
-                "Waterfront_View": [self.Waterfront_View],
-                "Condition_of_the_House": [self.Condition_of_the_House],
-                "Overall_Grade": [self.Overall_Grade],
-                "Area_of_the_House_from_Basement": [self.Area_of_the_House_from_Basement],
-                "Basement_Area": [self.Basement_Area],
-                "Age_of_House": [self.Age_of_House],
-                "Zipcode": [self.Zipcode],
-                "Latitude": [self.Latitude],
-                "Longitude": [self.Longitude],
-                "Living_Area_after_Renovation": [self.Living_Area_after_Renovation],
-                "Lot_Area_after_Renovation": [self.Lot_Area_after_Renovation],
-                "Ever_Renovated": [self.Ever_Renovated],
-                "Years_Since_Renovation": [self.Years_Since_Renovation],
+                name: np.array([getattr(self, name)], dtype=dtype)
+                for name, dtype in CUSTOM_DATA_SCHEMA.items()
             }
 
             return pd.DataFrame(custom_data_input_dict)
 
         except Exception as e:
             raise CustomException(e, sys)
+
+    @classmethod
+    def records_to_data_frame(cls, records):
+        '''
+        Builds one frame from a list of CustomData objects or of dicts keyed by field name,
+        filling one typed array per column rather than creating a frame per record.
+        '''
+        try:
+            records = list(records)
+            getter = attrgetter if records and isinstance(records[0], cls) else itemgetter
+            return cls.columns_to_data_frame({
+                name: list(map(getter(name), records)) for name in CUSTOM_DATA_SCHEMA
+            })
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def columns_to_data_frame(columns):
+        '''
+        Builds the frame from a dict of equally long columns (lists or arrays) keyed by field
+        name, validating and casting each column to its CUSTOM_DATA_SCHEMA dtype.
+        '''
+        try:
+            missing = [name for name in CUSTOM_DATA_SCHEMA if name not in columns]
+            if missing:
+                raise ValueError(f"Missing columns {missing}")
+            lengths = {len(columns[name]) for name in CUSTOM_DATA_SCHEMA}
+            if len(lengths) > 1:
+                raise ValueError(f"Columns differ in length: {sorted(lengths)}")
+
+            return pd.DataFrame({
+                name: _coerce_column(name, dtype, columns[name])
+                for name, dtype in CUSTOM_DATA_SCHEMA.items()
+            })
+
+        except Exception as e:
+            raise CustomException(e, sys)
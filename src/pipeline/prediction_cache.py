@@ -0,0 +1,103 @@
+import time
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class PredictionCacheConfig:
+    max_size: int=10000
+    # Seconds a cached prediction stays valid; None keeps it until it is evicted
+    ttl_seconds: float=None
+
+
+class PredictionCache:
+    '''
+    Bounded LRU cache of single-row predictions, keyed on (artifact version, feature tuple).
+    The artifact version changes whenever model/preprocessor change on disk, so predictions
+    of an older model are never returned and simply age out of the LRU order.
+    '''
+    def __init__(self, config=None):
+        self.prediction_cache_config = config or PredictionCacheConfig()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_keys(features, columns, version):
+        '''
+        One hashable key per row of features, built from the given columns in order.
+        Values are plain Python scalars and missing values become None, so equal rows
+        always map to equal keys (NaN never equals itself).
+        '''
+        values = []
+        for column in columns:
+            series = features[column]
+            column_values = series.tolist()
+            missing = pd.isna(series).to_numpy()
+            if missing.any():
+                column_values = [None if m else v for v, m in zip(column_values, missing)]
+            values.append(column_values)
+        return [(version, row) for row in zip(*values)]
+
+    def get_many(self, keys):
+        '''
+        Returns (predictions, missing): a float array holding the cached predictions and the
+        positions of the keys that were not found.
+        '''
+        preds = np.empty(len(keys), dtype=np.float64)
+        missing = []
+        ttl = self.prediction_cache_config.ttl_seconds
+        now = time.monotonic()
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and ttl is not None and now - entry[1] > ttl:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    missing.append(i)
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                preds[i] = entry[0]
+        return preds, missing
+
+    def put_many(self, keys, preds):
+        now = time.monotonic()
+        max_size = self.prediction_cache_config.max_size
+        with self._lock:
+            for key, pred in zip(keys, preds):
+                self._entries[key] = (float(pred), now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.prediction_cache_config.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared by every PredictPipeline in the process (Streamlit sessions, services, scripts)
+prediction_cache = PredictionCache()
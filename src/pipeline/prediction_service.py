@@ -0,0 +1,234 @@
+import time
+import asyncio
+import argparse
+from typing import List
+from dataclasses import dataclass
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from src.exception import CustomException
+from src.logger import logging
+from src.instrumentation import instrumentation
+from src.pipeline.predict_pipeline import CustomData, PredictPipeline
+
+
+@dataclass
+class PredictionServiceConfig:
+    host: str="0.0.0.0"
+    port: int=8000
+    # Requests arriving within max_wait_ms of each other are scored together, up to max_batch_size rows
+    max_batch_size: int=256
+    max_wait_ms: float=5.0
+    use_fast_path: bool=True
+    # Time every batch and request (src.instrumentation); GET /metrics returns the registry
+    instrument: bool=False
+
+
+class HouseFeatures(BaseModel):
+    '''
+    One house, with the same fields as CustomData.
+    '''
+    No_of_Bedrooms: int
+    No_of_Bathrooms: float
+    Flat_Area: float
+    Lot_Area: float
+    No_of_Floors: float
+    Waterfront_View: str
+    Condition_of_the_House: str
+    Overall_Grade: int
+    Area_of_the_House_from_Basement: float
+    Basement_Area: int
+    Age_of_House: int
+    Zipcode: float
+    Latitude: float
+    Longitude: float
+    Living_Area_after_Renovation: float
+    Lot_Area_after_Renovation: int
+    Ever_Renovated: str
+    Years_Since_Renovation: float
+
+
+class BatchRequest(BaseModel):
+    records: List[HouseFeatures]
+
+
+class MicroBatcher:
+    '''
+    Coalesces concurrent prediction requests into one vectorized predict call. The first
+    request of a batch waits at most max_wait_ms for others to join, and a batch never
+    grows past max_batch_size rows. Scoring runs on a single worker thread so the event
+    loop keeps accepting requests meanwhile.
+    '''
+    def __init__(self, predict_fn, max_batch_size=256, max_wait_ms=5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.rows = 0
+        self._queue = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict")
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, records):
+        '''
+        Queues a list of feature dicts and returns their predictions once their batch is scored.
+        '''
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        n_rows = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while n_rows < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    async def _score(self, records):
+        loop = asyncio.get_running_loop()
+        with instrumentation.span("service.batch", rows=len(records)):
+            features = CustomData.records_to_data_frame(records)
+            return await loop.run_in_executor(self._executor, self.predict_fn, features)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            records = [record for item, _ in batch for record in item]
+            if instrumentation.enabled:
+                instrumentation.metrics.increment("service.batch.requests", len(batch))
+            try:
+                preds = await self._score(records)
+            except Exception as e:
+                # One bad request must not fail the ones it was batched with: score them one by one
+                for item, future in batch:
+                    try:
+                        result = e if len(batch) == 1 else (await self._score(item)).tolist()
+                    except Exception as item_error:
+                        result = item_error
+                    if isinstance(result, Exception):
+                        if not future.done():
+                            future.set_exception(result)
+                        continue
+                    self.rows += len(item)
+                    if not future.done():
+                        future.set_result(result)
+                self.batches += 1
+                continue
+
+            self.batches += 1
+            self.rows += len(records)
+            start = 0
+            for item, future in batch:
+                if not future.done():
+                    future.set_result(preds[start:start + len(item)].tolist())
+                start += len(item)
+
+
+def error_detail(error):
+    '''
+    The message of the error behind a (possibly nested) CustomException, without the file
+    paths and line numbers CustomException adds.
+    '''
+    while isinstance(error, CustomException) and error.args and isinstance(error.args[0], Exception):
+        error = error.args[0]
+    return str(error)
+
+
+def create_app(config=None):
+    config = config or PredictionServiceConfig()
+    pipeline = PredictPipeline()
+    pipeline.predict_pipeline_config.use_fast_path = config.use_fast_path
+    batcher = MicroBatcher(pipeline.predict, config.max_batch_size, config.max_wait_ms)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Load the artifacts before the first request so they stay resident
+        pipeline.load_artifacts()
+        await batcher.start()
+        logging.info("Prediction service started")
+        yield
+        await batcher.stop()
+
+    app = FastAPI(title="Housing Price Prediction", lifespan=lifespan)
+    started = time.time()
+    if config.instrument:
+        instrumentation.enable()
+
+    @app.get("/metrics")
+    async def metrics():
+        return {"enabled": instrumentation.enabled, **instrumentation.metrics.snapshot()}
+
+    @app.get("/health")
+    async def health():
+        model, _ = pipeline.load_artifacts()
+        return {
+            "status": "ok",
+            "model": type(model).__name__,
+            "uptime_seconds": round(time.time() - started, 1),
+            "batches": batcher.batches,
+            "rows": batcher.rows,
+        }
+
+    @app.post("/predict")
+    async def predict(features: HouseFeatures):
+        try:
+            preds = await batcher.submit([features.model_dump()])
+        except CustomException as e:
+            raise HTTPException(status_code=422, detail=error_detail(e))
+        return {"prediction": preds[0]}
+
+    @app.post("/predict/batch")
+    async def predict_batch(request: BatchRequest):
+        if not request.records:
+            return {"predictions": []}
+        try:
+            preds = await batcher.submit([record.model_dump() for record in request.records])
+        except CustomException as e:
+            raise HTTPException(status_code=422, detail=error_detail(e))
+        return {"predictions": preds}
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve housing price predictions over HTTP.")
+    parser.add_argument("--host", default=PredictionServiceConfig.host)
+    parser.add_argument("--port", type=int, default=PredictionServiceConfig.port)
+    parser.add_argument("--max-batch-size", type=int, default=PredictionServiceConfig.max_batch_size)
+    parser.add_argument("--max-wait-ms", type=float, default=PredictionServiceConfig.max_wait_ms)
+    parser.add_argument("--instrument", action="store_true", help="Collect timing spans and serve them on /metrics")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    config = PredictionServiceConfig(
+        host=args.host, port=args.port,
+        max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms, instrument=args.instrument,
+    )
+    uvicorn.run(create_app(config), host=config.host, port=config.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import os
+import sys
+import json
+import time
+from datetime import datetime
+from dataclasses import dataclass, asdict
+from src.exception import CustomException
+from src.logger import logging
+from src.artifact_store import ArtifactStore
+from src.instrumentation import instrumentation
+from src.components.data_ingestion import DataIngestion
+from src.components.data_validation import DataValidation
+from src.components.data_transformation import DataTransformation
+from src.components.model_trainer import ModelTrainer
+from src.components.model_evaluation import ModelEvaluation, METRICS
+
+
+@dataclass
+class TrainPipelineConfig:
+    # One JSON manifest per run with the stage keys, cache hits and timings
+    run_manifest_dir: str=os.path.join("artifacts","runs")
+    # Quarantine invalid rows of the ingested splits before the transformation (src.components.data_validation)
+    validate_data: bool=True
+
+
+class TrainPipeline:
+    '''
+    Runs ingest -> validate -> transform -> train -> evaluate. Each stage is keyed on its
+    inputs, settings and code (see the components' get_cache_key) and reused from the
+    artifact store while they are unchanged, so editing a model grid only reruns train
+    and evaluate.
+    '''
+    def __init__(self):
+        self.train_pipeline_config=TrainPipelineConfig()
+        self.data_ingestion=DataIngestion()
+        self.data_validation=DataValidation()
+        self.data_transformation=DataTransformation()
+        self.model_trainer=ModelTrainer()
+        self.model_evaluation=ModelEvaluation()
+        self.store=ArtifactStore()
+        self.stages=[]
+
+    def run_stage(self,name,kind,key,func,*args):
+        cached=key is not None and self.store.has(kind,key)
+        start=time.perf_counter()
+        with instrumentation.span(f"stage.{name}",cached=cached):
+            result=func(*args)
+        seconds=time.perf_counter()-start
+        self.stages.append({"stage":name,"key":key,"cached":cached,"seconds":round(seconds,3)})
+        logging.info(f"Stage {name} {'reused' if cached else 'ran'} in {seconds:.2f}s")
+        return result
+
+    def run(self):
+        '''
+        Runs every stage and returns the run manifest, which is also written to run_manifest_dir.
+        '''
+        try:
+            self.stages=[]
+            started=datetime.now()
+            start=time.perf_counter()
+
+            ingestion_key=None
+            if self.data_ingestion.ingestion_config.use_artifact_store:
+                ingestion_key=self.data_ingestion.get_cache_key()
+            train_path,test_path=self.run_stage(
+                "ingest","ingestion",ingestion_key,self.data_ingestion.initiate_data_ingestion
+            )
+
+            if self.train_pipeline_config.validate_data:
+                validation_key=None
+                if self.data_validation.data_validation_config.use_artifact_store:
+                    validation_key=self.data_validation.get_cache_key(train_path,test_path)
+                train_path,test_path=self.run_stage(
+                    "validate","validation",validation_key,
+                    self.data_validation.initiate_data_validation,train_path,test_path
+                )
+
+            transformation_key=None
+            if self.data_transformation.data_transformation_config.use_artifact_store:
+                transformation_key=self.data_transformation.get_cache_key(train_path,test_path)
+            train_arr,test_arr,_=self.run_stage(
+                "transform","transformation",transformation_key,
+                self.data_transformation.initiate_data_transformation,train_path,test_path
+            )
+
+            training_key=None
+            if self.model_trainer.model_trainer_config.use_artifact_store:
+                training_key=self.model_trainer.get_cache_key(train_arr,test_arr)
+            self.run_stage("train","training",training_key,self.model_trainer.initiate_model_trainer,train_arr,test_arr)
+
+            model_path=self.model_trainer.model_trainer_config.trained_model_file_path
+            preprocessor_path=self.data_transformation.data_transformation_config.preprocessor_obj_file_path
+            evaluation_key=None
+            if self.model_evaluation.model_evaluation_config.use_artifact_store:
+                evaluation_key=self.model_evaluation.get_cache_key(model_path,preprocessor_path,test_path)
+            evaluation=self.run_stage(
+                "evaluate","evaluation",evaluation_key,
+                self.model_evaluation.initiate_model_evaluation,test_path,test_arr,model_path,preprocessor_path
+            )
+
+            manifest={
+                "run_id":started.strftime("%Y%m%d_%H%M%S_%f"),
+                "started":started.isoformat(timespec="seconds"),
+                "total_seconds":round(time.perf_counter()-start,3),
+                "stages":self.stages,
+                "best_model":self.model_trainer.selection["selected"],
+                "selection":self.model_trainer.selection,
+                "metrics":{
+                    "model":evaluation["model"],
+                    "n_test":evaluation["n_test"],
+                    **evaluation["overall"],
+                },
+                "evaluation_report":self.model_evaluation.model_evaluation_config.report_file_path,
+                # Span latencies and row counts of this process when instrumentation is on
+                "instrumentation":instrumentation.metrics.snapshot() if instrumentation.enabled else None,
+                "config":{
+                    "ingestion":asdict(self.data_ingestion.ingestion_config),
+                    "validation":asdict(self.data_validation.data_validation_config),
+                    "transformation":asdict(self.data_transformation.data_transformation_config),
+                    "training":asdict(self.model_trainer.model_trainer_config),
+                    "evaluation":asdict(self.model_evaluation.model_evaluation_config),
+                },
+            }
+
+            os.makedirs(self.train_pipeline_config.run_manifest_dir,exist_ok=True)
+            manifest_path=os.path.join(self.train_pipeline_config.run_manifest_dir,f"{manifest['run_id']}.json")
+            with open(manifest_path,"w") as file_obj:
+                json.dump(manifest,file_obj,indent=2)
+            logging.info(f"Training run manifest written to {manifest_path}")
+            return manifest
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+
+def main(argv=None):
+    import argparse
+
+    parser=argparse.ArgumentParser(description="Run ingestion, transformation, training and evaluation.")
+    parser.add_argument("--no-cache",action="store_true",help="Rerun every stage instead of reusing unchanged ones")
+    parser.add_argument("--search-strategy",default=None,help="grid or halving")
+    parser.add_argument("--n-jobs",type=int,default=None)
+    parser.add_argument("--instrument",action="store_true",
+                        help="Time every stage and step (src.instrumentation) into logs/instrumentation.jsonl and the manifest")
+    parser.add_argument("--compact-arrays",action="store_true",help="Train on float32 features with a separate target")
+    parser.add_argument("--save-candidates",action="store_true",
+                        help="Keep every fitted candidate in artifacts/candidates for benchmarks.inference")
+    parser.add_argument("--max-single-row-p99-ms",type=float,default=None,help="Serving budget for model selection")
+    parser.add_argument("--max-batch-p99-ms",type=float,default=None)
+    parser.add_argument("--max-model-size-mb",type=float,default=None)
+    args=parser.parse_args(argv)
+
+    pipeline=TrainPipeline()
+    if args.instrument:
+        instrumentation.enable()
+    if args.no_cache:
+        pipeline.data_ingestion.ingestion_config.use_artifact_store=False
+        pipeline.data_validation.data_validation_config.use_artifact_store=False
+        pipeline.data_transformation.data_transformation_config.use_artifact_store=False
+        pipeline.model_trainer.model_trainer_config.use_artifact_store=False
+        pipeline.model_evaluation.model_evaluation_config.use_artifact_store=False
+    if args.compact_arrays:
+        pipeline.data_transformation.data_transformation_config.compact_arrays=True
+    if args.save_candidates:
+        pipeline.model_trainer.model_trainer_config.save_candidates=True
+    if args.search_strategy:
+        pipeline.model_trainer.model_trainer_config.search_strategy=args.search_strategy
+    if args.n_jobs is not None:
+        pipeline.model_trainer.model_trainer_config.n_jobs=args.n_jobs
+    for budget in ("max_single_row_p99_ms","max_batch_p99_ms","max_model_size_mb"):
+        if getattr(args,budget) is not None:
+            setattr(pipeline.model_trainer.model_trainer_config,budget,getattr(args,budget))
+
+    manifest=pipeline.run()
+    for stage in manifest["stages"]:
+        print(f"{stage['stage']:<10} {'reused' if stage['cached'] else 'ran':<7} {stage['seconds']:>9.2f}s")
+    metrics=manifest["metrics"]
+    selection=manifest["selection"]
+    print(f"Best model: {manifest['best_model']}"+(
+        f" (most accurate: {selection['most_accurate']}, {selection['test_score_given_up']:.4f} R2 given up"
+        f" for the serving budget)" if selection["selected"]!=selection["most_accurate"] else ""
+    ))
+    for metric in METRICS:
+        bounds=metrics.get("ci",{}).get(metric)
+        print(f"  test {metric:<5} {metrics[metric]:.4f}" + (f"  [{bounds[0]:.4f}, {bounds[1]:.4f}]" if bounds else ""))
+
+
+if __name__ == "__main__":
+    main()
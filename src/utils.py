@@ -1,9 +1,32 @@
 import sys
 import pickle
 import os
+import threading
+import time
 from src.exception import CustomException
-from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV
+from src.logger import logging
+from src.instrumentation import instrumentation
+
+
+def read_dataset(file_path):
+    '''
+    Reads a CSV or, for .parquet paths, a Parquet dataset into a DataFrame.
+    '''
+    import pandas as pd
+
+    if file_path.endswith(".parquet"):
+        return pd.read_parquet(file_path)
+    return pd.read_csv(file_path)
+
+
+def split_xy(data):
+    '''
+    (X, y) of a transformed split from DataTransformation: the pair itself in compact mode,
+    otherwise the matrix with the target as its last column.
+    '''
+    if isinstance(data, tuple):
+        return data
+    return data[:, :-1], data[:, -1]
 
 
 def save_object(file_path, obj):
@@ -19,31 +42,54 @@ def save_object(file_path, obj):
         raise CustomException(e, sys)
     
 
-def evaluate_models(X_train, y_train,X_test,y_test,models,param):
+def evaluate_models(X_train, y_train,X_test,y_test,models,param,n_jobs=1,time_budget=None,compute_train_score=False,
+                    search_strategy="grid",search_kwargs=None):
+    '''
+    Grid-searches every model with 3-fold CV and returns, per model name, a dict with the
+    refitted best estimator ("model"), its test R² ("test_score"), the CV score, the best
+    params and the search/refit/score timings in seconds. The train-set R² is only computed
+    when compute_train_score is set.
+    n_jobs spreads the candidate x fold fits of each search over a process pool and
+    time_budget caps the search of each model in seconds (see src.model_search.GridSearch).
+    search_strategy picks the search from src.model_search.SEARCH_STRATEGIES and
+    search_kwargs is passed on to it (e.g. early_stopping, factor).
+    '''
+    from sklearn.metrics import r2_score
+    from src.model_search import get_search
+
     try:
         report = {}
 
-        for i in range(len(list(models))):
-            model = list(models.values())[i]
-            para=param[list(models.keys())[i]]
-
-            gs = GridSearchCV(model,para,cv=3)
-            gs.fit(X_train,y_train)
-
-            model.set_params(**gs.best_params_)
-            model.fit(X_train,y_train)
-
-            # model.fit(X_train, y_train)  # Train model
-
-            y_train_pred = model.predict(X_train)
-
-            y_test_pred = model.predict(X_test)
-
-            train_model_score = r2_score(y_train, y_train_pred)
-
-            test_model_score = r2_score(y_test, y_test_pred)
-
-            report[list(models.keys())[i]] = test_model_score
+        for name, model in models.items():
+            gs = get_search(search_strategy,model,param[name],cv=3,n_jobs=n_jobs,time_budget=time_budget,
+                            **(search_kwargs or {}))
+            with instrumentation.span("search",model=name,rows=len(y_train)):
+                gs.fit(X_train,y_train)
+            best_model = gs.best_estimator_
+
+            start = time.perf_counter()
+            with instrumentation.span("search.score",model=name,rows=len(y_test)):
+                y_test_pred = best_model.predict(X_test)
+            score_time = time.perf_counter() - start
+
+            train_model_score = None
+            if compute_train_score:
+                train_model_score = r2_score(y_train, best_model.predict(X_train))
+
+            report[name] = {
+                "model": best_model,
+                "test_score": r2_score(y_test, y_test_pred),
+                "train_score": train_model_score,
+                "cv_score": gs.best_score_,
+                "best_params": gs.best_params_,
+                "search_time": gs.search_time_,
+                "refit_time": gs.refit_time_,
+                "score_time": score_time,
+            }
+            logging.info(
+                f"{name}: test R2 {report[name]['test_score']:.4f}, search {gs.search_time_:.1f}s, "
+                f"refit {gs.refit_time_:.1f}s"
+            )
 
         return report
 
@@ -51,10 +97,87 @@ def evaluate_models(X_train, y_train,X_test,y_test,models,param):
         raise CustomException(e, sys)
     
 
+def measure_latency(func, arg, iterations, warmup=1):
+    '''
+    Wall-clock seconds of each of iterations calls of func(arg), after warmup untimed calls.
+    '''
+    import numpy as np
+
+    for _ in range(warmup):
+        func(arg)
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(arg)
+        timings[i] = time.perf_counter() - start
+    return timings
+
+
 def load_object(file_path):
     try:
         with open(file_path, "rb") as file_obj:
             return pickle.load(file_obj)
 
     except Exception as e:
-        raise CustomException(e, sys)
\ No newline at end of file
+        raise CustomException(e, sys)
+
+
+class ArtifactCache:
+    '''
+    Process-wide cache of unpickled artifacts keyed on the absolute file path.
+    Each entry remembers the (mtime, size) signature of the file it was loaded from,
+    so a changed file on disk is picked up on the next get() without restarting.
+    '''
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}
+
+    @staticmethod
+    def _signature(file_path):
+        stat = os.stat(file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, file_path, loader=None):
+        '''
+        Returns the object loaded from file_path, by default through load_object. A custom
+        loader receives the path and is cached under the same (mtime, size) signature.
+        '''
+        try:
+            key = os.path.abspath(file_path)
+            signature = self._signature(key)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == signature:
+                    return entry[1]
+                with instrumentation.span("artifact.load", path=key):
+                    obj = (loader or load_object)(key)
+                self._entries[key] = (signature, obj)
+                return obj
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def version(self, file_path):
+        '''
+        Returns the signature of the currently cached copy of file_path, or None.
+        '''
+        entry = self._entries.get(os.path.abspath(file_path))
+        return None if entry is None else entry[0]
+
+    def invalidate(self, file_path=None):
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(file_path), None)
+
+
+artifact_cache = ArtifactCache()
+
+
+def load_cached_object(file_path):
+    return artifact_cache.get(file_path)